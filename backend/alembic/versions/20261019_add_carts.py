@@ -0,0 +1,48 @@
+"""Add server-side carts
+
+Revision ID: 20261019_carts
+Revises: 20261019_settings_audit_archive
+Create Date: 2026-10-19 19:00:00.000000
+
+One cart per user with a version bumped on every change, and one line per
+product in the cart.
+"""
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+# revision identifiers, used by Alembic.
+revision = '20261019_carts'
+down_revision = '20261019_settings_audit_archive'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    """Create carts and cart_items tables"""
+    
+    op.create_table(
+        'carts',
+        sa.Column('id', postgresql.UUID(as_uuid=True), primary_key=True),
+        sa.Column('user_id', postgresql.UUID(as_uuid=True), sa.ForeignKey('users.id', ondelete='CASCADE'), nullable=False, unique=True),
+        sa.Column('version', sa.Integer(), nullable=False, server_default='1'),
+        sa.Column('created_at', sa.DateTime(timezone=True), server_default=sa.func.now()),
+        sa.Column('updated_at', sa.DateTime(timezone=True), server_default=sa.func.now())
+    )
+    
+    op.create_table(
+        'cart_items',
+        sa.Column('id', postgresql.UUID(as_uuid=True), primary_key=True),
+        sa.Column('cart_id', postgresql.UUID(as_uuid=True), sa.ForeignKey('carts.id', ondelete='CASCADE'), nullable=False),
+        sa.Column('product_id', postgresql.UUID(as_uuid=True), sa.ForeignKey('products.id', ondelete='CASCADE'), nullable=False),
+        sa.Column('quantity', sa.Integer(), nullable=False),
+        sa.Column('added_at', sa.DateTime(timezone=True), server_default=sa.func.now()),
+        sa.UniqueConstraint('cart_id', 'product_id', name='uq_cart_items_cart_product')
+    )
+
+
+def downgrade():
+    """Drop cart tables"""
+    
+    op.drop_table('cart_items')
+    op.drop_table('carts')
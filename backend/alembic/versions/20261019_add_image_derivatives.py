@@ -0,0 +1,31 @@
+"""Add derivative image URLs to product images
+
+Revision ID: 20261019_image_derivatives
+Revises: 20261019_slug_pattern_idx
+Create Date: 2026-10-19 15:00:00.000000
+
+The image pipeline stores WebP thumbnails next to each original. Both
+columns stay NULL until an image has been processed.
+"""
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision = '20261019_image_derivatives'
+down_revision = '20261019_slug_pattern_idx'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    """Add thumbnail_url and medium_url to product_images"""
+    
+    op.add_column('product_images', sa.Column('thumbnail_url', sa.String(), nullable=True))
+    op.add_column('product_images', sa.Column('medium_url', sa.String(), nullable=True))
+
+
+def downgrade():
+    """Remove derivative image URLs"""
+    
+    op.drop_column('product_images', 'medium_url')
+    op.drop_column('product_images', 'thumbnail_url')
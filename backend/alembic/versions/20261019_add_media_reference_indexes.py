@@ -0,0 +1,31 @@
+"""Add blob reference indexes on image URL suffixes
+
+Revision ID: 20261019_media_refs
+Revises: 20261019_image_derivatives
+Create Date: 2026-10-19 15:30:00.000000
+
+Uploaded images are referenced by URLs ending in their SHA-256 digest. The
+orphan sweep looks up `right(url, 64) IN (...)`; expression indexes keep
+that lookup from scanning every image row.
+"""
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision = '20261019_media_refs'
+down_revision = '20261019_image_derivatives'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    """Add expression indexes on the digest suffix of image URLs"""
+    
+    op.execute("CREATE INDEX ix_product_images_url_digest ON product_images (right(image_url, 64))")
+    op.execute("CREATE INDEX ix_categories_icon_digest ON categories (right(icon, 64))")
+
+
+def downgrade():
+    """Remove digest suffix indexes"""
+    
+    op.drop_index('ix_categories_icon_digest', table_name='categories')
+    op.drop_index('ix_product_images_url_digest', table_name='product_images')
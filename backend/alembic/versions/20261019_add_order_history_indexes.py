@@ -0,0 +1,30 @@
+"""Add indexes for buyer order history
+
+Revision ID: 20261019_order_history_idx
+Revises: 20261019_media_refs
+Create Date: 2026-10-19 16:00:00.000000
+
+Order history is keyset-paginated per buyer by (created_at, id), and each
+page counts and previews items by order_id.
+"""
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision = '20261019_order_history_idx'
+down_revision = '20261019_media_refs'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    """Add buyer history and order item lookup indexes"""
+    
+    op.create_index('ix_orders_buyer_created', 'orders', ['buyer_id', 'created_at', 'id'])
+    op.create_index('ix_order_items_order_id', 'order_items', ['order_id'])
+
+
+def downgrade():
+    """Remove order history indexes"""
+    
+    op.drop_index('ix_order_items_order_id', table_name='order_items')
+    op.drop_index('ix_orders_buyer_created', table_name='orders')
@@ -0,0 +1,62 @@
+"""Add rating histogram counters to products
+
+Revision ID: 20261019_rating_histogram
+Revises: 20261019_wishlist_index
+Create Date: 2026-10-19 10:00:00.000000
+
+Per-star review counts are maintained incrementally on review writes so
+review stats can be served without scanning the reviews table.
+"""
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision = '20261019_rating_histogram'
+down_revision = '20261019_wishlist_index'
+branch_labels = None
+depends_on = None
+
+
+RATING_COLUMNS = [f'rating_{rating}_count' for rating in range(1, 6)]
+
+
+def upgrade():
+    """Add rating_N_count columns and backfill them from existing reviews"""
+    
+    for column in RATING_COLUMNS:
+        op.add_column(
+            'products',
+            sa.Column(column, sa.Integer(), nullable=False, server_default='0')
+        )
+    
+    # Backfill counters and the derived summary columns
+    op.execute("""
+        UPDATE products p
+        SET rating_1_count = c.r1,
+            rating_2_count = c.r2,
+            rating_3_count = c.r3,
+            rating_4_count = c.r4,
+            rating_5_count = c.r5,
+            total_reviews = c.total,
+            rating_average = ROUND(c.rating_sum::numeric / c.total, 2)
+        FROM (
+            SELECT product_id,
+                   COUNT(*) FILTER (WHERE rating = 1) AS r1,
+                   COUNT(*) FILTER (WHERE rating = 2) AS r2,
+                   COUNT(*) FILTER (WHERE rating = 3) AS r3,
+                   COUNT(*) FILTER (WHERE rating = 4) AS r4,
+                   COUNT(*) FILTER (WHERE rating = 5) AS r5,
+                   COUNT(*) AS total,
+                   SUM(rating) AS rating_sum
+            FROM reviews
+            GROUP BY product_id
+        ) c
+        WHERE p.id = c.product_id
+    """)
+
+
+def downgrade():
+    """Remove rating_N_count columns"""
+    
+    for column in reversed(RATING_COLUMNS):
+        op.drop_column('products', column)
@@ -0,0 +1,51 @@
+"""Add keyset pagination indexes for review listings
+
+Revision ID: 20261019_review_indexes
+Revises: 20261019_seller_rollups
+Create Date: 2026-10-19 12:00:00.000000
+
+Review listings are keyset paginated by (created_at, id) or by
+(helpful_count, created_at, id) within a product, and by (created_at, id)
+within a user. helpful_count becomes NOT NULL so it can take part in row
+comparisons.
+"""
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision = '20261019_review_indexes'
+down_revision = '20261019_seller_rollups'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    """Make helpful_count NOT NULL and add review listing indexes"""
+    
+    op.execute("UPDATE reviews SET helpful_count = 0 WHERE helpful_count IS NULL")
+    op.alter_column(
+        'reviews',
+        'helpful_count',
+        existing_type=sa.Integer(),
+        nullable=False,
+        server_default='0'
+    )
+    
+    op.create_index('ix_reviews_product_created', 'reviews', ['product_id', 'created_at', 'id'])
+    op.create_index('ix_reviews_product_helpful', 'reviews', ['product_id', 'helpful_count', 'created_at', 'id'])
+    op.create_index('ix_reviews_user_created', 'reviews', ['user_id', 'created_at', 'id'])
+
+
+def downgrade():
+    """Remove review listing indexes and allow NULL helpful_count again"""
+    
+    op.drop_index('ix_reviews_user_created', table_name='reviews')
+    op.drop_index('ix_reviews_product_helpful', table_name='reviews')
+    op.drop_index('ix_reviews_product_created', table_name='reviews')
+    
+    op.alter_column(
+        'reviews',
+        'helpful_count',
+        existing_type=sa.Integer(),
+        nullable=True
+    )
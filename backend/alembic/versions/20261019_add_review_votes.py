@@ -0,0 +1,39 @@
+"""Add review_votes table
+
+Revision ID: 20261019_review_votes
+Revises: 20261019_review_indexes
+Create Date: 2026-10-19 13:00:00.000000
+
+Records one "helpful" vote per user per review so the helpful count can
+be incremented idempotently.
+"""
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+# revision identifiers, used by Alembic.
+revision = '20261019_review_votes'
+down_revision = '20261019_review_indexes'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    """Add review_votes table"""
+    
+    op.create_table(
+        'review_votes',
+        sa.Column('id', postgresql.UUID(as_uuid=True), primary_key=True),
+        sa.Column('review_id', postgresql.UUID(as_uuid=True), nullable=False),
+        sa.Column('user_id', postgresql.UUID(as_uuid=True), nullable=False),
+        sa.Column('created_at', sa.DateTime(timezone=True), server_default=sa.func.now()),
+        sa.ForeignKeyConstraint(['review_id'], ['reviews.id'], ondelete='CASCADE'),
+        sa.ForeignKeyConstraint(['user_id'], ['users.id'], ondelete='CASCADE'),
+        sa.UniqueConstraint('review_id', 'user_id', name='uq_review_votes_review_user')
+    )
+
+
+def downgrade():
+    """Remove review_votes table"""
+    
+    op.drop_table('review_votes')
@@ -0,0 +1,68 @@
+"""Add seller rollup support and backfill seller aggregates
+
+Revision ID: 20261019_seller_rollups
+Revises: 20261019_rating_histogram
+Create Date: 2026-10-19 11:00:00.000000
+
+Seller rating_average, total_reviews and total_sales are now maintained
+incrementally. rating_sum lets the average be updated without rescanning
+reviews; the (seller_id, status) index serves seller dashboards and order
+lists.
+"""
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision = '20261019_seller_rollups'
+down_revision = '20261019_rating_histogram'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    """Add rating_sum, order_items index, and backfill seller rollups"""
+    
+    op.add_column(
+        'seller_profiles',
+        sa.Column('rating_sum', sa.Integer(), nullable=False, server_default='0')
+    )
+    
+    op.create_index(
+        'ix_order_items_seller_status',
+        'order_items',
+        ['seller_id', 'status']
+    )
+    
+    # Backfill from existing reviews and order items
+    op.execute("""
+        UPDATE seller_profiles s
+        SET total_reviews = r.review_count,
+            rating_sum = r.rating_sum,
+            rating_average = CASE
+                WHEN r.review_count > 0 THEN ROUND(r.rating_sum::numeric / r.review_count, 2)
+                ELSE 0
+            END,
+            total_sales = COALESCE((
+                SELECT SUM(oi.seller_earning)
+                FROM order_items oi
+                WHERE oi.seller_id = s.id
+                  AND oi.status IN ('CONFIRMED', 'PROCESSING', 'SHIPPED', 'DELIVERED')
+            ), 0)
+        FROM (
+            SELECT sp.id AS seller_id,
+                   COUNT(rv.id) AS review_count,
+                   COALESCE(SUM(rv.rating), 0) AS rating_sum
+            FROM seller_profiles sp
+            LEFT JOIN products p ON p.seller_id = sp.id
+            LEFT JOIN reviews rv ON rv.product_id = p.id
+            GROUP BY sp.id
+        ) r
+        WHERE s.id = r.seller_id
+    """)
+
+
+def downgrade():
+    """Remove rating_sum and the order_items index"""
+    
+    op.drop_index('ix_order_items_seller_status', table_name='order_items')
+    op.drop_column('seller_profiles', 'rating_sum')
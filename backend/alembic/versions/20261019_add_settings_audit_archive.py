@@ -0,0 +1,54 @@
+"""Add settings audit log index and archive table
+
+Revision ID: 20261019_settings_audit_archive
+Revises: 20261019_settings_generation
+Create Date: 2026-10-19 18:30:00.000000
+
+The audit log is keyset-paginated newest first, per setting or overall.
+Entries past the retention window are moved to settings_audit_log_archive.
+"""
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+# revision identifiers, used by Alembic.
+revision = '20261019_settings_audit_archive'
+down_revision = '20261019_settings_generation'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    """Add audit log keyset index and create the archive table"""
+    
+    op.create_index(
+        'ix_settings_audit_key_created',
+        'settings_audit_log',
+        ['setting_key', sa.text('created_at DESC'), sa.text('id DESC')]
+    )
+    
+    op.create_table(
+        'settings_audit_log_archive',
+        sa.Column('id', postgresql.UUID(as_uuid=True), primary_key=True),
+        sa.Column('setting_id', postgresql.UUID(as_uuid=True), nullable=False),
+        sa.Column('setting_key', sa.String(), nullable=False),
+        sa.Column('old_value', sa.JSON(), nullable=True),
+        sa.Column('new_value', sa.JSON(), nullable=False),
+        sa.Column('change_reason', sa.Text(), nullable=True),
+        sa.Column('changed_by', postgresql.UUID(as_uuid=True), nullable=False),
+        sa.Column('ip_address', sa.String(), nullable=True),
+        sa.Column('user_agent', sa.String(), nullable=True),
+        sa.Column('created_at', sa.DateTime(timezone=True), nullable=True),
+        sa.Column('archived_at', sa.DateTime(timezone=True), server_default=sa.func.now())
+    )
+    op.create_index('ix_settings_audit_log_archive_setting_key', 'settings_audit_log_archive', ['setting_key'])
+    op.create_index('ix_settings_audit_log_archive_created_at', 'settings_audit_log_archive', ['created_at'])
+
+
+def downgrade():
+    """Drop the archive table and audit log keyset index"""
+    
+    op.drop_index('ix_settings_audit_log_archive_created_at', table_name='settings_audit_log_archive')
+    op.drop_index('ix_settings_audit_log_archive_setting_key', table_name='settings_audit_log_archive')
+    op.drop_table('settings_audit_log_archive')
+    op.drop_index('ix_settings_audit_key_created', table_name='settings_audit_log')
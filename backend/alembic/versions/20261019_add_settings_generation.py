@@ -0,0 +1,35 @@
+"""Add platform settings generation counter
+
+Revision ID: 20261019_settings_generation
+Revises: 20261019_webhook_events
+Create Date: 2026-10-19 18:00:00.000000
+
+A single-row counter bumped with every settings change, polled by each app
+process to reload its in-memory settings registry.
+"""
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision = '20261019_settings_generation'
+down_revision = '20261019_webhook_events'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    """Create platform_settings_generation with its single row"""
+    
+    op.create_table(
+        'platform_settings_generation',
+        sa.Column('id', sa.Integer(), primary_key=True),
+        sa.Column('generation', sa.BigInteger(), nullable=False, server_default='0'),
+        sa.Column('updated_at', sa.DateTime(timezone=True), server_default=sa.func.now())
+    )
+    op.execute("INSERT INTO platform_settings_generation (id, generation) VALUES (1, 0)")
+
+
+def downgrade():
+    """Drop platform_settings_generation"""
+    
+    op.drop_table('platform_settings_generation')
@@ -0,0 +1,30 @@
+"""Add prefix-search indexes on product and category slugs
+
+Revision ID: 20261019_slug_pattern_idx
+Revises: 20261019_review_votes
+Create Date: 2026-10-19 14:00:00.000000
+
+The slug allocator looks up `slug LIKE 'base-%'`. A text_pattern_ops
+index lets that prefix match use an index scan under any collation.
+"""
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision = '20261019_slug_pattern_idx'
+down_revision = '20261019_review_votes'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    """Add text_pattern_ops indexes for slug prefix lookups"""
+    
+    op.execute("CREATE INDEX ix_products_slug_pattern ON products (slug text_pattern_ops)")
+    op.execute("CREATE INDEX ix_categories_slug_pattern ON categories (slug text_pattern_ops)")
+
+
+def downgrade():
+    """Remove slug prefix indexes"""
+    
+    op.drop_index('ix_categories_slug_pattern', table_name='categories')
+    op.drop_index('ix_products_slug_pattern', table_name='products')
@@ -0,0 +1,57 @@
+"""Add stock reservations
+
+Revision ID: 20261019_stock_reservations
+Revises: 20261019_carts
+Create Date: 2026-10-19 19:30:00.000000
+
+Unpaid Stripe orders hold their stock until paid or until the hold
+expires. Pending items of orders already pending, unpaid and paid through
+Stripe get holds expiring 30 minutes after the upgrade, so the sweeper
+also releases stock abandoned before this change. Orders with other
+payment methods (cash on delivery, mobile money, ...) are left alone.
+"""
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+# revision identifiers, used by Alembic.
+revision = '20261019_stock_reservations'
+down_revision = '20261019_carts'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    """Create stock_reservations and hold stock of existing unpaid orders"""
+    
+    op.create_table(
+        'stock_reservations',
+        sa.Column('id', postgresql.UUID(as_uuid=True), primary_key=True),
+        sa.Column('order_id', postgresql.UUID(as_uuid=True), sa.ForeignKey('orders.id', ondelete='CASCADE'), nullable=False),
+        sa.Column('product_id', postgresql.UUID(as_uuid=True), sa.ForeignKey('products.id', ondelete='CASCADE'), nullable=False),
+        sa.Column('quantity', sa.Integer(), nullable=False),
+        sa.Column('status', sa.String(length=20), nullable=False, server_default='held'),
+        sa.Column('expires_at', sa.DateTime(timezone=True), nullable=False),
+        sa.Column('created_at', sa.DateTime(timezone=True), server_default=sa.func.now()),
+        sa.Column('resolved_at', sa.DateTime(timezone=True), nullable=True)
+    )
+    op.create_index('ix_stock_reservations_status_expires', 'stock_reservations', ['status', 'expires_at'])
+    op.create_index('ix_stock_reservations_order_id', 'stock_reservations', ['order_id'])
+    
+    op.execute("""
+        INSERT INTO stock_reservations (id, order_id, product_id, quantity, status, expires_at)
+        SELECT gen_random_uuid(), oi.order_id, oi.product_id, oi.quantity, 'held', now() + interval '30 minutes'
+        FROM order_items oi
+        JOIN orders o ON o.id = oi.order_id
+        WHERE o.status = 'PENDING' AND o.payment_status <> 'PAID'
+          AND oi.status = 'PENDING'
+          AND (o.payment_method = 'stripe' OR o.stripe_payment_intent_id IS NOT NULL)
+    """)
+
+
+def downgrade():
+    """Drop stock_reservations"""
+    
+    op.drop_index('ix_stock_reservations_order_id', table_name='stock_reservations')
+    op.drop_index('ix_stock_reservations_status_expires', table_name='stock_reservations')
+    op.drop_table('stock_reservations')
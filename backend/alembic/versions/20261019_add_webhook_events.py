@@ -0,0 +1,44 @@
+"""Add webhook events queue table
+
+Revision ID: 20261019_webhook_events
+Revises: 20261019_idempotency_keys
+Create Date: 2026-10-19 17:00:00.000000
+
+Stripe webhooks are stored on receipt (unique on the Stripe event id) and
+processed by a background worker.
+"""
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+# revision identifiers, used by Alembic.
+revision = '20261019_webhook_events'
+down_revision = '20261019_idempotency_keys'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    """Create webhook_events table"""
+    
+    op.create_table(
+        'webhook_events',
+        sa.Column('id', postgresql.UUID(as_uuid=True), primary_key=True),
+        sa.Column('event_id', sa.String(), nullable=False, unique=True),
+        sa.Column('event_type', sa.String(), nullable=False),
+        sa.Column('payload', sa.JSON(), nullable=False),
+        sa.Column('status', sa.String(length=20), nullable=False, server_default='pending'),
+        sa.Column('attempts', sa.Integer(), nullable=False, server_default='0'),
+        sa.Column('last_error', sa.Text(), nullable=True),
+        sa.Column('next_attempt_at', sa.DateTime(timezone=True), nullable=False, server_default=sa.func.now()),
+        sa.Column('received_at', sa.DateTime(timezone=True), server_default=sa.func.now()),
+        sa.Column('processed_at', sa.DateTime(timezone=True), nullable=True)
+    )
+    op.create_index('ix_webhook_events_status_next_attempt', 'webhook_events', ['status', 'next_attempt_at'])
+
+
+def downgrade():
+    """Drop webhook_events table"""
+    
+    op.drop_index('ix_webhook_events_status_next_attempt', table_name='webhook_events')
+    op.drop_table('webhook_events')
@@ -0,0 +1,33 @@
+"""Add composite index for wishlist lookups
+
+Revision ID: 20261019_wishlist_index
+Revises: 20251031_password_reset
+Create Date: 2026-10-19 09:00:00.000000
+
+Wishlist pages and bulk membership checks always filter by user_id and
+product_id together.
+"""
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision = '20261019_wishlist_index'
+down_revision = '20251031_password_reset'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    """Add (user_id, product_id) index on wishlist_items"""
+    
+    op.create_index(
+        'ix_wishlist_items_user_product',
+        'wishlist_items',
+        ['user_id', 'product_id']
+    )
+
+
+def downgrade():
+    """Remove (user_id, product_id) index from wishlist_items"""
+    
+    op.drop_index('ix_wishlist_items_user_product', table_name='wishlist_items')
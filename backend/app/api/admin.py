@@ -1,10 +1,12 @@
 from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi.responses import FileResponse
 from sqlalchemy.orm import Session
 from app.database import get_db
 from app.schemas.seller import SellerProfileResponse, SellerApprovalAction
 from app.models.seller import SellerProfile, ApprovalStatus
 from app.models.user import User
 from app.middleware.auth_middleware import get_current_admin
+from app.utils.profiler import profile_path
 from typing import List
 from datetime import datetime
 
@@ -414,3 +416,23 @@ async def get_admin_dashboard(
             "revenue_by_status": revenue_by_status            # Revenue breakdown by order status
         }
     }
+
+
+@router.get("/profiles/{profile_id}")
+async def get_request_profile(
+    profile_id: str,
+    current_user: User = Depends(get_current_admin)
+):
+    """
+    Download a request profile (id from the X-Profile-Id response header).
+    Speedscope JSON or collapsed stacks; open either in https://www.speedscope.app
+    """
+    path = profile_path(profile_id)
+    if not path:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Profile not found"
+        )
+    
+    media_type = "application/json" if path.endswith(".json") else "text/plain"
+    return FileResponse(path, media_type=media_type, filename=path.rsplit("/", 1)[-1])
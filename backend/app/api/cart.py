@@ -0,0 +1,135 @@
+"""
+Cart API Endpoints
+==================
+
+Server-side shopping cart and checkout quoting.
+
+Endpoints:
+    - GET /cart: The current user's cart
+    - PUT /cart: Replace the whole cart (sync a cart built in the browser)
+    - PUT /cart/items/{product_id}: Set one line's quantity (0 removes it)
+    - DELETE /cart/items/{product_id}: Remove one line
+    - DELETE /cart: Empty the cart
+    - POST /cart/quote: Current prices and per-line availability, in one query
+
+Every change bumps the cart `version`; quotes are cached per version.
+"""
+
+from fastapi import APIRouter, Depends, status
+from sqlalchemy.orm import Session
+from datetime import datetime, timezone
+from uuid import UUID
+
+from app.database import get_db
+from app.models.user import User
+from app.models.cart import Cart, CartItem
+from app.middleware.auth_middleware import get_current_user
+from app.schemas.cart import CartReplace, CartItemQuantity, CartItemResponse, CartResponse, CartQuote
+from app.services.cart_service import CartService
+
+router = APIRouter(prefix="/cart", tags=["Cart"])
+
+
+def cart_response(db: Session, cart: Cart) -> CartResponse:
+    items = db.query(CartItem).filter(
+        CartItem.cart_id == cart.id
+    ).order_by(CartItem.added_at, CartItem.id).all()
+    return CartResponse(
+        version=cart.version,
+        items=[CartItemResponse.model_validate(item) for item in items]
+    )
+
+
+@router.get("", response_model=CartResponse)
+async def get_cart(
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_user)
+):
+    """Get the current user's cart (version 0 and no items if none exists yet)"""
+    cart = db.query(Cart).filter(Cart.user_id == current_user.id).first()
+    if not cart:
+        return CartResponse(version=0, items=[])
+    return cart_response(db, cart)
+
+
+@router.put("", response_model=CartResponse)
+async def replace_cart(
+    cart_data: CartReplace,
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_user)
+):
+    """Replace the whole cart; lines for products that no longer exist are dropped"""
+    service = CartService(db)
+    cart = service.get_cart(current_user.id)
+    service.replace_items(cart, cart_data.items)
+    db.commit()
+    return cart_response(db, cart)
+
+
+@router.put("/items/{product_id}", response_model=CartResponse)
+async def set_cart_item(
+    product_id: UUID,
+    update: CartItemQuantity,
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_user)
+):
+    """Set the quantity of one product in the cart (0 removes it)"""
+    service = CartService(db)
+    cart = service.get_cart(current_user.id)
+    service.set_quantity(cart, product_id, update.quantity)
+    db.commit()
+    return cart_response(db, cart)
+
+
+@router.delete("/items/{product_id}", response_model=CartResponse)
+async def remove_cart_item(
+    product_id: UUID,
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_user)
+):
+    """Remove one product from the cart"""
+    service = CartService(db)
+    cart = service.get_cart(current_user.id)
+    service.set_quantity(cart, product_id, 0)
+    db.commit()
+    return cart_response(db, cart)
+
+
+@router.delete("", status_code=status.HTTP_204_NO_CONTENT)
+async def clear_cart(
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_user)
+):
+    """Remove every item from the cart"""
+    cart = db.query(Cart).filter(Cart.user_id == current_user.id).first()
+    if cart:
+        CartService(db).replace_items(cart, [])
+        db.commit()
+    return None
+
+
+@router.post("/quote", response_model=CartQuote)
+async def quote_cart(
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_user)
+):
+    """
+    Price and stock-check the cart
+    
+    - One query for all lines, cached per cart version for a few seconds
+    - Each line reports `status` (available, insufficient_stock, unavailable)
+      and `available_quantity`
+    - `subtotal` covers the available lines at current prices; send it as
+      the order subtotal so checkout does not fail on a mismatch
+    """
+    cart = db.query(Cart).filter(Cart.user_id == current_user.id).first()
+    if not cart:
+        return CartQuote(
+            version=0,
+            lines=[],
+            subtotal=0.0,
+            item_count=0,
+            all_available=True,
+            quoted_at=datetime.now(timezone.utc)
+        )
+    return CartService(db).quote(cart)
@@ -4,7 +4,7 @@ from app.database import get_db
 from app.schemas.category import CategoryCreate, CategoryUpdate, CategoryResponse
 from app.models.category import Category
 from app.middleware.auth_middleware import get_current_admin
-from app.utils.helpers import generate_slug
+from app.services.slug_service import SlugAllocator
 from typing import List
 
 router = APIRouter(prefix="/categories", tags=["Categories"])
@@ -72,13 +72,8 @@ async def create_category(
 ):
     """Create a new category (admin only)"""
     
-    # Generate slug from name
-    slug = generate_slug(category_data.name)
-    
-    # Check if category with same name or slug exists
-    existing = db.query(Category).filter(
-        (Category.name == category_data.name) | (Category.slug == slug)
-    ).first()
+    # Check if category with same name exists
+    existing = db.query(Category).filter(Category.name == category_data.name).first()
     
     if existing:
         raise HTTPException(
@@ -98,13 +93,13 @@ async def create_category(
     # Create category
     new_category = Category(
         name=category_data.name,
-        slug=slug,
         description=category_data.description,
         icon=category_data.icon,
         parent_id=category_data.parent_id
     )
     
-    db.add(new_category)
+    # Allocate a unique slug and insert (retries if the slug is taken concurrently)
+    SlugAllocator(db, Category).flush_with_slug(new_category, category_data.name, fallback="category")
     db.commit()
     db.refresh(new_category)
     
@@ -131,13 +126,10 @@ async def update_category(
     # Update fields
     update_data = category_data.model_dump(exclude_unset=True)
     
-    # If name is being updated, regenerate slug
+    # If name is being updated, check it doesn't conflict with another category
     if "name" in update_data:
-        new_slug = generate_slug(update_data["name"])
-        
-        # Check if new name/slug conflicts with another category
         existing = db.query(Category).filter(
-            (Category.name == update_data["name"]) | (Category.slug == new_slug),
+            Category.name == update_data["name"],
             Category.id != category_id
         ).first()
         
@@ -146,8 +138,6 @@ async def update_category(
                 status_code=status.HTTP_400_BAD_REQUEST,
                 detail="Category with this name already exists"
             )
-        
-        category.slug = new_slug
     
     # If parent_id is being updated, verify it exists and isn't self
     if "parent_id" in update_data and update_data["parent_id"]:
@@ -165,10 +155,11 @@ async def update_category(
             )
     
     for field, value in update_data.items():
-        if field != "name":  # name is handled via slug
-            setattr(category, field, value)
-        else:
-            category.name = value
+        setattr(category, field, value)
+    
+    # Regenerate slug from the new name
+    if "name" in update_data:
+        SlugAllocator(db, Category).flush_with_slug(category, update_data["name"], fallback="category")
     
     db.commit()
     db.refresh(category)
@@ -0,0 +1,158 @@
+"""
+Media API Endpoints
+===================
+
+Upload and serve product and category images from the local
+content-addressed blob store (see app/services/blob_store.py).
+
+Endpoints:
+    - POST /media: Upload an image (sellers and admins); identical files are stored once
+    - GET /media/{sha256}: Serve an image with ETag, Range and long-lived caching
+"""
+
+import re
+
+from fastapi import APIRouter, Depends, HTTPException, status, Request, UploadFile, File
+from fastapi.responses import FileResponse, Response, StreamingResponse
+
+from app.models.user import User, UserRole
+from app.middleware.auth_middleware import get_current_user
+from app.schemas.media import MediaUploadResponse
+from app.services.blob_store import (
+    store_stream, blob_path, blob_content_type, is_valid_digest, iter_file_range,
+    BlobTooLarge, UnsupportedBlobType
+)
+
+router = APIRouter(prefix="/media", tags=["Media"])
+
+# Content never changes for a digest, so clients may cache indefinitely
+CACHE_CONTROL = "public, max-age=31536000, immutable"
+
+RANGE_PATTERN = re.compile(r"^bytes=(\d*)-(\d*)$")
+
+
+def parse_range(header: str, size: int):
+    """
+    Parse a single-range `Range` header into an inclusive (start, end).
+    
+    Returns None when the header should be ignored (malformed or multiple
+    ranges, which we answer with the full body) and raises 416 when the
+    range cannot be satisfied.
+    """
+    match = RANGE_PATTERN.match(header.strip())
+    if not match or (not match.group(1) and not match.group(2)):
+        return None
+    
+    first, last = match.groups()
+    if first:
+        start = int(first)
+        end = min(int(last), size - 1) if last else size - 1
+    else:
+        # Suffix range: the last N bytes
+        start = max(size - int(last), 0)
+        end = size - 1
+    
+    if start >= size or start > end:
+        raise HTTPException(
+            status_code=status.HTTP_416_REQUESTED_RANGE_NOT_SATISFIABLE,
+            detail="Requested range not satisfiable",
+            headers={"Content-Range": f"bytes */{size}"}
+        )
+    return start, end
+
+
+@router.post("", response_model=MediaUploadResponse, status_code=status.HTTP_201_CREATED)
+def upload_media(
+    request: Request,
+    file: UploadFile = File(...),
+    current_user: User = Depends(get_current_user)
+):
+    """
+    Upload a product or category image (sellers and admins)
+    
+    Returns the URL to use as `image_url`/`icon`. Uploading a file that is
+    already stored returns the existing URL without writing it again.
+    """
+    
+    if current_user.role not in (UserRole.SELLER, UserRole.ADMIN):
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail="Only sellers and admins can upload images"
+        )
+    
+    try:
+        blob = store_stream(file.file)
+    except BlobTooLarge as e:
+        raise HTTPException(
+            status_code=status.HTTP_413_REQUEST_ENTITY_TOO_LARGE,
+            detail=str(e)
+        )
+    except UnsupportedBlobType as e:
+        raise HTTPException(
+            status_code=status.HTTP_415_UNSUPPORTED_MEDIA_TYPE,
+            detail=str(e)
+        )
+    
+    return MediaUploadResponse(
+        sha256=blob.sha256,
+        url=str(request.url_for("get_media", digest=blob.sha256)),
+        size=blob.size,
+        content_type=blob.content_type,
+        deduplicated=blob.deduplicated
+    )
+
+
+@router.get("/{digest}", name="get_media")
+def get_media(digest: str, request: Request):
+    """
+    Serve a stored image
+    
+    - `ETag` is the content digest; `If-None-Match` returns 304
+    - A single `Range` returns 206 with just those bytes
+    - Full responses are sent with FileResponse
+    """
+    
+    if not is_valid_digest(digest):
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Media not found"
+        )
+    
+    path = blob_path(digest)
+    try:
+        size = path.stat().st_size
+    except FileNotFoundError:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Media not found"
+        )
+    
+    etag = f'"{digest}"'
+    headers = {
+        "ETag": etag,
+        "Cache-Control": CACHE_CONTROL,
+        "Accept-Ranges": "bytes"
+    }
+    
+    if_none_match = request.headers.get("if-none-match")
+    if if_none_match and (if_none_match.strip() == "*" or etag in [tag.strip() for tag in if_none_match.split(",")]):
+        return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers=headers)
+    
+    content_type = blob_content_type(path)
+    
+    range_header = request.headers.get("range")
+    if_range = request.headers.get("if-range")
+    if range_header and (not if_range or if_range.strip() == etag):
+        byte_range = parse_range(range_header, size)
+        if byte_range:
+            start, end = byte_range
+            headers["Content-Range"] = f"bytes {start}-{end}/{size}"
+            headers["Content-Length"] = str(end - start + 1)
+            return StreamingResponse(
+                iter_file_range(path, start, end),
+                status_code=status.HTTP_206_PARTIAL_CONTENT,
+                media_type=content_type,
+                headers=headers
+            )
+    
+    return FileResponse(path, media_type=content_type, headers=headers, stat_result=path.stat())
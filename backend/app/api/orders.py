@@ -1,7 +1,13 @@
-from fastapi import APIRouter, Depends, HTTPException, status
-from sqlalchemy.orm import Session
-from typing import List
+from fastapi import APIRouter, Depends, HTTPException, status, Query, Header, Request, Response
+from fastapi.responses import JSONResponse
+from fastapi.encoders import jsonable_encoder
+from sqlalchemy.orm import Session, selectinload
+from sqlalchemy import func, tuple_
+from typing import List, Optional
 from datetime import datetime
+from uuid import UUID
+import hashlib
+import json
 import secrets
 
 from app.database import get_db
@@ -10,18 +16,90 @@ from app.models.order import Order, OrderItem, OrderStatus, PaymentStatus
 from app.models.product import Product
 from app.models.seller import SellerProfile
 from app.middleware.auth_middleware import get_current_user
+from app.services.idempotency_service import IdempotencyService
+from app.services.cart_service import CartService
+from app.services.inventory_service import InventoryService, STRIPE_PAYMENT_METHODS
+from app.services.settings_registry import platform_settings
+from app.utils.pagination import encode_cursor, decode_cursor
+from app.utils.rate_limit import TokenBucketLimiter, client_ip, retry_after_header
+from app.config import settings
 from app.schemas.order import (
     OrderCreate,
     OrderResponse,
+    OrderItemResponse,
     OrderDetailResponse,
     OrderCancelRequest
 )
 
 router = APIRouter(prefix="/orders", tags=["Orders"])
 
+# Items shown per order in history lists
+ORDER_PREVIEW_ITEMS = 3
+
+# Columns loaded for order history lists (no addresses, notes or payment ids)
+ORDER_LIST_COLUMNS = (
+    Order.id,
+    Order.order_number,
+    Order.status,
+    Order.payment_status,
+    Order.subtotal,
+    Order.shipping_cost,
+    Order.tax,
+    Order.total,
+    Order.payment_method,
+    Order.tracking_number,
+    Order.cancelled_at,
+    Order.cancelled_reason,
+    Order.created_at
+)
+ORDER_CURSOR_TYPES = (datetime.fromisoformat, UUID)
+
+# Public tracking: per-IP and per-(order number, email) token buckets. Keying
+# on the pair means guessing emails for someone else's order never uses up
+# the real customer's bucket
+track_ip_limiter = TokenBucketLimiter(settings.TRACK_ORDER_IP_RATE_PER_MINUTE)
+track_order_limiter = TokenBucketLimiter(settings.TRACK_ORDER_NUMBER_RATE_PER_MINUTE)
+TRACK_ORDER_MAX_AGE = 30
+
+
+def get_order_item_previews(db: Session, order_ids: List) -> dict:
+    """
+    Map order id -> its first few items for a page of orders, in one query.
+    
+    Items are ranked per order with a window function so only
+    ORDER_PREVIEW_ITEMS rows per order leave the database.
+    """
+    if not order_ids:
+        return {}
+    
+    ranked = db.query(
+        OrderItem.id,
+        OrderItem.order_id,
+        OrderItem.product_id,
+        OrderItem.product_name,
+        OrderItem.quantity,
+        OrderItem.price,
+        OrderItem.subtotal,
+        OrderItem.status,
+        func.row_number().over(
+            partition_by=OrderItem.order_id,
+            order_by=(OrderItem.created_at, OrderItem.id)
+        ).label("position")
+    ).filter(
+        OrderItem.order_id.in_(order_ids)
+    ).subquery()
+    
+    previews = {}
+    for item in db.query(ranked).filter(
+        ranked.c.position <= ORDER_PREVIEW_ITEMS
+    ).order_by(ranked.c.order_id, ranked.c.position).all():
+        previews.setdefault(item.order_id, []).append(item)
+    return previews
+
 
 @router.get("/track")
 async def track_order(
+    request: Request,
     order_number: str,
     email: str,
     db: Session = Depends(get_db)
@@ -31,27 +109,66 @@ async def track_order(
     
     Requires order number and email address for verification
     Does not require authentication
+    
+    - Rate-limited per client IP and per order number and email (429 with Retry-After)
+    - Order, buyer email and items are read in one query
+    - Responses carry an ETag; pollers sending If-None-Match get 304
     """
-    # Find order by order number
-    order = db.query(Order).filter(
-        Order.order_number == order_number.upper().strip()
-    ).first()
+    order_number = order_number.upper().strip()
     
-    if not order:
+    # Throttle before touching the database
+    retry_after = max(
+        track_ip_limiter.acquire(client_ip(request)),
+        track_order_limiter.acquire(f"{order_number}:{email.lower().strip()}")
+    )
+    if retry_after:
+        raise HTTPException(
+            status_code=status.HTTP_429_TOO_MANY_REQUESTS,
+            detail="Too many tracking requests. Please try again shortly.",
+            headers=retry_after_header(retry_after)
+        )
+    
+    # One query: order columns and buyer email on every row, one row per item
+    rows = db.query(
+        Order.order_number,
+        Order.status,
+        Order.payment_status,
+        Order.tracking_number,
+        Order.created_at,
+        Order.updated_at,
+        Order.total,
+        Order.shipping_address,
+        User.email.label("buyer_email"),
+        OrderItem.product_name,
+        OrderItem.quantity,
+        OrderItem.price,
+        OrderItem.subtotal,
+        OrderItem.status.label("item_status")
+    ).join(
+        User, User.id == Order.buyer_id
+    ).outerjoin(
+        OrderItem, OrderItem.order_id == Order.id
+    ).filter(
+        Order.order_number == order_number
+    ).order_by(OrderItem.created_at, OrderItem.id).all()
+    
+    if not rows:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
             detail="Order not found. Please check your order number."
         )
     
+    order = rows[0]
+    
     # Verify email matches
-    if order.buyer.email.lower() != email.lower().strip():
+    if order.buyer_email.lower() != email.lower().strip():
         raise HTTPException(
             status_code=status.HTTP_403_FORBIDDEN,
             detail="Email address does not match order records."
         )
     
     # Return order information
-    return {
+    payload = jsonable_encoder({
         "order_number": order.order_number,
         "status": order.status,
         "payment_status": order.payment_status,
@@ -62,20 +179,34 @@ async def track_order(
         "shipping_address": order.shipping_address,
         "items": [
             {
-                "product_name": item.product_name,
-                "quantity": item.quantity,
-                "price": float(item.price),
-                "subtotal": float(item.subtotal),
-                "status": item.status
+                "product_name": row.product_name,
+                "quantity": row.quantity,
+                "price": float(row.price),
+                "subtotal": float(row.subtotal),
+                "status": row.item_status
             }
-            for item in order.items
+            for row in rows if row.product_name is not None
         ]
+    })
+    
+    body = json.dumps(payload, separators=(",", ":")).encode()
+    etag = f'"{hashlib.sha256(body).hexdigest()[:32]}"'
+    headers = {
+        "ETag": etag,
+        # Contains the shipping address, so only the client may cache it
+        "Cache-Control": f"private, max-age={TRACK_ORDER_MAX_AGE}"
     }
+    
+    if request.headers.get("if-none-match") == etag:
+        return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers=headers)
+    
+    return Response(content=body, media_type="application/json", headers=headers)
 
 
 @router.post("", response_model=OrderDetailResponse, status_code=status.HTTP_201_CREATED)
 async def create_order(
     order_data: OrderCreate,
+    idempotency_key: Optional[str] = Header(None, alias="Idempotency-Key"),
     db: Session = Depends(get_db),
     current_user: User = Depends(get_current_user)
 ):
@@ -86,8 +217,15 @@ async def create_order(
     - Creates order with items
     - Updates product inventory
     - Calculates platform fees and seller earnings
+    - With an Idempotency-Key header, retries return the original order
+      instead of placing (and reserving stock for) a new one
     """
     
+    idempotency = IdempotencyService(db)
+    claim, replay = idempotency.begin(current_user.id, "POST /orders", idempotency_key, order_data)
+    if replay:
+        return JSONResponse(status_code=replay.response_status, content=replay.response_body)
+    
     order_number = f"ORD-{secrets.token_hex(4).upper()}"
     
     try:
@@ -125,7 +263,7 @@ async def create_order(
             
             # Calculate fees
             item_subtotal = float(product.price) * item.quantity
-            platform_fee = item_subtotal * (float(seller.commission_rate) / 100)
+            platform_fee = item_subtotal * (platform_settings.commission_rate_for(seller.commission_rate) / 100)
             seller_earning = item_subtotal - platform_fee
             
             calculated_subtotal += item_subtotal
@@ -191,6 +329,19 @@ async def create_order(
             product.quantity -= item_data["quantity"]
             product.sales_count += item_data["quantity"]
         
+        # Stripe orders hold the stock until paid or until the hold expires
+        if order.payment_method in STRIPE_PAYMENT_METHODS:
+            InventoryService(db).hold(order.id, [(item["product"].id, item["quantity"]) for item in items_to_create])
+        
+        # Ordered products leave the server-side cart
+        CartService(db).remove_products(current_user.id, [item["product"].id for item in items_to_create])
+        
+        # Store the response with the idempotency key in the same transaction
+        if claim:
+            db.flush()
+            db.refresh(order)
+            idempotency.complete(claim, status.HTTP_201_CREATED, OrderDetailResponse.model_validate(order))
+        
         db.commit()
         db.refresh(order)
         
@@ -198,9 +349,11 @@ async def create_order(
         
     except HTTPException:
         db.rollback()
+        idempotency.release(claim)
         raise
     except Exception as e:
         db.rollback()
+        idempotency.release(claim)
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
             detail=f"Order creation failed: {str(e)}"
@@ -209,19 +362,61 @@ async def create_order(
 
 @router.get("", response_model=List[OrderResponse])
 async def get_user_orders(
+    response: Response,
+    order_status: Optional[OrderStatus] = Query(None, alias="status"),
+    created_from: Optional[datetime] = None,
+    created_to: Optional[datetime] = None,
+    cursor: Optional[str] = None,
+    limit: int = Query(20, ge=1, le=100),
     db: Session = Depends(get_db),
     current_user: User = Depends(get_current_user)
 ):
     """
-    Get all orders for the current user
+    Get a page of orders for the current user
     
-    Returns orders sorted by creation date (newest first)
+    - Sorted by creation date (newest first)
+    - Optional filters: status, created_from, created_to
+    - Each order includes its item count and the first few items
+    - Pass the X-Next-Cursor response header back as `cursor` for the next page
     """
-    orders = db.query(Order).filter(
+    item_count = db.query(func.count(OrderItem.id)).filter(
+        OrderItem.order_id == Order.id
+    ).correlate(Order).scalar_subquery()
+    
+    query = db.query(*ORDER_LIST_COLUMNS, item_count.label("item_count")).filter(
         Order.buyer_id == current_user.id
-    ).order_by(Order.created_at.desc()).all()
+    )
     
-    return orders
+    if order_status:
+        query = query.filter(Order.status == order_status)
+    if created_from:
+        query = query.filter(Order.created_at >= created_from)
+    if created_to:
+        query = query.filter(Order.created_at < created_to)
+    
+    if cursor:
+        cursor_values = decode_cursor(cursor, ORDER_CURSOR_TYPES)
+        if cursor_values is None:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail="Invalid cursor"
+            )
+        query = query.filter(tuple_(Order.created_at, Order.id) < tuple_(*cursor_values))
+    
+    rows = query.order_by(Order.created_at.desc(), Order.id.desc()).limit(limit + 1).all()
+    
+    if len(rows) > limit:
+        rows = rows[:limit]
+        response.headers["X-Next-Cursor"] = encode_cursor([rows[-1].created_at, rows[-1].id])
+    
+    previews = get_order_item_previews(db, [row.id for row in rows])
+    
+    return [
+        OrderResponse(**row._asdict(), items=[
+            OrderItemResponse.model_validate(item) for item in previews.get(row.id, [])
+        ])
+        for row in rows
+    ]
 
 
 @router.get("/{order_id}", response_model=OrderDetailResponse)
@@ -235,7 +430,9 @@ async def get_order_detail(
     
     Only the buyer who created the order can access it
     """
-    order = db.query(Order).filter(Order.id == order_id).first()
+    order = db.query(Order).options(
+        selectinload(Order.items)
+    ).filter(Order.id == order_id).first()
     
     if not order:
         raise HTTPException(
@@ -291,15 +488,10 @@ async def cancel_order(
     order.cancelled_at = datetime.utcnow()
     order.cancelled_reason = cancel_data.reason
     
-    # Restore inventory and update item status
-    for item in order.items:
-        product = db.query(Product).filter(
-            Product.id == item.product_id
-        ).first()
-        if product:
-            product.quantity += item.quantity
-            product.sales_count = max(0, product.sales_count - item.quantity)
-        item.status = OrderStatus.CANCELLED
+    # Restore inventory and update item statuses in bulk
+    inventory = InventoryService(db)
+    inventory.restock_order_items(order.items, OrderStatus.CANCELLED)
+    inventory.release_holds(order.id)
     
     db.commit()
     
@@ -1,24 +1,38 @@
-from fastapi import APIRouter, Depends, HTTPException, Request, status
-from sqlalchemy.orm import Session
+from fastapi import APIRouter, Depends, HTTPException, Header, Request, status
+from fastapi.responses import JSONResponse
+from sqlalchemy.orm import Session, selectinload
+from typing import Optional
+import json
+import logging
 import stripe
 from app.database import get_db
 from app.config import settings
 from app.models.order import Order, PaymentStatus, OrderStatus
-from app.models.product import Product
 from app.middleware.auth_middleware import get_current_user
 from app.models.user import User
-
-# Initialize Stripe
-stripe.api_key = settings.STRIPE_SECRET_KEY
+from app.services.aggregate_service import AggregateService
+from app.services.idempotency_service import IdempotencyService
+from app.services.inventory_service import InventoryService
+from app.services.webhook_service import (
+    record_event, notify_webhook_worker, PAYMENT_INTENT_EVENTS, REFUND_EVENTS
+)
+from app.services.payment_gateway import (
+    get_payment_gateway, PaymentGatewayError, PaymentGatewayUnavailable, PaymentIntentNotFound
+)
 
 router = APIRouter(prefix="/payments", tags=["Payments"])
+logger = logging.getLogger(__name__)
+
+HANDLED_WEBHOOK_EVENTS = PAYMENT_INTENT_EVENTS | REFUND_EVENTS
 
 
 @router.post("/create-intent")
 async def create_payment_intent(
     payment_data: dict,
+    idempotency_key: Optional[str] = Header(None, alias="Idempotency-Key"),
     current_user: User = Depends(get_current_user),
-    db: Session = Depends(get_db)
+    db: Session = Depends(get_db),
+    gateway = Depends(get_payment_gateway)
 ):
     """
     Create a Stripe PaymentIntent for an order
@@ -29,7 +43,15 @@ async def create_payment_intent(
         "order_id": "uuid",
         "currency": "usd"
     }
+    
+    With an Idempotency-Key header, retries return the stored response
+    without calling Stripe again.
     """
+    idempotency = IdempotencyService(db)
+    claim, replay = idempotency.begin(current_user.id, "POST /payments/create-intent", idempotency_key, payment_data)
+    if replay:
+        return JSONResponse(status_code=replay.response_status, content=replay.response_body)
+    
     try:
         amount = payment_data.get('amount')
         order_id = payment_data.get('order_id')
@@ -81,31 +103,35 @@ async def create_payment_intent(
         if order.stripe_payment_intent_id:
             try:
                 # Check existing payment intent status
-                existing_intent = stripe.PaymentIntent.retrieve(order.stripe_payment_intent_id)
+                existing_intent = await gateway.retrieve_payment_intent(order.stripe_payment_intent_id)
                 
                 # If existing intent is still pending, return it instead of creating new one
                 if existing_intent.status in ['requires_payment_method', 'requires_confirmation', 'requires_action']:
-                    return {
+                    result = {
                         "client_secret": existing_intent.client_secret,
                         "payment_intent_id": existing_intent.id,
                         "message": "Using existing payment intent"
                     }
+                    idempotency.complete(claim, status.HTTP_200_OK, result)
+                    db.commit()
+                    return result
                 
                 # If succeeded, update order status
                 if existing_intent.status == 'succeeded':
                     order.payment_status = PaymentStatus.PAID
+                    InventoryService(db).commit_holds(order.id)
                     db.commit()
                     raise HTTPException(
                         status_code=status.HTTP_400_BAD_REQUEST,
                         detail="This order has already been paid"
                     )
-            except stripe.error.InvalidRequestError:
+            except PaymentIntentNotFound:
                 # Payment intent doesn't exist anymore, create new one
                 pass
         
         # Create PaymentIntent
-        intent = stripe.PaymentIntent.create(
-            amount=int(float(amount) * 100),  # Convert to cents
+        intent = await gateway.create_payment_intent(
+            amount=int(round(float(amount) * 100)),  # Convert to cents
             currency=currency,
             metadata={
                 "order_id": str(order_id),
@@ -113,29 +139,46 @@ async def create_payment_intent(
                 "user_id": str(current_user.id),
                 "user_email": current_user.email
             },
-            automatic_payment_methods={
-                "enabled": True,
-            },
-            description=f"Order {order.order_number}"
+            description=f"Order {order.order_number}",
+            # Stripe dedupes on its side too if our own commit below is lost
+            idempotency_key=f"intent-{order.id}-{idempotency_key.strip()}" if claim else None
         )
         
-        # Save payment intent ID to order
-        order.stripe_payment_intent_id = intent.id
-        db.commit()
-        
-        return {
+        result = {
             "client_secret": intent.client_secret,
             "payment_intent_id": intent.id
         }
         
-    except stripe.error.StripeError as e:
+        # Save payment intent ID to order (and the response with the idempotency key)
+        order.stripe_payment_intent_id = intent.id
+        # The buyer is paying now: keep the stock held for a full window
+        InventoryService(db).extend_holds(order)
+        idempotency.complete(claim, status.HTTP_200_OK, result)
+        db.commit()
+        
+        return result
+        
+    except PaymentGatewayUnavailable as e:
+        db.rollback()
+        idempotency.release(claim)
+        raise HTTPException(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail=f"Payment provider unavailable: {str(e)}"
+        )
+    except PaymentGatewayError as e:
+        db.rollback()
+        idempotency.release(claim)
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
             detail=f"Stripe error: {str(e)}"
         )
     except HTTPException:
+        db.rollback()
+        idempotency.release(claim)
         raise
     except Exception as e:
+        db.rollback()
+        idempotency.release(claim)
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
             detail=f"Payment intent creation failed: {str(e)}"
@@ -146,7 +189,8 @@ async def create_payment_intent(
 async def confirm_payment(
     confirmation_data: dict,
     current_user: User = Depends(get_current_user),
-    db: Session = Depends(get_db)
+    db: Session = Depends(get_db),
+    gateway = Depends(get_payment_gateway)
 ):
     """
     Confirm payment and update order status
@@ -199,7 +243,7 @@ async def confirm_payment(
             )
         
         # Retrieve PaymentIntent from Stripe
-        payment_intent = stripe.PaymentIntent.retrieve(payment_intent_id)
+        payment_intent = await gateway.retrieve_payment_intent(payment_intent_id)
         
         # VALIDATION 3: Verify payment intent metadata matches order
         if payment_intent.metadata.get('order_id') != str(order_id):
@@ -208,6 +252,32 @@ async def confirm_payment(
                 detail="Payment intent does not belong to this order"
             )
         
+        # Lock and re-read the order: the reservation sweeper or a webhook may
+        # have cancelled or paid it while Stripe was being queried
+        order = db.query(Order).options(selectinload(Order.items)).filter(
+            Order.id == order.id
+        ).populate_existing().with_for_update(of=Order).first()
+        
+        if order.payment_status == PaymentStatus.PAID and order.status != OrderStatus.CANCELLED:
+            db.commit()
+            return {
+                "success": True,
+                "message": "Payment already confirmed",
+                "order_id": str(order_id),
+                "order_number": order.order_number
+            }
+        
+        if payment_intent.status == 'succeeded' and order.status == OrderStatus.CANCELLED:
+            # Paid after the order was cancelled (e.g. its stock reservation expired)
+            order.payment_status = PaymentStatus.PAID
+            order.stripe_payment_intent_id = payment_intent_id
+            db.commit()
+            logger.error(f"Payment {payment_intent_id} received for cancelled order {order.order_number}; refund required")
+            raise HTTPException(
+                status_code=status.HTTP_409_CONFLICT,
+                detail="This order was cancelled before the payment completed. The payment will be refunded."
+            )
+        
         if payment_intent.status == 'succeeded':
             # Update order payment status
             order.payment_status = PaymentStatus.PAID
@@ -215,9 +285,11 @@ async def confirm_payment(
             order.stripe_payment_intent_id = payment_intent_id
             
             # Update all order items to confirmed
-            for item in order.items:
-                if item.status == OrderStatus.PENDING:
-                    item.status = OrderStatus.CONFIRMED
+            AggregateService(db).set_order_item_statuses(
+                [item for item in order.items if item.status == OrderStatus.PENDING],
+                OrderStatus.CONFIRMED
+            )
+            InventoryService(db).commit_holds(order.id)
             
             db.commit()
             
@@ -331,7 +403,12 @@ async def confirm_payment(
                 "status": payment_intent.status
             }
             
-    except stripe.error.StripeError as e:
+    except PaymentGatewayUnavailable as e:
+        raise HTTPException(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail=f"Payment provider unavailable: {str(e)}"
+        )
+    except PaymentGatewayError as e:
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
             detail=f"Stripe error: {str(e)}"
@@ -351,10 +428,11 @@ async def stripe_webhook(
     db: Session = Depends(get_db)
 ):
     """
-    Handle Stripe webhooks for payment events
+    Receive Stripe webhooks for payment events
     
-    Automatically updates order status when payments are processed.
-    This runs asynchronously outside the normal payment flow.
+    Verifies the signature, stores the event (once per Stripe event id) and
+    acknowledges immediately. Order updates are applied by the background
+    webhook worker (see app/services/webhook_service.py).
     """
     payload = await request.body()
     sig_header = request.headers.get('stripe-signature')
@@ -368,90 +446,15 @@ async def stripe_webhook(
     except stripe.error.SignatureVerificationError:
         raise HTTPException(status_code=400, detail="Invalid signature")
     
-    # Handle the event
-    if event['type'] == 'payment_intent.succeeded':
-        payment_intent = event['data']['object']
-        
-        # Get order from metadata
-        order_id = payment_intent.get('metadata', {}).get('order_id')
-        
-        if order_id:
-            order = db.query(Order).filter(Order.id == order_id).first()
-            if order:
-                # Only update if not already paid (idempotency)
-                if order.payment_status != PaymentStatus.PAID:
-                    order.payment_status = PaymentStatus.PAID
-                    order.status = OrderStatus.CONFIRMED
-                    order.stripe_payment_intent_id = payment_intent['id']
-                    
-                    # Update order items
-                    for item in order.items:
-                        if item.status == OrderStatus.PENDING:
-                            item.status = OrderStatus.CONFIRMED
-                    
-                    db.commit()
-                    
-                    # TODO: Send confirmation emails
-                    # send_order_confirmation_email(order)
-                    # send_seller_new_order_notifications(order)
-                    
-    elif event['type'] == 'payment_intent.payment_failed':
-        payment_intent = event['data']['object']
-        
-        # Get order from metadata
-        order_id = payment_intent.get('metadata', {}).get('order_id')
-        
-        if order_id:
-            order = db.query(Order).filter(Order.id == order_id).first()
-            if order:
-                order.payment_status = PaymentStatus.FAILED
-                db.commit()
-                
-                # TODO: Send payment failed email
-                # send_payment_failed_email(order)
-    
-    elif event['type'] == 'payment_intent.canceled':
-        payment_intent = event['data']['object']
-        
-        order_id = payment_intent.get('metadata', {}).get('order_id')
-        
-        if order_id:
-            order = db.query(Order).filter(Order.id == order_id).first()
-            if order:
-                # Mark as failed (user can try again)
-                order.payment_status = PaymentStatus.FAILED
-                db.commit()
+    # Only events we act on are queued
+    if event['type'] not in HANDLED_WEBHOOK_EVENTS:
+        return {"status": "ignored"}
     
-    elif event['type'] == 'charge.refunded':
-        charge = event['data']['object']
-        payment_intent_id = charge.get('payment_intent')
-        
-        if payment_intent_id:
-            # Find order by payment intent ID
-            order = db.query(Order).filter(
-                Order.stripe_payment_intent_id == payment_intent_id
-            ).first()
-            
-            if order:
-                order.payment_status = PaymentStatus.REFUNDED
-                order.status = OrderStatus.REFUNDED
-                
-                # Restore inventory
-                for item in order.items:
-                    item.status = OrderStatus.REFUNDED
-                    product = db.query(Product).filter(
-                        Product.id == item.product_id
-                    ).first()
-                    if product:
-                        product.quantity += item.quantity
-                        product.sales_count = max(0, product.sales_count - item.quantity)
-                
-                db.commit()
-                
-                # TODO: Send refund confirmation email
-                # send_refund_confirmation_email(order)
+    if not record_event(db, json.loads(payload)):
+        return {"status": "duplicate"}
     
-    return {"status": "success"}
+    notify_webhook_worker()
+    return {"status": "queued"}
 
 
 @router.get("/public-key")
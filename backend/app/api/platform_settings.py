@@ -5,11 +5,12 @@ Admin-only endpoints for managing platform configuration.
 Includes password confirmation for critical changes and full audit logging.
 """
 
-from fastapi import APIRouter, Depends, HTTPException, status, Request
+from fastapi import APIRouter, Depends, HTTPException, status, Request, Response, Query
 from sqlalchemy.orm import Session
-from sqlalchemy import and_
+from sqlalchemy import and_, tuple_
 from typing import List, Optional
 from datetime import datetime
+from uuid import UUID
 
 from app.database import get_db
 from app.models.user import User
@@ -25,6 +26,8 @@ from app.schemas.platform_setting import (
     SettingImpactAnalysis
 )
 from app.middleware.auth_middleware import get_current_admin
+from app.services.settings_registry import platform_settings, bump_generation
+from app.utils.pagination import encode_cursor, decode_cursor
 from passlib.context import CryptContext
 
 router = APIRouter(prefix="/admin/settings", tags=["Admin - Settings"])
@@ -32,6 +35,8 @@ router = APIRouter(prefix="/admin/settings", tags=["Admin - Settings"])
 # Password verification
 pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
 
+AUDIT_CURSOR_TYPES = (datetime.fromisoformat, UUID)
+
 
 def verify_password(plain_password: str, hashed_password: str) -> bool:
     """Verify a password against its hash"""
@@ -231,7 +236,10 @@ async def confirm_setting_change(
         db=db
     )
     
+    # Other processes reload their cached settings when the generation moves
+    bump_generation(db)
     db.commit()
+    platform_settings.invalidate()
     db.refresh(setting)
     
     return {
@@ -243,29 +251,64 @@ async def confirm_setting_change(
 
 @router.get("/audit-log", response_model=List[AuditLogResponse])
 async def get_audit_log(
+    response: Response,
     setting_key: Optional[str] = None,
-    limit: int = 100,
+    changed_by: Optional[UUID] = None,
+    created_from: Optional[datetime] = None,
+    created_to: Optional[datetime] = None,
+    cursor: Optional[str] = None,
+    limit: int = Query(100, ge=1, le=200),
     current_user: User = Depends(get_current_admin),
     db: Session = Depends(get_db)
 ):
-    """Get audit log of setting changes"""
-    query = db.query(SettingsAuditLog).order_by(SettingsAuditLog.created_at.desc())
+    """
+    Get a page of the audit log of setting changes
+    
+    - Sorted by change date (newest first)
+    - Optional filters: setting_key, changed_by, created_from, created_to
+    - Pass the X-Next-Cursor response header back as `cursor` for the next page
+    """
+    # Actor names come from the same query
+    query = db.query(
+        SettingsAuditLog,
+        User.first_name,
+        User.last_name,
+        User.email
+    ).outerjoin(User, User.id == SettingsAuditLog.changed_by)
     
     if setting_key:
         query = query.filter(SettingsAuditLog.setting_key == setting_key)
+    if changed_by:
+        query = query.filter(SettingsAuditLog.changed_by == changed_by)
+    if created_from:
+        query = query.filter(SettingsAuditLog.created_at >= created_from)
+    if created_to:
+        query = query.filter(SettingsAuditLog.created_at < created_to)
+    
+    if cursor:
+        cursor_values = decode_cursor(cursor, AUDIT_CURSOR_TYPES)
+        if cursor_values is None:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail="Invalid cursor"
+            )
+        query = query.filter(tuple_(SettingsAuditLog.created_at, SettingsAuditLog.id) < tuple_(*cursor_values))
+    
+    rows = query.order_by(
+        SettingsAuditLog.created_at.desc(), SettingsAuditLog.id.desc()
+    ).limit(limit + 1).all()
+    
+    if len(rows) > limit:
+        rows = rows[:limit]
+        last = rows[-1].SettingsAuditLog
+        response.headers["X-Next-Cursor"] = encode_cursor([last.created_at, last.id])
     
-    audit_logs = query.limit(limit).all()
-    
-    # Add user names
     result = []
-    for log in audit_logs:
-        log_dict = AuditLogResponse.model_validate(log).model_dump()
-        
-        user = db.query(User).filter(User.id == log.changed_by).first()
-        if user:
-            log_dict["changed_by_name"] = f"{user.first_name} {user.last_name}" if user.first_name else user.email
-        
-        result.append(AuditLogResponse(**log_dict))
+    for log, first_name, last_name, email in rows:
+        entry = AuditLogResponse.model_validate(log)
+        if email:
+            entry.changed_by_name = f"{first_name} {last_name}" if first_name else email
+        result.append(entry)
     
     return result
 
@@ -413,7 +456,10 @@ async def update_setting(
         db=db
     )
     
+    # Other processes reload their cached settings when the generation moves
+    bump_generation(db)
     db.commit()
+    platform_settings.invalidate()
     db.refresh(setting)
     
     return SettingResponse.model_validate(setting)
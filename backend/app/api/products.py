@@ -1,26 +1,87 @@
-from fastapi import APIRouter, Depends, HTTPException, status, Query
-from sqlalchemy.orm import Session
-from sqlalchemy import or_, and_
+from fastapi import APIRouter, Depends, HTTPException, status, Query, UploadFile, File, BackgroundTasks
+from sqlalchemy.orm import Session, selectinload
+from sqlalchemy import or_, and_, func
 from app.database import get_db
 from app.schemas.product import (
     ProductCreate,
     ProductUpdate,
     ProductResponse,
     ProductListResponse,
-    ProductImageResponse
+    ProductImageResponse,
+    ProductImportResult
 )
 from app.models.product import Product, ProductImage
 from app.models.seller import SellerProfile, ApprovalStatus
 from app.models.category import Category
 from app.models.user import User
 from app.middleware.auth_middleware import get_current_seller, get_optional_user
-from app.utils.helpers import generate_slug
+from app.services.slug_service import SlugAllocator
+from app.services.product_import_service import ProductImportService
+from app.services.image_service import process_product_images
+from app.utils.serialization import list_adapter, list_response
 from typing import List, Optional
 from uuid import UUID
 
 router = APIRouter(prefix="/products", tags=["Products"])
 
 
+def sync_product_images(db: Session, product: Product, images_data: List[dict]) -> None:
+    """
+    Bring a product's images in line with the submitted list by diffing.
+    
+    Images are matched by URL: matched images are updated only if their
+    alt text, position or primary flag changed, new URLs are inserted and
+    URLs no longer present are deleted. Unchanged images cause no writes.
+    Does not flush or commit.
+    """
+    existing_by_url = {}
+    for image in product.images:
+        existing_by_url.setdefault(image.image_url, []).append(image)
+    
+    kept = []
+    for img_data in images_data:
+        fields = {
+            "alt_text": img_data.get('alt_text'),
+            "position": img_data.get('position', 0),
+            "is_primary": img_data.get('is_primary', False)
+        }
+        matches = existing_by_url.get(img_data['image_url'])
+        if matches:
+            image = matches.pop(0)
+            for field, value in fields.items():
+                if getattr(image, field) != value:
+                    setattr(image, field, value)
+        else:
+            image = ProductImage(image_url=img_data['image_url'], **fields)
+        kept.append(image)
+    
+    # Removing images from the collection deletes them (delete-orphan cascade)
+    product.images = kept
+
+
+def get_primary_image_urls(db: Session, product_ids: List) -> dict:
+    """
+    Map product id -> primary image URL for a page of products, in one query.
+    
+    Prefers the small thumbnail derivative and falls back to the original
+    while the image pipeline has not processed the image yet.
+    """
+    if not product_ids:
+        return {}
+    rows = db.query(
+        ProductImage.product_id,
+        func.coalesce(ProductImage.thumbnail_url, ProductImage.image_url)
+    ).filter(
+        ProductImage.product_id.in_(product_ids),
+        ProductImage.is_primary == True
+    ).order_by(ProductImage.product_id, ProductImage.position).all()
+    
+    urls = {}
+    for product_id, url in rows:
+        urls.setdefault(product_id, url)
+    return urls
+
+
 @router.get("", response_model=List[ProductListResponse])
 async def get_products(
     search: Optional[str] = None,
@@ -30,8 +91,8 @@ async def get_products(
     max_price: Optional[float] = None,
     in_stock: Optional[bool] = None,
     is_featured: Optional[bool] = None,
-    sort_by: str = Query(default="created_at", regex="^(created_at|price|rating|sales|name)$"),
-    sort_order: str = Query(default="desc", regex="^(asc|desc)$"),
+    sort_by: str = Query(default="created_at", pattern="^(created_at|price|rating|sales|name)$"),
+    sort_order: str = Query(default="desc", pattern="^(asc|desc)$"),
     page: int = Query(default=1, ge=1),
     page_size: int = Query(default=20, ge=1, le=100),
     db: Session = Depends(get_db)
@@ -83,19 +144,15 @@ async def get_products(
     offset = (page - 1) * page_size
     products = query.offset(offset).limit(page_size).all()
     
-    # Get primary image for each product
-    result = []
-    for product in products:
-        primary_image = db.query(ProductImage).filter(
-            ProductImage.product_id == product.id,
-            ProductImage.is_primary == True
-        ).first()
-        
-        product_dict = ProductListResponse.model_validate(product).model_dump()
-        product_dict['primary_image'] = primary_image.image_url if primary_image else None
-        result.append(ProductListResponse(**product_dict))
+    # Get primary images for the whole page in one query
+    primary_images = get_primary_image_urls(db, [product.id for product in products])
+    
+    # Validate the page once and serialize it directly (no response_model revalidation)
+    result = list_adapter(ProductListResponse).validate_python(products, from_attributes=True)
+    for item in result:
+        item.primary_image = primary_images.get(item.id)
     
-    return result
+    return list_response(ProductListResponse, result)
 
 
 @router.get("/{product_id}", response_model=ProductResponse)
@@ -143,6 +200,7 @@ async def get_product(
 @router.post("", response_model=ProductResponse, status_code=status.HTTP_201_CREATED)
 async def create_product(
     product_data: ProductCreate,
+    background_tasks: BackgroundTasks,
     current_user: User = Depends(get_current_seller),
     db: Session = Depends(get_db)
 ):
@@ -174,17 +232,6 @@ async def create_product(
             detail="Category not found"
         )
     
-    # Generate slug
-    slug = generate_slug(product_data.name)
-    
-    # Check if slug exists, add number if needed
-    existing_slug = db.query(Product).filter(Product.slug == slug).first()
-    if existing_slug:
-        counter = 1
-        while db.query(Product).filter(Product.slug == f"{slug}-{counter}").first():
-            counter += 1
-        slug = f"{slug}-{counter}"
-    
     # Check if SKU is unique (if provided)
     if product_data.sku:
         existing_sku = db.query(Product).filter(Product.sku == product_data.sku).first()
@@ -199,7 +246,6 @@ async def create_product(
         seller_id=seller_profile.id,
         category_id=product_data.category_id,
         name=product_data.name,
-        slug=slug,
         description=product_data.description,
         price=product_data.price,
         compare_at_price=product_data.compare_at_price,
@@ -214,7 +260,8 @@ async def create_product(
         digital_file_url=product_data.digital_file_url
     )
     
-    db.add(new_product)
+    # Allocate a unique slug and insert (retries if the slug is taken concurrently)
+    SlugAllocator(db, Product).flush_with_slug(new_product, product_data.name, fallback="product")
     db.commit()
     db.refresh(new_product)
     
@@ -239,19 +286,84 @@ async def create_product(
     product_dict = ProductResponse.model_validate(new_product).model_dump()
     product_dict['images'] = [ProductImageResponse.model_validate(img) for img in images]
     
+    # Generate thumbnails after the response is sent
+    background_tasks.add_task(process_product_images, [img.id for img in images])
+    
     return ProductResponse(**product_dict)
 
 
+@router.post("/import", response_model=ProductImportResult)
+def import_products(
+    file: UploadFile = File(...),
+    file_format: Optional[str] = Query(default=None, alias="format", pattern="^(csv|ndjson)$"),
+    chunk_size: int = Query(default=500, ge=1, le=5000),
+    current_user: User = Depends(get_current_seller),
+    db: Session = Depends(get_db)
+):
+    """
+    Bulk create/update products from a CSV or NDJSON file (approved sellers only)
+    
+    - Rows whose SKU matches one of your products update it; others are created
+    - Streamed in chunks; each chunk is committed independently
+    - Returns counts and per-row errors
+    
+    Declared as a plain (sync) endpoint so long imports run in the threadpool
+    instead of blocking the event loop.
+    """
+    
+    # Get seller profile
+    seller_profile = db.query(SellerProfile).filter(
+        SellerProfile.user_id == current_user.id
+    ).first()
+    
+    if not seller_profile:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Seller profile not found"
+        )
+    
+    # Check if seller is approved
+    if seller_profile.approval_status != ApprovalStatus.APPROVED:
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail=f"Your seller account is {seller_profile.approval_status.value}. Only approved sellers can list products."
+        )
+    
+    # Infer format from the file name if not given
+    if not file_format:
+        filename = (file.filename or "").lower()
+        if filename.endswith(".csv"):
+            file_format = "csv"
+        elif filename.endswith((".ndjson", ".jsonl")):
+            file_format = "ndjson"
+        else:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail="Cannot determine file format. Use a .csv/.ndjson file or pass format=csv|ndjson."
+            )
+    
+    service = ProductImportService(db, seller_profile, chunk_size=chunk_size)
+    return service.import_stream(file.file, file_format)
+
+
 @router.put("/{product_id}", response_model=ProductResponse)
 async def update_product(
     product_id: str,
     product_data: ProductUpdate,
+    background_tasks: BackgroundTasks,
     current_user: User = Depends(get_current_seller),
     db: Session = Depends(get_db)
 ):
-    """Update a product (only by the seller who owns it)"""
+    """
+    Update a product (only by the seller who owns it)
     
-    product = db.query(Product).filter(Product.id == product_id).first()
+    Submitted images are diffed against the stored ones so only the needed
+    INSERT/UPDATE/DELETE statements are issued, all in a single commit.
+    """
+    
+    product = db.query(Product).options(
+        selectinload(Product.images)
+    ).filter(Product.id == product_id).first()
     
     if not product:
         raise HTTPException(
@@ -274,20 +386,6 @@ async def update_product(
     # Update fields
     update_data = product_data.model_dump(exclude_unset=True)
     
-    # If name is being updated, regenerate slug
-    if "name" in update_data:
-        new_slug = generate_slug(update_data["name"])
-        existing = db.query(Product).filter(
-            Product.slug == new_slug,
-            Product.id != product_id
-        ).first()
-        if existing:
-            counter = 1
-            while db.query(Product).filter(Product.slug == f"{new_slug}-{counter}").first():
-                counter += 1
-            new_slug = f"{new_slug}-{counter}"
-        product.slug = new_slug
-    
     # If SKU is being updated, check uniqueness
     if "sku" in update_data and update_data["sku"]:
         existing_sku = db.query(Product).filter(
@@ -313,40 +411,31 @@ async def update_product(
     images_data = update_data.pop('images', None)
     
     for field, value in update_data.items():
-        if field != "name":
-            setattr(product, field, value)
-        else:
-            product.name = value
-    
-    db.commit()
+        setattr(product, field, value)
     
     # Update images if provided
     if images_data is not None:
-        # Delete existing images
-        db.query(ProductImage).filter(ProductImage.product_id == product_id).delete()
-        
-        # Add new images
-        for img_data in images_data:
-            product_image = ProductImage(
-                product_id=product_id,
-                image_url=img_data['image_url'],
-                alt_text=img_data.get('alt_text'),
-                position=img_data.get('position', 0),
-                is_primary=img_data.get('is_primary', False)
-            )
-            db.add(product_image)
-        
-        db.commit()
+        sync_product_images(db, product, images_data)
     
-    db.refresh(product)
+    # If name is being updated, regenerate slug
+    if "name" in update_data:
+        SlugAllocator(db, Product).flush_with_slug(product, update_data["name"], fallback="product")
     
-    # Get images
-    images = db.query(ProductImage).filter(
-        ProductImage.product_id == product_id
-    ).all()
+    # Flush so new images get their ids/timestamps, then build the response
+    # from the loaded objects instead of re-querying after commit
+    db.flush()
     
+    images = sorted(product.images, key=lambda img: img.position or 0)
     product_dict = ProductResponse.model_validate(product).model_dump()
     product_dict['images'] = [ProductImageResponse.model_validate(img) for img in images]
+    # Collected before commit, which expires the loaded images
+    pending = [img.id for img in images if img.thumbnail_url is None]
+    
+    db.commit()
+    
+    # Generate thumbnails for newly added images after the response is sent
+    if pending:
+        background_tasks.add_task(process_product_images, pending)
     
     return ProductResponse(**product_dict)
 
@@ -406,15 +495,11 @@ async def get_seller_products(
     
     products = query.order_by(Product.created_at.desc()).all()
     
-    result = []
-    for product in products:
-        primary_image = db.query(ProductImage).filter(
-            ProductImage.product_id == product.id,
-            ProductImage.is_primary == True
-        ).first()
-        
-        product_dict = ProductListResponse.model_validate(product).model_dump()
-        product_dict['primary_image'] = primary_image.image_url if primary_image else None
-        result.append(ProductListResponse(**product_dict))
+    primary_images = get_primary_image_urls(db, [product.id for product in products])
+    
+    # Validate the page once and serialize it directly (no response_model revalidation)
+    result = list_adapter(ProductListResponse).validate_python(products, from_attributes=True)
+    for item in result:
+        item.primary_image = primary_images.get(item.id)
     
-    return result
+    return list_response(ProductListResponse, result)
@@ -8,6 +8,7 @@ from sqlalchemy.orm import Session
 from app.database import get_db
 from app.services.recommendation_service import RecommendationService
 from app.schemas.product import ProductResponse
+from app.utils.serialization import list_response
 from typing import List
 
 router = APIRouter(prefix="/recommendations", tags=["recommendations"])
@@ -25,7 +26,7 @@ async def get_similar_products(
     """
     service = RecommendationService(db)
     products = service.get_similar_products(product_id, limit)
-    return products
+    return list_response(ProductResponse, products)
 
 
 @router.get("/popular", response_model=List[ProductResponse])
@@ -38,7 +39,7 @@ async def get_popular_products(
     """
     service = RecommendationService(db)
     products = service.get_popular_products(limit)
-    return products
+    return list_response(ProductResponse, products)
 
 
 @router.get("/trending", response_model=List[ProductResponse])
@@ -51,7 +52,7 @@ async def get_trending_products(
     """
     service = RecommendationService(db)
     products = service.get_trending_products(limit)
-    return products
+    return list_response(ProductResponse, products)
 
 
 @router.get("/seller/{seller_id}/other/{product_id}", response_model=List[ProductResponse])
@@ -66,7 +67,7 @@ async def get_seller_other_products(
     """
     service = RecommendationService(db)
     products = service.get_seller_other_products(product_id, seller_id, limit)
-    return products
+    return list_response(ProductResponse, products)
 
 
 @router.get("/bought-together/{product_id}")
@@ -106,4 +107,4 @@ async def get_category_recommendations(
     """
     service = RecommendationService(db)
     products = service.get_category_popular(category_id, exclude_id, limit)
-    return products
+    return list_response(ProductResponse, products)
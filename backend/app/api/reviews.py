@@ -1,19 +1,81 @@
-from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi import APIRouter, Depends, HTTPException, status, Query, Response
 from sqlalchemy.orm import Session
-from sqlalchemy import func
-from typing import List
+from sqlalchemy import tuple_, update
+from sqlalchemy.dialects.postgresql import insert
+from typing import List, Optional
+from datetime import datetime
 from uuid import UUID
 
 from app.database import get_db
 from app.models.user import User
-from app.models.review import Review
+from app.models.review import Review, ReviewVote
 from app.models.product import Product
 from app.models.order import Order, OrderItem
 from app.middleware.auth_middleware import get_current_user
+from app.services.aggregate_service import AggregateService
 from app.schemas.review import ReviewCreate, ReviewUpdate, ReviewResponse, ReviewStats
+from app.utils.pagination import encode_cursor, decode_cursor
 
 router = APIRouter(prefix="/reviews", tags=["Reviews"])
 
+# Columns loaded for review listings (author data is limited to the name)
+REVIEW_LIST_COLUMNS = (
+    Review.id,
+    Review.product_id,
+    Review.user_id,
+    Review.order_id,
+    Review.rating,
+    Review.comment,
+    Review.helpful_count,
+    Review.created_at,
+    Review.updated_at
+)
+
+# Keyset sort keys per sort mode, all descending
+REVIEW_SORT_KEYS = {
+    "newest": (Review.created_at, Review.id),
+    "helpful": (Review.helpful_count, Review.created_at, Review.id)
+}
+REVIEW_CURSOR_TYPES = {
+    "newest": (datetime.fromisoformat, UUID),
+    "helpful": (int, datetime.fromisoformat, UUID)
+}
+
+
+def format_user_name(first_name: Optional[str], last_name: Optional[str]) -> str:
+    """Display name for a review author"""
+    return f"{first_name or ''} {last_name or ''}".strip() or "Anonymous"
+
+
+def paginate_reviews(query, sort: str, cursor: Optional[str], limit: int, response: Response):
+    """
+    Apply keyset pagination to a review listing query.
+    
+    Fetches one extra row to detect a following page; when there is one, its
+    cursor is returned in the X-Next-Cursor response header.
+    """
+    sort_keys = REVIEW_SORT_KEYS[sort]
+    
+    if cursor:
+        cursor_values = decode_cursor(cursor, REVIEW_CURSOR_TYPES[sort])
+        if cursor_values is None:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail="Invalid cursor"
+            )
+        query = query.filter(tuple_(*sort_keys) < tuple_(*cursor_values))
+    
+    rows = query.order_by(*[key.desc() for key in sort_keys]).limit(limit + 1).all()
+    
+    if len(rows) > limit:
+        rows = rows[:limit]
+        last = rows[-1]
+        response.headers["X-Next-Cursor"] = encode_cursor(
+            [getattr(last, key.key) for key in sort_keys]
+        )
+    
+    return rows
+
 
 @router.post("", response_model=ReviewResponse, status_code=status.HTTP_201_CREATED)
 async def create_review(
@@ -83,15 +145,18 @@ async def create_review(
     )
     
     db.add(review)
+    
+    # Update product rating counters in the same transaction
+    AggregateService(db).apply_review_rating_change(
+        review_data.product_id, new_rating=review_data.rating
+    )
+    
     db.commit()
     db.refresh(review)
     
-    # Update product rating
-    update_product_rating(db, review_data.product_id)
-    
     # Add user info to response
     response = ReviewResponse.model_validate(review)
-    response.user_name = f"{current_user.first_name or ''} {current_user.last_name or ''}".strip() or "Anonymous"
+    response.user_name = format_user_name(current_user.first_name, current_user.last_name)
     response.user_email = current_user.email
     
     return response
@@ -100,30 +165,39 @@ async def create_review(
 @router.get("/product/{product_id}", response_model=List[ReviewResponse])
 async def get_product_reviews(
     product_id: UUID,
-    skip: int = 0,
-    limit: int = 20,
+    response: Response,
+    sort: str = Query(default="newest", pattern="^(newest|helpful)$"),
+    rating: Optional[int] = Query(default=None, ge=1, le=5),
+    cursor: Optional[str] = None,
+    limit: int = Query(default=20, ge=1, le=100),
     db: Session = Depends(get_db)
 ):
     """
-    Get all reviews for a product
+    Get reviews for a product
     
-    - Paginated results
-    - Sorted by newest first
+    - Keyset paginated: pass the X-Next-Cursor header of a page as `cursor`
+    - Sorted by newest first, or by most helpful with `sort=helpful`
+    - Optionally filtered to a single star `rating`
+    - Author name is loaded in the same query (no per-review lookups)
     """
     
-    reviews = db.query(Review).filter(
+    query = db.query(
+        *REVIEW_LIST_COLUMNS, User.first_name, User.last_name
+    ).join(
+        User, User.id == Review.user_id
+    ).filter(
         Review.product_id == product_id
-    ).order_by(Review.created_at.desc()).offset(skip).limit(limit).all()
+    )
+    
+    if rating is not None:
+        query = query.filter(Review.rating == rating)
     
-    # Add user info to each review
-    result = []
-    for review in reviews:
-        review_response = ReviewResponse.model_validate(review)
-        review_response.user_name = f"{review.user.first_name or ''} {review.user.last_name or ''}".strip() or "Anonymous"
-        review_response.user_email = review.user.email
-        result.append(review_response)
+    rows = paginate_reviews(query, sort, cursor, limit, response)
     
-    return result
+    return [
+        {**row._asdict(), "user_name": format_user_name(row.first_name, row.last_name)}
+        for row in rows
+    ]
 
 
 @router.get("/product/{product_id}/stats", response_model=ReviewStats)
@@ -137,51 +211,48 @@ async def get_product_review_stats(
     - Total reviews
     - Average rating
     - Rating distribution
+    
+    Served from the product's rating counters, so cost does not depend on
+    the number of reviews.
     """
     
-    reviews = db.query(Review).filter(Review.product_id == product_id).all()
+    stats = AggregateService(db).get_product_rating_stats(product_id)
     
-    if not reviews:
+    if not stats:
         return ReviewStats(
             total_reviews=0,
             average_rating=0.0,
             rating_distribution={1: 0, 2: 0, 3: 0, 4: 0, 5: 0}
         )
     
-    total_reviews = len(reviews)
-    average_rating = sum(r.rating for r in reviews) / total_reviews
-    
-    # Calculate rating distribution
-    rating_distribution = {1: 0, 2: 0, 3: 0, 4: 0, 5: 0}
-    for review in reviews:
-        rating_distribution[review.rating] += 1
-    
-    return ReviewStats(
-        total_reviews=total_reviews,
-        average_rating=round(average_rating, 2),
-        rating_distribution=rating_distribution
-    )
+    return ReviewStats(**stats)
 
 
 @router.get("/my-reviews", response_model=List[ReviewResponse])
 async def get_my_reviews(
+    response: Response,
+    cursor: Optional[str] = None,
+    limit: int = Query(default=20, ge=1, le=100),
     db: Session = Depends(get_db),
     current_user: User = Depends(get_current_user)
 ):
-    """Get all reviews by the current user"""
+    """
+    Get reviews by the current user
+    
+    - Newest first, keyset paginated via the X-Next-Cursor header
+    """
     
-    reviews = db.query(Review).filter(
+    query = db.query(*REVIEW_LIST_COLUMNS).filter(
         Review.user_id == current_user.id
-    ).order_by(Review.created_at.desc()).all()
+    )
     
-    result = []
-    for review in reviews:
-        review_response = ReviewResponse.model_validate(review)
-        review_response.user_name = f"{current_user.first_name or ''} {current_user.last_name or ''}".strip() or "Anonymous"
-        review_response.user_email = current_user.email
-        result.append(review_response)
+    rows = paginate_reviews(query, "newest", cursor, limit, response)
     
-    return result
+    user_name = format_user_name(current_user.first_name, current_user.last_name)
+    return [
+        {**row._asdict(), "user_name": user_name, "user_email": current_user.email}
+        for row in rows
+    ]
 
 
 @router.put("/{review_id}", response_model=ReviewResponse)
@@ -211,21 +282,25 @@ async def update_review(
             detail="You can only update your own reviews"
         )
     
+    old_rating = review.rating
+    
     # Update fields
     update_data = review_data.model_dump(exclude_unset=True)
     for field, value in update_data.items():
         setattr(review, field, value)
     
+    # Update product rating counters if rating changed
+    if review_data.rating and review_data.rating != old_rating:
+        AggregateService(db).apply_review_rating_change(
+            review.product_id, old_rating=old_rating, new_rating=review_data.rating
+        )
+    
     db.commit()
     db.refresh(review)
     
-    # Update product rating if rating changed
-    if review_data.rating:
-        update_product_rating(db, review.product_id)
-    
     # Add user info to response
     response = ReviewResponse.model_validate(review)
-    response.user_name = f"{current_user.first_name or ''} {current_user.last_name or ''}".strip() or "Anonymous"
+    response.user_name = format_user_name(current_user.first_name, current_user.last_name)
     response.user_email = current_user.email
     
     return response
@@ -257,13 +332,14 @@ async def delete_review(
             detail="You can only delete your own reviews"
         )
     
-    product_id = review.product_id
-    
     db.delete(review)
-    db.commit()
     
-    # Update product rating
-    update_product_rating(db, product_id)
+    # Update product rating counters in the same transaction
+    AggregateService(db).apply_review_rating_change(
+        review.product_id, old_rating=review.rating
+    )
+    
+    db.commit()
     
     return None
 
@@ -274,42 +350,52 @@ async def mark_review_helpful(
     db: Session = Depends(get_db),
     current_user: User = Depends(get_current_user)
 ):
-    """Mark a review as helpful"""
+    """
+    Mark a review as helpful
     
-    review = db.query(Review).filter(Review.id == review_id).first()
+    - One vote per user per review; repeat calls are no-ops (idempotent)
+    - The count is bumped with an atomic SQL increment, so concurrent votes
+      are never lost
+    """
     
-    if not review:
+    exists = db.query(Review.id).filter(Review.id == review_id).first()
+    
+    if not exists:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
             detail="Review not found"
         )
     
+    # Record the vote; the unique (review_id, user_id) constraint dedupes it
+    vote_id = db.execute(
+        insert(ReviewVote)
+        .values(review_id=review_id, user_id=current_user.id)
+        .on_conflict_do_nothing(constraint="uq_review_votes_review_user")
+        .returning(ReviewVote.id)
+    ).scalar()
+    
+    if vote_id is None:
+        helpful_count = db.query(Review.helpful_count).filter(Review.id == review_id).scalar()
+        db.rollback()
+        return {
+            "message": "You have already marked this review as helpful",
+            "helpful_count": helpful_count,
+            "already_voted": True
+        }
+    
     # Increment helpful count
-    review.helpful_count += 1
+    helpful_count = db.execute(
+        update(Review)
+        .where(Review.id == review_id)
+        .values(helpful_count=Review.helpful_count + 1)
+        .returning(Review.helpful_count)
+        .execution_options(synchronize_session=False)
+    ).scalar()
     db.commit()
     
-    return {"message": "Review marked as helpful", "helpful_count": review.helpful_count}
-
+    return {
+        "message": "Review marked as helpful",
+        "helpful_count": helpful_count,
+        "already_voted": False
+    }
 
-# Helper function to update product rating
-def update_product_rating(db: Session, product_id: UUID):
-    """Update product's average rating and review count"""
-    
-    product = db.query(Product).filter(Product.id == product_id).first()
-    if not product:
-        return
-    
-    # Calculate average rating
-    result = db.query(
-        func.avg(Review.rating).label('avg_rating'),
-        func.count(Review.id).label('review_count')
-    ).filter(Review.product_id == product_id).first()
-    
-    if result.review_count > 0:
-        product.rating_average = round(float(result.avg_rating), 2)
-        product.total_reviews = result.review_count
-    else:
-        product.rating_average = 0
-        product.total_reviews = 0
-    
-    db.commit()
@@ -1,15 +1,21 @@
-from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi import APIRouter, Depends, HTTPException, status, BackgroundTasks
 from sqlalchemy.orm import Session
 from app.database import get_db
 from app.schemas.seller import (
     SellerProfileCreate, 
     SellerProfileUpdate, 
-    SellerProfileResponse
+    SellerProfileResponse,
+    BulkFulfillmentRequest,
+    BulkFulfillmentResult
 )
 from app.models.seller import SellerProfile, ApprovalStatus
 from app.models.user import User
-from app.models.order import OrderItem, Order
+from app.models.order import OrderItem, Order, OrderStatus
 from app.middleware.auth_middleware import get_current_user, get_current_seller
+from app.services.aggregate_service import AggregateService
+from app.services.settings_registry import platform_settings
+from app.services.fulfillment_service import FulfillmentService, StatusNotification
+from app.utils.serialization import FastJSONResponse
 from typing import List
 
 router = APIRouter(prefix="/sellers", tags=["Sellers"])
@@ -41,6 +47,7 @@ async def create_seller_profile(
         business_description=profile_data.business_description,
         business_address=profile_data.business_address,
         tax_id=profile_data.tax_id,
+        commission_rate=platform_settings.default_commission_rate,
         approval_status=ApprovalStatus.PENDING
     )
     
@@ -132,53 +139,55 @@ async def get_seller_dashboard(
     current_user: User = Depends(get_current_seller),
     db: Session = Depends(get_db)
 ):
-    """Get seller dashboard stats"""
+    """
+    Get seller dashboard stats
     
-    from app.models.product import Product
-    from sqlalchemy import func
+    Sales and rating figures come from the rollups maintained by
+    AggregateService; counts are indexed subqueries in the same row read.
+    """
     
-    profile = db.query(SellerProfile).filter(
+    from app.models.product import Product
+    from sqlalchemy import func, select
+    
+    total_products = select(func.count(Product.id)).where(
+        Product.seller_id == SellerProfile.id
+    ).correlate(SellerProfile).scalar_subquery()
+    
+    total_orders = select(func.count(OrderItem.id)).where(
+        OrderItem.seller_id == SellerProfile.id
+    ).correlate(SellerProfile).scalar_subquery()
+    
+    pending_orders = select(func.count(OrderItem.id)).where(
+        OrderItem.seller_id == SellerProfile.id,
+        OrderItem.status == OrderStatus.PENDING
+    ).correlate(SellerProfile).scalar_subquery()
+    
+    row = db.query(
+        SellerProfile,
+        total_products.label("total_products"),
+        total_orders.label("total_orders"),
+        pending_orders.label("pending_orders")
+    ).filter(
         SellerProfile.user_id == current_user.id
     ).first()
     
-    if not profile:
+    if not row:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
             detail="Seller profile not found"
         )
     
-    # Get product count
-    total_products = db.query(Product).filter(
-        Product.seller_id == profile.id
-    ).count()
-    
-    # Get order stats
-    total_orders = db.query(OrderItem).filter(
-        OrderItem.seller_id == profile.id
-    ).count()
-    
-    pending_orders = db.query(OrderItem).filter(
-        OrderItem.seller_id == profile.id,
-        OrderItem.status == 'pending'
-    ).count()
-    
-    # Calculate total sales from order items
-    total_sales_result = db.query(func.sum(OrderItem.seller_earning)).filter(
-        OrderItem.seller_id == profile.id,
-        OrderItem.status.in_(['delivered', 'shipped', 'confirmed', 'processing'])
-    ).scalar()
-    
-    total_sales = float(total_sales_result) if total_sales_result else 0.0
+    profile = row.SellerProfile
     
     return {
         "profile": SellerProfileResponse.model_validate(profile),
         "stats": {
-            "total_products": total_products,
-            "total_orders": total_orders,
-            "pending_orders": pending_orders,
-            "total_sales": total_sales,
-            "rating": float(profile.rating_average),
-            "total_reviews": profile.total_reviews
+            "total_products": row.total_products,
+            "total_orders": row.total_orders,
+            "pending_orders": row.pending_orders,
+            "total_sales": float(profile.total_sales or 0),
+            "rating": float(profile.rating_average or 0),
+            "total_reviews": profile.total_reviews or 0
         }
     }
 
@@ -244,7 +253,7 @@ async def get_seller_orders(
             "notes": order.notes
         })
     
-    return result
+    return FastJSONResponse(result)
 
 
 @router.get("/orders/{order_item_id}")
@@ -334,6 +343,52 @@ async def get_seller_order_detail(
     }
 
 
+async def send_status_notifications(notifications: List[StatusNotification]) -> None:
+    """Email each customer once about their order's new status (runs after the response)"""
+    from app.services.email_service import email_service
+    
+    for notification in notifications:
+        try:
+            await email_service.send_order_status_update_email(**notification._asdict())
+        except Exception as e:
+            print(f"Failed to send status update email: {e}")
+
+
+@router.post("/orders/bulk-status", response_model=BulkFulfillmentResult)
+async def bulk_update_order_status(
+    bulk_data: BulkFulfillmentRequest,
+    background_tasks: BackgroundTasks,
+    current_user: User = Depends(get_current_seller),
+    db: Session = Depends(get_db)
+):
+    """
+    Update the status of many order items at once
+    
+    - Same transitions as the single-item endpoint; shipped needs a tracking number
+    - Invalid updates are reported in `errors`; the rest are applied
+    - Cancelled items are restocked
+    - Customers get one status email per order, sent after the response
+    """
+    
+    profile = db.query(SellerProfile).filter(
+        SellerProfile.user_id == current_user.id
+    ).first()
+    
+    if not profile:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Seller profile not found. Please create a seller profile first."
+        )
+    
+    updated, orders_updated, errors, notifications = FulfillmentService(db).apply(profile.id, bulk_data.updates)
+    db.commit()
+    
+    if notifications:
+        background_tasks.add_task(send_status_notifications, notifications)
+    
+    return BulkFulfillmentResult(updated=updated, orders_updated=orders_updated, errors=errors)
+
+
 @router.put("/orders/{order_item_id}/status")
 async def update_order_status(
     order_item_id: str,
@@ -389,8 +444,8 @@ async def update_order_status(
             detail=f"Cannot transition from {order_item.status} to {new_status}"
         )
     
-    # Update status
-    order_item.status = new_status
+    # Update status (and the seller's sales rollup)
+    AggregateService(db).set_order_item_statuses([order_item], new_status)
     order = order_item.order
     buyer = order.buyer
     
@@ -7,7 +7,9 @@ e-commerce platform. Users can save products to their wishlist for future refere
 quick access.
 
 Endpoints:
-    - GET /wishlist: Retrieve all wishlist items for the authenticated user
+    - GET /wishlist: Retrieve a page of wishlist items for the authenticated user
+    - GET /wishlist/count: Number of items in the wishlist (navbar badge)
+    - POST /wishlist/check: Check up to 100 products against the wishlist in one query
     - POST /wishlist/{product_id}: Add a product to the user's wishlist  
     - DELETE /wishlist/{product_id}: Remove a product from the user's wishlist
     - GET /wishlist/check/{product_id}: Check if a product exists in the user's wishlist
@@ -16,7 +18,8 @@ Authentication:
     All endpoints require valid JWT authentication via the get_current_user dependency.
 """
 
-from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi import APIRouter, Depends, HTTPException, status, Query
+from sqlalchemy import func
 from sqlalchemy.orm import Session
 from typing import List
 from uuid import UUID
@@ -26,7 +29,14 @@ from app.models.user import User
 from app.models.wishlist import WishlistItem
 from app.models.product import Product, ProductImage
 from app.middleware.auth_middleware import get_current_user
-from app.schemas.wishlist import WishlistItemCreate, WishlistItemResponse, WishlistItemWithProduct
+from app.utils.serialization import list_response
+from app.schemas.wishlist import (
+    WishlistItemCreate,
+    WishlistItemResponse,
+    WishlistItemWithProduct,
+    WishlistBulkCheckRequest,
+    WishlistBulkCheckResponse
+)
 
 
 # Create API router with wishlist tag for documentation grouping
@@ -35,16 +45,22 @@ router = APIRouter(prefix="/wishlist", tags=["Wishlist"])
 
 @router.get("", response_model=List[WishlistItemWithProduct])
 async def get_wishlist(
+    skip: int = Query(default=0, ge=0),
+    limit: int = Query(default=50, ge=1, le=100),
     db: Session = Depends(get_db),
     current_user: User = Depends(get_current_user)
 ):
     """
-    Retrieve all wishlist items for the authenticated user.
+    Retrieve a page of wishlist items for the authenticated user.
     
-    This endpoint returns a list of products saved to the user's wishlist,
-    with full product details included (images, price, stock, ratings).
+    This endpoint returns the products saved to the user's wishlist, newest
+    first, with full product details included (images, price, stock, ratings).
+    Items and products are loaded with a single join and all images for the
+    page with one additional query, so the cost does not grow with page size.
     
     Args:
+        skip: Number of wishlist items to skip (for pagination)
+        limit: Maximum number of wishlist items to return (1-100)
         db: Database session dependency
         current_user: Authenticated user from JWT token
         
@@ -59,44 +75,118 @@ async def get_wishlist(
     Raises:
         No exceptions - returns empty list if no wishlist items exist
     """
-    # Query all wishlist items belonging to the current user
-    wishlist_items = db.query(WishlistItem).filter(
+    # Load wishlist items together with their products in one query
+    rows = db.query(WishlistItem, Product).join(
+        Product, Product.id == WishlistItem.product_id
+    ).filter(
         WishlistItem.user_id == current_user.id
-    ).all()
+    ).order_by(
+        WishlistItem.created_at.desc(), WishlistItem.id
+    ).offset(skip).limit(limit).all()
+    
+    if not rows:
+        return []
+    
+    # Load the images for every product on this page in one query
+    product_ids = [product.id for _, product in rows]
+    images_by_product = {}
+    images = db.query(ProductImage.product_id, ProductImage.image_url, ProductImage.thumbnail_url).filter(
+        ProductImage.product_id.in_(product_ids)
+    ).order_by(ProductImage.product_id, ProductImage.position).all()
+    for image in images:
+        images_by_product.setdefault(image.product_id, []).append(image)
     
     result = []
-    # Enrich each wishlist item with full product details
-    for item in wishlist_items:
-        product = db.query(Product).filter(Product.id == item.product_id).first()
-        if product:
-            # Query images separately to avoid lazy loading issues
-            images = db.query(ProductImage).filter(
-                ProductImage.product_id == product.id
-            ).order_by(ProductImage.position).all()
-            
-            # Build product data with explicit image handling
-            product_data = {
-                "id": str(product.id),
-                "name": product.name,
-                "price": float(product.price),
-                "quantity": product.quantity,
-                "images": [img.image_url for img in images] if images else [],
-                "primary_image": images[0].image_url if images else None,
-                "rating_average": float(product.rating_average) if product.rating_average else 0.0,
-                "total_reviews": product.total_reviews if product.total_reviews else 0,
-                "is_active": product.is_active
-            }
-            
-            # Build the response directly
-            result.append(WishlistItemWithProduct(
-                id=item.id,
-                user_id=item.user_id,
-                product_id=item.product_id,
-                created_at=item.created_at,
-                product=product_data
-            ))
-    
-    return result
+    for item, product in rows:
+        product_images = images_by_product.get(product.id, [])
+        image_urls = [image.image_url for image in product_images]
+        
+        # Build product data with explicit image handling
+        product_data = {
+            "id": str(product.id),
+            "name": product.name,
+            "price": float(product.price),
+            "quantity": product.quantity,
+            "images": image_urls,
+            "primary_image": (product_images[0].thumbnail_url or image_urls[0]) if product_images else None,
+            "rating_average": float(product.rating_average) if product.rating_average else 0.0,
+            "total_reviews": product.total_reviews if product.total_reviews else 0,
+            "is_active": product.is_active
+        }
+        
+        result.append({
+            "id": item.id,
+            "user_id": item.user_id,
+            "product_id": item.product_id,
+            "created_at": item.created_at,
+            "product": product_data
+        })
+    
+    # Validated once and serialized directly (no response_model revalidation)
+    return list_response(WishlistItemWithProduct, result)
+
+
+@router.get("/count")
+async def get_wishlist_count(
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_user)
+):
+    """
+    Count the items in the authenticated user's wishlist.
+    
+    Lets the navbar badge show the full count without loading the items,
+    whose listing is paginated.
+    
+    Args:
+        db: Database session dependency
+        current_user: Authenticated user from JWT token
+        
+    Returns:
+        Dictionary with key:
+        - count: Number of wishlist items
+    """
+    count = db.query(func.count(WishlistItem.id)).filter(
+        WishlistItem.user_id == current_user.id
+    ).scalar()
+    
+    return {"count": count or 0}
+
+
+@router.post("/check", response_model=WishlistBulkCheckResponse)
+async def check_wishlist_bulk(
+    check_data: WishlistBulkCheckRequest,
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_user)
+):
+    """
+    Check which of a set of products are in the user's wishlist.
+    
+    Product grids use this to fill every heart icon on a page with one
+    request and one query, instead of calling GET /wishlist/check/{product_id}
+    once per product card.
+    
+    Args:
+        check_data: Request body with up to 100 product UUIDs
+        db: Database session dependency
+        current_user: Authenticated user from JWT token
+        
+    Returns:
+        WishlistBulkCheckResponse mapping every requested product ID to
+        true (saved) or false (not saved)
+    """
+    product_ids = list(dict.fromkeys(check_data.product_ids))
+    
+    saved_ids = {
+        row.product_id
+        for row in db.query(WishlistItem.product_id).filter(
+            WishlistItem.user_id == current_user.id,
+            WishlistItem.product_id.in_(product_ids)
+        ).all()
+    }
+    
+    return WishlistBulkCheckResponse(
+        in_wishlist={product_id: product_id in saved_ids for product_id in product_ids}
+    )
 
 
 @router.post("/{product_id}", response_model=WishlistItemResponse, status_code=status.HTTP_201_CREATED)
@@ -18,9 +18,35 @@ class Settings(BaseSettings):
     STRIPE_SECRET_KEY: str
     STRIPE_WEBHOOK_SECRET: str
     
-    # Platform
+    # Payment gateway: "stripe", or "fake" for offline runs and load tests
+    PAYMENT_GATEWAY: str = "stripe"
+    STRIPE_API_BASE: str = "https://api.stripe.com/v1"
+    STRIPE_TIMEOUT_SECONDS: float = 10.0
+    STRIPE_CONNECT_TIMEOUT_SECONDS: float = 3.0
+    STRIPE_MAX_RETRIES: int = 2
+    STRIPE_CIRCUIT_FAILURE_THRESHOLD: int = 5  # Consecutive failures before failing fast
+    STRIPE_CIRCUIT_RESET_SECONDS: float = 30.0
+    PAYMENT_FAKE_AUTO_SUCCEED: bool = True
+    PAYMENT_FAKE_LATENCY_MS: int = 0
+    
+    # Webhook queue (events are stored on receipt and processed in the background)
+    WEBHOOK_WORKER_ENABLED: bool = True
+    WEBHOOK_POLL_SECONDS: float = 5.0
+    WEBHOOK_BATCH_SIZE: int = 50
+    WEBHOOK_MAX_ATTEMPTS: int = 8
+    
+    # Platform (defaults for settings missing from the platform_settings table)
     PLATFORM_COMMISSION_RATE: float = 10.0
     LOW_STOCK_THRESHOLD: int = 5
+    PLATFORM_SETTINGS_POLL_SECONDS: float = 5.0  # How often each process checks for settings changes
+    SETTINGS_AUDIT_RETENTION_DAYS: int = 365  # Older audit entries are moved to the archive table
+    CART_QUOTE_CACHE_SECONDS: float = 5.0  # Quotes of an unchanged cart are reused this long
+    
+    # Stock reservations (unpaid orders hold stock until they expire)
+    STOCK_RESERVATION_MINUTES: int = 30
+    RESERVATION_SWEEPER_ENABLED: bool = True
+    RESERVATION_SWEEP_SECONDS: float = 60.0
+    RESERVATION_SWEEP_BATCH_SIZE: int = 200
     
     # Environment
     ENVIRONMENT: str = "development"
@@ -49,9 +75,40 @@ class Settings(BaseSettings):
     # Frontend URL (for email links)
     FRONTEND_URL: str = "http://localhost:5173"
     
+    # Public order tracking limits (per worker process)
+    TRACK_ORDER_IP_RATE_PER_MINUTE: int = 30
+    TRACK_ORDER_NUMBER_RATE_PER_MINUTE: int = 10  # Per order number and email pair
+    TRUSTED_PROXY_HOPS: int = 0  # Reverse proxies in front of the app whose X-Forwarded-For is trusted (1 on Render)
+    
+    # Idempotency keys (retried POSTs replay the stored response)
+    IDEMPOTENCY_KEY_TTL_HOURS: int = 24
+    IDEMPOTENCY_LOCK_SECONDS: int = 60  # In-progress keys older than this can be taken over
+    
+    # Media storage (product image originals and WebP derivatives)
+    MEDIA_ROOT: str = "media"
+    MEDIA_URL: str = "/media"
+    IMAGE_WORKERS: int = 2  # Processes used for thumbnail rendering
+    MEDIA_MAX_UPLOAD_BYTES: int = 10 * 1024 * 1024
+    MEDIA_ORPHAN_GRACE_HOURS: int = 24  # Unreferenced uploads are kept this long
+    
     # Logging
     LOG_LEVEL: str = "INFO"  # Can be: DEBUG, INFO, WARNING, ERROR, CRITICAL
-    LOG_SQL_QUERIES: bool = False  # Set to True to see all SQL queries
+    LOG_SQL_QUERIES: bool = False  # Set to True to log every SQL query with its duration
+    SLOW_REQUEST_MS: float = 500.0  # Requests slower than this are logged with their SQL stats
+    SQL_REPEATED_STATEMENT_THRESHOLD: int = 10  # Same statement this often in one request is logged as a likely N+1
+    
+    # Metrics (GET /metrics, Prometheus text format)
+    METRICS_ENABLED: bool = True
+    METRICS_DIR: str = "/tmp/shopnest-metrics"  # Per-worker snapshots, merged on scrape; must be shared by all workers
+    METRICS_FLUSH_SECONDS: float = 10.0  # How often each worker writes its snapshot
+    METRICS_TOKEN: str = ""  # If set, scrapes must send `Authorization: Bearer <token>`; required in production
+    
+    # Request profiler (admins send `X-Profile: 1`; see app/middleware/profiler_middleware.py)
+    PROFILING_ENABLED: bool = False  # When False the middleware is not installed at all
+    PROFILE_SAMPLE_RATE: float = 0.0  # Share of all requests profiled and stored (0.01 = 1%)
+    PROFILE_INTERVAL_MS: float = 5.0  # Stack sampling interval
+    PROFILE_FORMAT: str = "speedscope"  # speedscope or collapsed
+    PROFILE_DIR: str = "profiles"
     
     class Config:
         env_file = ".env"
@@ -3,13 +3,20 @@ from sqlalchemy.ext.declarative import declarative_base
 from sqlalchemy.orm import sessionmaker
 from app.config import settings
 
+from app.utils import metrics, query_stats
+
 # Create database engine
 engine = create_engine(
     settings.DATABASE_URL,
-    pool_pre_ping=True,
-    echo=settings.DEBUG
+    pool_pre_ping=True
 )
 
+# Per-request query counts and timings (and LOG_SQL_QUERIES logging)
+query_stats.install(engine)
+
+# Pool size, checked out and overflow connections in GET /metrics
+metrics.watch_pool(engine)
+
 # Create SessionLocal class
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
 
@@ -1,8 +1,25 @@
-from fastapi import FastAPI
+from fastapi import FastAPI, HTTPException, Request, status
+from fastapi.responses import PlainTextResponse
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.staticfiles import StaticFiles
+import hmac
 import logging
+import os
 from app.config import settings
-from app.api import auth, sellers, admin, categories, products, orders, payments, reviews, platform_settings, recommendations, wishlist
+from app.api import auth, sellers, admin, categories, products, orders, payments, reviews, platform_settings, recommendations, wishlist, media, cart
+from app.services.image_service import shutdown_pool
+from app.services.payment_gateway import close_payment_gateway
+from app.services.webhook_service import start_webhook_worker, stop_webhook_worker
+from app.services.inventory_service import start_reservation_sweeper, stop_reservation_sweeper
+from app.middleware.query_stats_middleware import QueryStatsMiddleware
+from app.middleware.metrics_middleware import MetricsMiddleware
+from app.middleware.profiler_middleware import ProfilerMiddleware
+from app.utils import metrics
+from app.database import SessionLocal
+from app.models.webhook_event import WebhookEvent
+from app.models.stock_reservation import StockReservation
+from sqlalchemy import func
+from starlette.concurrency import run_in_threadpool
 
 # Configure uvicorn access logger to filter out /health requests
 class HealthCheckLogFilter(logging.Filter):
@@ -11,7 +28,7 @@ class HealthCheckLogFilter(logging.Filter):
         if hasattr(record, 'args') and len(record.args) >= 3:
             # Check if the request path is /health
             request_line = record.args[0] if isinstance(record.args[0], str) else ''
-            if '/health' in request_line:
+            if '/health' in request_line or '/metrics' in request_line:
                 return False
         return True
 
@@ -36,8 +53,21 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=["X-Next-Cursor", "Server-Timing", "X-Profile-Id"],  # Keyset pagination cursor, SQL timings, profile id
 )
 
+# Admin on-demand / sampled request profiles; installed inside QueryStatsMiddleware
+# so profiles can be labelled with the request's SQL stats
+if settings.PROFILING_ENABLED:
+    app.add_middleware(ProfilerMiddleware)
+
+# Per-request SQL counts and timings (Server-Timing header, slow request and N+1 logs)
+app.add_middleware(QueryStatsMiddleware)
+
+# Per-route latency, status codes and in-flight requests for GET /metrics
+if settings.METRICS_ENABLED:
+    app.add_middleware(MetricsMiddleware)
+
 # Include routers
 app.include_router(auth.router, prefix="/api")
 app.include_router(sellers.router, prefix="/api")
@@ -50,6 +80,39 @@ app.include_router(payments.router, prefix="/api")
 app.include_router(reviews.router, prefix="/api")
 app.include_router(recommendations.router, prefix="/api")  # Product recommendations
 app.include_router(wishlist.router, prefix="/api")  # Wishlist endpoints
+app.include_router(media.router, prefix="/api")  # Image uploads and blob serving
+app.include_router(cart.router, prefix="/api")  # Server-side cart and checkout quotes
+
+# Rendered product image derivatives. Only this subtree is public: downloaded
+# originals (MEDIA_ROOT/originals) are unverified remote bytes, and blobs are
+# served by /api/media with their checked content type
+products_media = os.path.join(settings.MEDIA_ROOT, "products")
+os.makedirs(products_media, exist_ok=True)
+app.mount(f"{settings.MEDIA_URL.rstrip('/')}/products", StaticFiles(directory=products_media), name="media")
+
+
+@app.on_event("shutdown")
+def stop_image_workers():
+    shutdown_pool()
+
+
+@app.on_event("shutdown")
+async def close_gateway_connections():
+    await close_payment_gateway()
+
+
+@app.on_event("startup")
+async def start_background_workers():
+    start_webhook_worker()
+    start_reservation_sweeper()
+    metrics.start_metrics_writer()
+
+
+@app.on_event("shutdown")
+async def stop_background_workers():
+    await stop_webhook_worker()
+    await stop_reservation_sweeper()
+    await metrics.stop_metrics_writer()
 
 
 @app.get("/")
@@ -73,4 +136,47 @@ async def health_check():
         "service": "ShopNest API",
         "timestamp": datetime.utcnow().isoformat(),
         "environment": settings.ENVIRONMENT
-    }
\ No newline at end of file
+    }
+
+
+def _queue_depths():
+    """Work waiting in database-backed queues, read once per scrape"""
+    db = SessionLocal()
+    try:
+        webhooks = db.query(WebhookEvent.status, func.count(WebhookEvent.id)).filter(
+            WebhookEvent.status.in_(("pending", "processing", "failed"))
+        ).group_by(WebhookEvent.status).all()
+        holds = db.query(func.count(StockReservation.id)).filter(StockReservation.status == "held").scalar()
+    finally:
+        db.close()
+    
+    return {
+        "webhook_events_queued": (
+            "Stored Stripe events by processing status",
+            {(("status", event_status),): count for event_status, count in webhooks}
+        ),
+        "stock_reservations_held": ("Stock holds of unpaid orders", {(): holds or 0}),
+    }
+
+
+@app.get("/metrics", response_class=PlainTextResponse, include_in_schema=False)
+async def prometheus_metrics(request: Request):
+    """
+    Prometheus scrape endpoint, merged across all workers.
+    Protected by a bearer token when METRICS_TOKEN is set; in production
+    the endpoint is disabled unless a token is configured.
+    """
+    if not settings.METRICS_ENABLED or (settings.ENVIRONMENT == "production" and not settings.METRICS_TOKEN):
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Not Found")
+    if settings.METRICS_TOKEN and not hmac.compare_digest(
+        request.headers.get("authorization", "").encode(), f"Bearer {settings.METRICS_TOKEN}".encode()
+    ):
+        raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="Invalid metrics token")
+    
+    try:
+        extra_gauges = await run_in_threadpool(_queue_depths)
+    except Exception:
+        # Still serve the in-process metrics when the database is down
+        extra_gauges = {}
+    body = await run_in_threadpool(metrics.render, extra_gauges)
+    return PlainTextResponse(body, media_type="text/plain; version=0.0.4")
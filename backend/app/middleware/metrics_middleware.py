@@ -0,0 +1,48 @@
+"""
+HTTP metrics middleware.
+
+Records, per worker (see app/utils/metrics.py):
+- http_requests_total by method, route template and status code
+- http_request_duration_seconds histogram by method and route template
+- http_requests_in_flight
+
+Routes are labelled by their template (/api/products/{product_id}), never
+the raw path, so label cardinality stays bounded. Plain ASGI middleware.
+"""
+
+import time
+
+from app.utils.metrics import http_in_flight, http_latency, http_requests
+
+
+class MetricsMiddleware:
+    def __init__(self, app):
+        self.app = app
+    
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        
+        started = time.perf_counter()
+        status_code = [500]
+        finished = []
+        
+        async def send_with_status(message):
+            if message["type"] == "http.response.start":
+                status_code[0] = message["status"]
+            elif message["type"] == "http.response.body" and not message.get("more_body", False):
+                finished.append(time.perf_counter())
+            await send(message)
+        
+        http_in_flight.inc()
+        try:
+            await self.app(scope, receive, send_with_status)
+        finally:
+            http_in_flight.dec()
+            end = finished[0] if finished else time.perf_counter()
+            # The router stores the matched route in the scope; unmatched paths share one label
+            route = getattr(scope.get("route"), "path", None) or "unmatched"
+            method = scope.get("method", "")
+            http_requests.inc(method=method, route=route, status=status_code[0])
+            http_latency.observe(end - started, method=method, route=route)
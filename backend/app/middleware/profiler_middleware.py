@@ -0,0 +1,109 @@
+"""
+On-demand request profiler middleware.
+
+Profiles single requests with the stack sampler in app/utils/profiler.py:
+- on demand: an active admin sends `X-Profile: 1` (or `speedscope` /
+  `collapsed` to pick the format) with their bearer token; the response
+  carries `X-Profile-Id`, downloadable from GET /api/admin/profiles/{id}
+- sampled: PROFILE_SAMPLE_RATE of all requests are profiled and stored
+
+Profiles are written to PROFILE_DIR and labelled with the method, route
+template, duration and SQL count/time of the request.
+
+Only installed when PROFILING_ENABLED is set, so it costs nothing otherwise.
+"""
+
+import logging
+import random
+import time
+import uuid
+from datetime import datetime
+from typing import Optional
+
+from starlette.concurrency import run_in_threadpool
+
+from app.config import settings
+from app.database import SessionLocal
+from app.models.user import User, UserRole
+from app.utils.profiler import FORMATS, StackSampler, save_profile
+from app.utils.query_stats import current_stats
+from app.utils.security import verify_token
+
+logger = logging.getLogger("app.performance")
+
+PROFILE_HEADER = b"x-profile"
+
+
+def _is_admin(authorization: Optional[str]) -> bool:
+    """Whether the bearer token belongs to an active admin"""
+    if not authorization or not authorization.lower().startswith("bearer "):
+        return False
+    payload = verify_token(authorization[7:].strip(), token_type="access")
+    if not payload or not payload.get("sub"):
+        return False
+    
+    db = SessionLocal()
+    try:
+        user = db.query(User).filter(User.id == payload["sub"]).first()
+        return bool(user and user.is_active and user.role == UserRole.ADMIN)
+    except Exception:
+        return False
+    finally:
+        db.close()
+
+
+class ProfilerMiddleware:
+    def __init__(self, app):
+        self.app = app
+    
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        
+        headers = dict(scope.get("headers") or [])
+        requested = headers.get(PROFILE_HEADER)
+        output_format = settings.PROFILE_FORMAT
+        
+        if requested is not None:
+            requested = requested.decode("latin-1").strip().lower()
+            if requested in FORMATS:
+                output_format = requested
+            authorization = headers.get(b"authorization", b"").decode("latin-1")
+            if not await run_in_threadpool(_is_admin, authorization):
+                # Not an admin: serve the request as if the header was absent
+                requested = None
+        
+        if requested is None and not (settings.PROFILE_SAMPLE_RATE and random.random() < settings.PROFILE_SAMPLE_RATE):
+            await self.app(scope, receive, send)
+            return
+        
+        profile_id = f"{datetime.utcnow():%Y%m%dT%H%M%S}-{uuid.uuid4().hex[:12]}"
+        
+        async def send_with_profile_id(message):
+            if message["type"] == "http.response.start" and requested is not None:
+                message["headers"] = list(message.get("headers", [])) + [(b"x-profile-id", profile_id.encode())]
+            await send(message)
+        
+        sampler = StackSampler(scope)
+        started = time.perf_counter()
+        sampler.start()
+        try:
+            await self.app(scope, receive, send_with_profile_id)
+        finally:
+            sampler.stop()
+            elapsed_ms = (time.perf_counter() - started) * 1000
+            await self._save(scope, profile_id, sampler, output_format, elapsed_ms)
+    
+    async def _save(self, scope, profile_id: str, sampler: StackSampler, output_format: str, elapsed_ms: float) -> None:
+        route = getattr(scope.get("route"), "path", None) or scope.get("path", "")
+        label = f"{scope.get('method', '')} {route} {elapsed_ms:.0f}ms"
+        stats = current_stats()
+        if stats is not None:
+            label += f", {stats.count} queries, {stats.total_ms:.0f}ms SQL"
+        
+        try:
+            path = await run_in_threadpool(save_profile, profile_id, sampler, output_format, label, elapsed_ms)
+            logger.info(f"Profile {profile_id} of {label} saved to {path}")
+        except Exception as e:
+            logger.error(f"Could not save profile {profile_id}: {e}")
@@ -0,0 +1,81 @@
+"""
+SQL instrumentation middleware.
+
+Tracks the SQL run by each HTTP request (see app/utils/query_stats.py) and:
+- adds `Server-Timing: db;dur=<ms>;desc="<n> queries", app;dur=<ms>` to the
+  response when DEBUG is on or the caller is an admin (role claim of their
+  access token, so no database lookup), never to other clients
+- logs requests slower than SLOW_REQUEST_MS with their query count and DB time
+- logs statements repeated SQL_REPEATED_STATEMENT_THRESHOLD times or more (likely N+1)
+
+Plain ASGI middleware, so it adds no task or body buffering per request.
+"""
+
+import logging
+import time
+
+from app.config import settings
+from app.models.user import UserRole
+from app.utils.query_stats import start_tracking, stop_tracking
+from app.utils.security import verify_token
+
+logger = logging.getLogger("app.performance")
+
+
+def _sends_timing(scope) -> bool:
+    if settings.DEBUG:
+        return True
+    authorization = dict(scope.get("headers") or []).get(b"authorization", b"").decode("latin-1")
+    if not authorization.lower().startswith("bearer "):
+        return False
+    payload = verify_token(authorization[7:].strip(), token_type="access")
+    return bool(payload and payload.get("role") == UserRole.ADMIN.value)
+
+
+class QueryStatsMiddleware:
+    def __init__(self, app):
+        self.app = app
+    
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        
+        with_timing = _sends_timing(scope)
+        stats, token = start_tracking()
+        started = time.perf_counter()
+        # Response time, excluding background tasks that run after the body is sent
+        finished = []
+        
+        async def send_with_timing(message):
+            if message["type"] == "http.response.start" and with_timing:
+                elapsed_ms = (time.perf_counter() - started) * 1000
+                timing = f'db;dur={stats.total_ms:.1f};desc="{stats.count} queries", app;dur={elapsed_ms:.1f}'
+                message["headers"] = list(message.get("headers", [])) + [(b"server-timing", timing.encode())]
+            elif message["type"] == "http.response.body" and not message.get("more_body", False):
+                finished.append(time.perf_counter())
+            await send(message)
+        
+        try:
+            await self.app(scope, receive, send_with_timing)
+        finally:
+            stop_tracking(token)
+            end = finished[0] if finished else time.perf_counter()
+            self._report(scope, stats, (end - started) * 1000)
+    
+    def _report(self, scope, stats, elapsed_ms: float) -> None:
+        if not stats.count:
+            return
+        
+        route = scope.get("route")
+        path = getattr(route, "path", None) or scope.get("path", "")
+        name = f"{scope.get('method', '')} {path}"
+        
+        for statement, count in stats.repeated():
+            logger.warning(f"Possible N+1 in {name}: statement run {count}x: {' '.join(statement.split())[:300]}")
+        
+        if elapsed_ms >= settings.SLOW_REQUEST_MS:
+            logger.warning(
+                f"Slow request {name}: {elapsed_ms:.0f}ms total, "
+                f"{stats.count} queries, {stats.total_ms:.0f}ms in database"
+            )
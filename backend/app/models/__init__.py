@@ -3,7 +3,11 @@ from .seller import SellerProfile, ApprovalStatus
 from .category import Category
 from .product import Product, ProductImage
 from .order import Order, OrderItem, OrderStatus, PaymentStatus
-from .review import Review
+from .review import Review, ReviewVote
+from .idempotency import IdempotencyKey
+from .webhook_event import WebhookEvent
+from .cart import Cart, CartItem
+from .stock_reservation import StockReservation
 
 __all__ = [
     "User", 
@@ -17,5 +21,11 @@ __all__ = [
     "OrderItem",
     "OrderStatus",
     "PaymentStatus",
-    "Review"
+    "Review",
+    "ReviewVote",
+    "IdempotencyKey",
+    "WebhookEvent",
+    "Cart",
+    "CartItem",
+    "StockReservation"
 ]
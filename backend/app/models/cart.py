@@ -0,0 +1,44 @@
+from sqlalchemy import Column, Integer, DateTime, ForeignKey, UniqueConstraint
+from sqlalchemy.dialects.postgresql import UUID
+from sqlalchemy.orm import relationship
+from sqlalchemy.sql import func
+import uuid
+from app.database import Base
+
+
+class Cart(Base):
+    """One server-side cart per user; `version` is bumped on every change"""
+    __tablename__ = "carts"
+
+    id = Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
+    user_id = Column(UUID(as_uuid=True), ForeignKey("users.id", ondelete="CASCADE"), nullable=False, unique=True)
+    version = Column(Integer, nullable=False, default=1)
+    created_at = Column(DateTime(timezone=True), server_default=func.now())
+    updated_at = Column(DateTime(timezone=True), server_default=func.now(), onupdate=func.now())
+
+    # Relationships
+    items = relationship("CartItem", back_populates="cart", cascade="all, delete-orphan", order_by="CartItem.added_at")
+
+    def __repr__(self):
+        return f"<Cart user={self.user_id} v{self.version}>"
+
+
+class CartItem(Base):
+    __tablename__ = "cart_items"
+
+    id = Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
+    cart_id = Column(UUID(as_uuid=True), ForeignKey("carts.id", ondelete="CASCADE"), nullable=False)
+    product_id = Column(UUID(as_uuid=True), ForeignKey("products.id", ondelete="CASCADE"), nullable=False)
+    quantity = Column(Integer, nullable=False)
+    added_at = Column(DateTime(timezone=True), server_default=func.now())
+
+    # One line per product; also serves loading a cart's items
+    __table_args__ = (
+        UniqueConstraint('cart_id', 'product_id', name='uq_cart_items_cart_product'),
+    )
+
+    # Relationships
+    cart = relationship("Cart", back_populates="items")
+
+    def __repr__(self):
+        return f"<CartItem cart={self.cart_id} product={self.product_id} x{self.quantity}>"
@@ -1,4 +1,4 @@
-from sqlalchemy import Column, String, Text, Boolean, DateTime, ForeignKey
+from sqlalchemy import Column, String, Text, Boolean, DateTime, ForeignKey, Index
 from sqlalchemy.dialects.postgresql import UUID
 from sqlalchemy.sql import func
 from sqlalchemy.orm import relationship
@@ -19,6 +19,11 @@ class Category(Base):
     created_at = Column(DateTime(timezone=True), server_default=func.now())
     updated_at = Column(DateTime(timezone=True), onupdate=func.now())
     
+    # Prefix lookups (slug LIKE 'base-%') for slug allocation
+    __table_args__ = (
+        Index('ix_categories_slug_pattern', 'slug', postgresql_ops={'slug': 'text_pattern_ops'}),
+    )
+    
     # Relationships
     products = relationship("Product", back_populates="category")
 
@@ -0,0 +1,37 @@
+from sqlalchemy import Column, String, Integer, DateTime, ForeignKey, JSON, Index, UniqueConstraint
+from sqlalchemy.dialects.postgresql import UUID
+from sqlalchemy.sql import func
+import uuid
+from app.database import Base
+
+
+class IdempotencyKey(Base):
+    """
+    A client-supplied Idempotency-Key and the response it produced.
+    
+    Keys are scoped per user and endpoint. While the original request runs
+    the row has no response; once it completes, retries with the same key
+    get the stored response instead of repeating the work.
+    """
+    __tablename__ = "idempotency_keys"
+    
+    id = Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
+    user_id = Column(UUID(as_uuid=True), ForeignKey("users.id", ondelete="CASCADE"), nullable=False)
+    endpoint = Column(String(100), nullable=False)
+    key = Column(String(255), nullable=False)
+    request_hash = Column(String(64), nullable=False)  # SHA-256 of the request body
+    
+    # Stored response (NULL while the request is in progress)
+    response_status = Column(Integer)
+    response_body = Column(JSON)
+    
+    created_at = Column(DateTime(timezone=True), server_default=func.now())
+    expires_at = Column(DateTime(timezone=True), nullable=False)
+    
+    __table_args__ = (
+        UniqueConstraint('user_id', 'endpoint', 'key', name='uq_idempotency_keys_user_endpoint_key'),
+        Index('ix_idempotency_keys_expires_at', 'expires_at'),
+    )
+    
+    def __repr__(self):
+        return f"<IdempotencyKey {self.endpoint} {self.key}>"
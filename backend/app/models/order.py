@@ -1,4 +1,4 @@
-from sqlalchemy import Column, String, Numeric, Integer, Boolean, DateTime, Enum as SQLEnum, ForeignKey, Text, JSON
+from sqlalchemy import Column, String, Numeric, Integer, Boolean, DateTime, Enum as SQLEnum, ForeignKey, Text, JSON, Index
 from sqlalchemy.dialects.postgresql import UUID
 from sqlalchemy.orm import relationship
 from sqlalchemy.sql import func
@@ -62,6 +62,11 @@ class Order(Base):
     created_at = Column(DateTime(timezone=True), server_default=func.now())
     updated_at = Column(DateTime(timezone=True), onupdate=func.now())
     
+    # Buyer order history (keyset-paginated by created_at, id)
+    __table_args__ = (
+        Index('ix_orders_buyer_created', 'buyer_id', 'created_at', 'id'),
+    )
+    
     # Relationships
     buyer = relationship("User", backref="orders", foreign_keys=[buyer_id])
     items = relationship("OrderItem", back_populates="order", cascade="all, delete-orphan")
@@ -96,6 +101,12 @@ class OrderItem(Base):
     created_at = Column(DateTime(timezone=True), server_default=func.now())
     updated_at = Column(DateTime(timezone=True), onupdate=func.now())
     
+    # Seller order lists, dashboard counts and sales reconciliation
+    __table_args__ = (
+        Index('ix_order_items_seller_status', 'seller_id', 'status'),
+        Index('ix_order_items_order_id', 'order_id'),
+    )
+    
     # Relationships
     order = relationship("Order", back_populates="items")
     product = relationship("Product", backref="order_items")
@@ -11,7 +11,7 @@ Key Features:
 - Full audit trail of all changes
 """
 
-from sqlalchemy import Column, String, Boolean, DateTime, Text, JSON, Enum as SQLEnum, ForeignKey
+from sqlalchemy import Column, String, Boolean, Integer, BigInteger, DateTime, Text, JSON, Enum as SQLEnum, ForeignKey, Index
 from sqlalchemy.dialects.postgresql import UUID
 from sqlalchemy.orm import relationship
 from sqlalchemy.sql import func
@@ -109,9 +109,59 @@ class SettingsAuditLog(Base):
     user_agent = Column(String)  # Browser/client information
     created_at = Column(DateTime(timezone=True), server_default=func.now())
     
+    # Per-setting history, newest first (keyset-paginated by created_at, id)
+    __table_args__ = (
+        Index('ix_settings_audit_key_created', setting_key, created_at.desc(), id.desc()),
+    )
+    
     # Relationships
     setting = relationship("PlatformSetting", back_populates="audit_logs")
     changed_by_user = relationship("User", foreign_keys=[changed_by])
 
     def __repr__(self):
         return f"<SettingsAuditLog {self.setting_key}: {self.old_value} → {self.new_value}>"
+
+
+class PlatformSettingsGeneration(Base):
+    """
+    Platform Settings Generation Counter
+    
+    Single row bumped in the same transaction as every settings change.
+    Each app process polls it to know when its in-memory copy of the
+    settings (see app/services/settings_registry.py) is out of date.
+    """
+    __tablename__ = "platform_settings_generation"
+
+    id = Column(Integer, primary_key=True, default=1)
+    generation = Column(BigInteger, nullable=False, default=0)
+    updated_at = Column(DateTime(timezone=True), server_default=func.now(), onupdate=func.now())
+
+    def __repr__(self):
+        return f"<PlatformSettingsGeneration {self.generation}>"
+
+
+class SettingsAuditLogArchive(Base):
+    """
+    Archived Settings Audit Log
+    
+    Audit entries older than SETTINGS_AUDIT_RETENTION_DAYS are moved here
+    (see archive_settings_audit_log.py) so the live audit table and its
+    indexes stay small. Same columns as SettingsAuditLog, without foreign
+    keys, so history survives deleted settings and users.
+    """
+    __tablename__ = "settings_audit_log_archive"
+
+    id = Column(UUID(as_uuid=True), primary_key=True)
+    setting_id = Column(UUID(as_uuid=True), nullable=False)
+    setting_key = Column(String, nullable=False, index=True)
+    old_value = Column(JSON, nullable=True)
+    new_value = Column(JSON, nullable=False)
+    change_reason = Column(Text)
+    changed_by = Column(UUID(as_uuid=True), nullable=False)
+    ip_address = Column(String)
+    user_agent = Column(String)
+    created_at = Column(DateTime(timezone=True), index=True)
+    archived_at = Column(DateTime(timezone=True), server_default=func.now())
+
+    def __repr__(self):
+        return f"<SettingsAuditLogArchive {self.setting_key} @ {self.created_at}>"
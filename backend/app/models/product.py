@@ -1,4 +1,4 @@
-from sqlalchemy import Column, String, Text, Numeric, Integer, Boolean, DateTime, ForeignKey
+from sqlalchemy import Column, String, Text, Numeric, Integer, Boolean, DateTime, ForeignKey, Index
 from sqlalchemy.dialects.postgresql import UUID, JSON
 from sqlalchemy.sql import func
 from sqlalchemy.orm import relationship
@@ -32,9 +32,20 @@ class Product(Base):
     sales_count = Column(Integer, default=0)
     rating_average = Column(Numeric(3, 2), default=0)
     total_reviews = Column(Integer, default=0)
+    # Rating histogram, maintained incrementally by AggregateService
+    rating_1_count = Column(Integer, nullable=False, default=0, server_default="0")
+    rating_2_count = Column(Integer, nullable=False, default=0, server_default="0")
+    rating_3_count = Column(Integer, nullable=False, default=0, server_default="0")
+    rating_4_count = Column(Integer, nullable=False, default=0, server_default="0")
+    rating_5_count = Column(Integer, nullable=False, default=0, server_default="0")
     created_at = Column(DateTime(timezone=True), server_default=func.now())
     updated_at = Column(DateTime(timezone=True), onupdate=func.now())
     
+    # Prefix lookups (slug LIKE 'base-%') for slug allocation
+    __table_args__ = (
+        Index('ix_products_slug_pattern', 'slug', postgresql_ops={'slug': 'text_pattern_ops'}),
+    )
+    
     # Relationships
     images = relationship("ProductImage", back_populates="product", cascade="all, delete-orphan")
     seller = relationship("SellerProfile", back_populates="products")
@@ -50,6 +61,8 @@ class ProductImage(Base):
     id = Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
     product_id = Column(UUID(as_uuid=True), ForeignKey("products.id", ondelete="CASCADE"), nullable=False)
     image_url = Column(String, nullable=False)
+    thumbnail_url = Column(String)  # 200px WebP derivative, set by the image pipeline
+    medium_url = Column(String)  # 600px WebP derivative, set by the image pipeline
     alt_text = Column(String)
     position = Column(Integer, default=0)
     is_primary = Column(Boolean, default=False)
@@ -57,6 +70,10 @@ class ProductImage(Base):
     
     # Relationships
     product = relationship("Product", back_populates="images")
+    
+    # Fetch server defaults (created_at) with RETURNING on insert, so new
+    # images can be serialized without a refresh query
+    __mapper_args__ = {"eager_defaults": True}
 
     def __repr__(self):
         return f"<ProductImage {self.image_url}>"
@@ -1,4 +1,4 @@
-from sqlalchemy import Column, String, Integer, Text, DateTime, ForeignKey, CheckConstraint
+from sqlalchemy import Column, String, Integer, Text, DateTime, ForeignKey, CheckConstraint, Index, UniqueConstraint
 from sqlalchemy.dialects.postgresql import UUID
 from sqlalchemy.orm import relationship
 from sqlalchemy.sql import func
@@ -18,7 +18,7 @@ class Review(Base):
     comment = Column(Text, nullable=False)
     
     # Helpful votes
-    helpful_count = Column(Integer, default=0)
+    helpful_count = Column(Integer, nullable=False, default=0, server_default="0")
     
     # Timestamps
     created_at = Column(DateTime(timezone=True), server_default=func.now())
@@ -28,6 +28,10 @@ class Review(Base):
     __table_args__ = (
         CheckConstraint('rating >= 1 AND rating <= 5', name='valid_rating'),
         CheckConstraint('LENGTH(comment) >= 10', name='min_comment_length'),
+        # Keyset pagination for product review listings (newest / most helpful)
+        Index('ix_reviews_product_created', 'product_id', 'created_at', 'id'),
+        Index('ix_reviews_product_helpful', 'product_id', 'helpful_count', 'created_at', 'id'),
+        Index('ix_reviews_user_created', 'user_id', 'created_at', 'id'),
     )
     
     # Relationships
@@ -37,3 +41,20 @@ class Review(Base):
     
     def __repr__(self):
         return f"<Review {self.rating}⭐ by User {self.user_id}>"
+
+
+class ReviewVote(Base):
+    """One "helpful" vote per user per review; dedupes Review.helpful_count increments"""
+    __tablename__ = "review_votes"
+    
+    id = Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
+    review_id = Column(UUID(as_uuid=True), ForeignKey("reviews.id", ondelete="CASCADE"), nullable=False)
+    user_id = Column(UUID(as_uuid=True), ForeignKey("users.id", ondelete="CASCADE"), nullable=False)
+    created_at = Column(DateTime(timezone=True), server_default=func.now())
+    
+    __table_args__ = (
+        UniqueConstraint('review_id', 'user_id', name='uq_review_votes_review_user'),
+    )
+    
+    def __repr__(self):
+        return f"<ReviewVote review={self.review_id} user={self.user_id}>"
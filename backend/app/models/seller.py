@@ -33,6 +33,7 @@ class SellerProfile(Base):
     total_sales = Column(Numeric(12, 2), default=0)
     rating_average = Column(Numeric(3, 2), default=0)
     total_reviews = Column(Integer, default=0)
+    rating_sum = Column(Integer, nullable=False, default=0, server_default="0")  # Sum of review stars, for incremental averages
     created_at = Column(DateTime(timezone=True), server_default=func.now())
     updated_at = Column(DateTime(timezone=True), onupdate=func.now())
 
@@ -0,0 +1,35 @@
+from sqlalchemy import Column, String, Integer, DateTime, ForeignKey, Index
+from sqlalchemy.dialects.postgresql import UUID
+from sqlalchemy.sql import func
+import uuid
+from app.database import Base
+
+
+class StockReservation(Base):
+    """
+    Stock held for an unpaid order.
+    
+    Created at checkout with an expiry. Status moves held -> committed when
+    the order is paid, or held -> released when the order is cancelled or
+    the hold expires (the sweeper then puts the stock back).
+    """
+    __tablename__ = "stock_reservations"
+    
+    id = Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
+    order_id = Column(UUID(as_uuid=True), ForeignKey("orders.id", ondelete="CASCADE"), nullable=False)
+    product_id = Column(UUID(as_uuid=True), ForeignKey("products.id", ondelete="CASCADE"), nullable=False)
+    quantity = Column(Integer, nullable=False)
+    
+    status = Column(String(20), nullable=False, default="held")
+    expires_at = Column(DateTime(timezone=True), nullable=False)
+    created_at = Column(DateTime(timezone=True), server_default=func.now())
+    resolved_at = Column(DateTime(timezone=True))
+    
+    # Sweeper: expired holds; payment and cancellation: holds of one order
+    __table_args__ = (
+        Index('ix_stock_reservations_status_expires', 'status', 'expires_at'),
+        Index('ix_stock_reservations_order_id', 'order_id'),
+    )
+    
+    def __repr__(self):
+        return f"<StockReservation order={self.order_id} product={self.product_id} x{self.quantity} {self.status}>"
@@ -0,0 +1,37 @@
+from sqlalchemy import Column, String, Integer, Text, DateTime, JSON, Index
+from sqlalchemy.dialects.postgresql import UUID
+from sqlalchemy.sql import func
+import uuid
+from app.database import Base
+
+
+class WebhookEvent(Base):
+    """
+    A received payment provider webhook, queued for background processing.
+    
+    event_id is unique, so replayed deliveries of the same event are stored
+    (and processed) once. Status moves pending -> processing -> processed,
+    or to failed after the retry budget is spent.
+    """
+    __tablename__ = "webhook_events"
+    
+    id = Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
+    event_id = Column(String, unique=True, nullable=False)
+    event_type = Column(String, nullable=False)
+    payload = Column(JSON, nullable=False)
+    
+    status = Column(String(20), nullable=False, default="pending")
+    attempts = Column(Integer, nullable=False, default=0)
+    last_error = Column(Text)
+    next_attempt_at = Column(DateTime(timezone=True), nullable=False, server_default=func.now())
+    
+    received_at = Column(DateTime(timezone=True), server_default=func.now())
+    processed_at = Column(DateTime(timezone=True))
+    
+    # Worker polling: due events by status
+    __table_args__ = (
+        Index('ix_webhook_events_status_next_attempt', 'status', 'next_attempt_at'),
+    )
+    
+    def __repr__(self):
+        return f"<WebhookEvent {self.event_type} {self.event_id}>"
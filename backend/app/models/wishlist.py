@@ -1,4 +1,4 @@
-from sqlalchemy import Column, String, DateTime, ForeignKey
+from sqlalchemy import Column, String, DateTime, ForeignKey, Index
 from sqlalchemy.dialects.postgresql import UUID
 from sqlalchemy.orm import relationship
 from sqlalchemy.sql import func
@@ -14,6 +14,11 @@ class WishlistItem(Base):
     product_id = Column(UUID(as_uuid=True), ForeignKey("products.id", ondelete="CASCADE"), nullable=False)
     created_at = Column(DateTime(timezone=True), server_default=func.now())
 
+    # Serves wishlist pages and membership checks for a single user
+    __table_args__ = (
+        Index('ix_wishlist_items_user_product', 'user_id', 'product_id'),
+    )
+
     # Relationships
     user = relationship("User", backref="wishlist_items")
     product = relationship("Product", backref="wishlist_items")
@@ -1,5 +1,14 @@
 from .user import UserCreate, UserLogin, UserResponse, TokenResponse, RefreshTokenRequest
-from .seller import SellerProfileCreate, SellerProfileUpdate, SellerProfileResponse, SellerApprovalAction
+from .seller import (
+    SellerProfileCreate,
+    SellerProfileUpdate,
+    SellerProfileResponse,
+    SellerApprovalAction,
+    FulfillmentUpdate,
+    BulkFulfillmentRequest,
+    FulfillmentError,
+    BulkFulfillmentResult
+)
 from .category import CategoryCreate, CategoryUpdate, CategoryResponse, CategoryWithChildren
 from .product import (
     ProductCreate, 
@@ -8,12 +17,27 @@ from .product import (
     ProductListResponse, 
     ProductSearchParams,
     ProductImageCreate,
-    ProductImageResponse
+    ProductImageResponse,
+    ProductImportRow,
+    ProductImportError,
+    ProductImportResult
 )
 from .wishlist import (
     WishlistItemCreate,
     WishlistItemResponse,
-    WishlistItemWithProduct
+    WishlistItemWithProduct,
+    WishlistBulkCheckRequest,
+    WishlistBulkCheckResponse
+)
+from .media import MediaUploadResponse
+from .cart import (
+    CartItemInput,
+    CartReplace,
+    CartItemQuantity,
+    CartItemResponse,
+    CartResponse,
+    CartQuoteLine,
+    CartQuote
 )
 
 __all__ = [
@@ -26,6 +50,10 @@ __all__ = [
     "SellerProfileUpdate",
     "SellerProfileResponse",
     "SellerApprovalAction",
+    "FulfillmentUpdate",
+    "BulkFulfillmentRequest",
+    "FulfillmentError",
+    "BulkFulfillmentResult",
     "CategoryCreate",
     "CategoryUpdate",
     "CategoryResponse",
@@ -37,7 +65,20 @@ __all__ = [
     "ProductSearchParams",
     "ProductImageCreate",
     "ProductImageResponse",
+    "ProductImportRow",
+    "ProductImportError",
+    "ProductImportResult",
     "WishlistItemCreate",
     "WishlistItemResponse",
-    "WishlistItemWithProduct"
+    "WishlistItemWithProduct",
+    "WishlistBulkCheckRequest",
+    "WishlistBulkCheckResponse",
+    "MediaUploadResponse",
+    "CartItemInput",
+    "CartReplace",
+    "CartItemQuantity",
+    "CartItemResponse",
+    "CartResponse",
+    "CartQuoteLine",
+    "CartQuote"
 ]
\ No newline at end of file
@@ -0,0 +1,65 @@
+from pydantic import BaseModel, ConfigDict, Field
+from typing import List, Optional
+from datetime import datetime
+from uuid import UUID
+
+# Upper bounds keep a single cart (and its quote query) small
+MAX_CART_LINES = 100
+MAX_LINE_QUANTITY = 999
+
+
+class CartItemInput(BaseModel):
+    """One cart line as sent by the client"""
+    product_id: UUID
+    quantity: int = Field(gt=0, le=MAX_LINE_QUANTITY)
+
+
+class CartReplace(BaseModel):
+    """Replace the whole cart (e.g. to sync a cart built before login)"""
+    items: List[CartItemInput] = Field(default_factory=list, max_length=MAX_CART_LINES)
+
+
+class CartItemQuantity(BaseModel):
+    """Set a line's quantity; 0 removes the line"""
+    quantity: int = Field(ge=0, le=MAX_LINE_QUANTITY)
+
+
+class CartItemResponse(BaseModel):
+    product_id: UUID
+    quantity: int
+    added_at: Optional[datetime] = None
+
+    model_config = ConfigDict(from_attributes=True)
+
+
+class CartResponse(BaseModel):
+    version: int
+    items: List[CartItemResponse]
+
+
+class CartQuoteLine(BaseModel):
+    """
+    Current price and availability of one cart line
+
+    `status` is one of:
+    - available: the line can be ordered as-is
+    - insufficient_stock: fewer than `quantity` are in stock (see available_quantity)
+    - unavailable: the product was removed, deactivated or has no seller
+    """
+    product_id: UUID
+    name: Optional[str] = None
+    quantity: int
+    unit_price: Optional[float] = None
+    line_subtotal: float
+    available_quantity: int
+    status: str
+
+
+class CartQuote(BaseModel):
+    """Server-side pricing of a cart; `subtotal` is what create_order will expect"""
+    version: int
+    lines: List[CartQuoteLine]
+    subtotal: float
+    item_count: int
+    all_available: bool
+    quoted_at: datetime
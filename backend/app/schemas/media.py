@@ -0,0 +1,10 @@
+from pydantic import BaseModel
+
+
+class MediaUploadResponse(BaseModel):
+    """Result of an image upload to the blob store"""
+    sha256: str
+    url: str
+    size: int
+    content_type: str
+    deduplicated: bool  # True if identical content was already stored
@@ -84,7 +84,12 @@ class OrderItemDetailResponse(OrderItemResponse):
 
 
 class OrderResponse(BaseModel):
-    """Schema for order in list responses"""
+    """
+    Schema for order in list responses
+    
+    `items` holds only the first few items as a preview; `item_count` is the
+    full number of items. Use the detail endpoint for everything else.
+    """
     id: UUID
     order_number: str
     status: str
@@ -98,6 +103,7 @@ class OrderResponse(BaseModel):
     cancelled_at: Optional[datetime]
     cancelled_reason: Optional[str]
     created_at: datetime
+    item_count: int
     items: List[OrderItemResponse]
     
     class Config:
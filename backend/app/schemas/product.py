@@ -16,6 +16,8 @@ class ProductImageResponse(BaseModel):
     id: UUID
     product_id: UUID
     image_url: str
+    thumbnail_url: Optional[str] = None
+    medium_url: Optional[str] = None
     alt_text: Optional[str] = None
     position: int
     is_primary: bool
@@ -103,7 +105,7 @@ class ProductListResponse(BaseModel):
     is_featured: bool
     rating_average: Decimal
     total_reviews: int
-    primary_image: Optional[str] = None
+    primary_image: Optional[str] = None  # Small (thumbnail) variant when available
     
     model_config = ConfigDict(from_attributes=True)
 
@@ -120,3 +122,46 @@ class ProductSearchParams(BaseModel):
     sort_order: Optional[str] = "desc"  # asc, desc
     page: int = Field(default=1, ge=1)
     page_size: int = Field(default=20, ge=1, le=100)
+
+
+class ProductImportRow(BaseModel):
+    """One product row of a bulk CSV/NDJSON import.
+    
+    Rows whose SKU matches one of the seller's existing products update that
+    product (only the fields the row sets; missing fields and blank cells
+    keep their current values); all other rows create a new product with
+    the defaults below for missing fields. The category can be given
+    by id or by slug. CSV files list image URLs in `image_urls` separated by
+    `|`; NDJSON rows may use either `image_urls` or `images`.
+    """
+    category_id: Optional[UUID] = None
+    category_slug: Optional[str] = None
+    name: str = Field(..., min_length=2, max_length=200)
+    description: Optional[str] = None
+    price: Decimal = Field(..., gt=0, decimal_places=2)
+    compare_at_price: Optional[Decimal] = Field(None, gt=0, decimal_places=2)
+    cost_per_item: Optional[Decimal] = Field(None, ge=0, decimal_places=2)
+    sku: Optional[str] = None
+    barcode: Optional[str] = None
+    quantity: int = Field(default=0, ge=0)
+    low_stock_threshold: int = Field(default=5, ge=0)
+    weight: Optional[Decimal] = Field(None, ge=0, decimal_places=2)
+    is_digital: bool = False
+    digital_file_url: Optional[str] = None
+    is_active: bool = True
+    image_urls: List[str] = []
+    images: List[ProductImageCreate] = []
+
+
+class ProductImportError(BaseModel):
+    row: int  # 1-based data row number (header excluded)
+    sku: Optional[str] = None
+    message: str
+
+
+class ProductImportResult(BaseModel):
+    total_rows: int = 0
+    created: int = 0
+    updated: int = 0
+    failed: int = 0
+    errors: List[ProductImportError] = []
@@ -1,5 +1,5 @@
 from pydantic import BaseModel, Field, ConfigDict
-from typing import Optional
+from typing import List, Optional
 from datetime import datetime
 from uuid import UUID
 from decimal import Decimal
@@ -40,3 +40,26 @@ class SellerProfileResponse(BaseModel):
 class SellerApprovalAction(BaseModel):
     action: str = Field(..., pattern="^(approve|reject)$")
     rejection_reason: Optional[str] = None
+
+
+class FulfillmentUpdate(BaseModel):
+    """Target status for one order item; shipped items need a tracking number"""
+    order_item_id: UUID
+    status: str = Field(..., pattern="^(confirmed|processing|shipped|delivered|cancelled)$")
+    tracking_number: Optional[str] = Field(None, max_length=100)
+
+
+class BulkFulfillmentRequest(BaseModel):
+    updates: List[FulfillmentUpdate] = Field(..., min_length=1, max_length=500)
+
+
+class FulfillmentError(BaseModel):
+    order_item_id: UUID
+    detail: str
+
+
+class BulkFulfillmentResult(BaseModel):
+    """Valid updates are applied; the rest are reported in `errors`"""
+    updated: int
+    orders_updated: int
+    errors: List[FulfillmentError]
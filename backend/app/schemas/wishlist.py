@@ -11,13 +11,15 @@ Schema Hierarchy:
     - WishlistItemCreate: Used for creating wishlist items (request body)
     - WishlistItemResponse: Used for returning wishlist item details
     - WishlistItemWithProduct: Extended response including full product details
+    - WishlistBulkCheckRequest: Request body for checking many products at once
+    - WishlistBulkCheckResponse: Membership map returned by the bulk check
 
 All schemas use ConfigDict(from_attributes=True) to enable ORM mode, allowing
 direct instantiation from SQLAlchemy model instances.
 """
 
-from pydantic import BaseModel, ConfigDict
-from typing import Optional
+from pydantic import BaseModel, ConfigDict, Field
+from typing import Optional, List, Dict
 from datetime import datetime
 from uuid import UUID
 
@@ -95,4 +97,38 @@ class WishlistItemWithProduct(WishlistItemResponse):
     This schema enables the frontend to display wishlist items with full
     product information without requiring additional API calls.
     """
-    product: Optional[dict] = None  # Contains full product details for display
\ No newline at end of file
+    product: Optional[dict] = None  # Contains full product details for display
+
+
+class WishlistBulkCheckRequest(BaseModel):
+    """
+    Bulk Wishlist Check Request Schema
+    ----------------------------------
+    Used as the request body for POST /wishlist/check. Lets a product grid
+    resolve the heart icon state of a whole page in a single request.
+    
+    Attributes:
+        product_ids: Between 1 and 100 product UUIDs to check
+    
+    Example Request Body:
+        {
+            "product_ids": [
+                "123e4567-e89b-12d3-a456-426614174000",
+                "123e4567-e89b-12d3-a456-426614174001"
+            ]
+        }
+    """
+    product_ids: List[UUID] = Field(..., min_length=1, max_length=100)
+
+
+class WishlistBulkCheckResponse(BaseModel):
+    """
+    Bulk Wishlist Check Response Schema
+    -----------------------------------
+    Returned by POST /wishlist/check.
+    
+    Attributes:
+        in_wishlist: Maps every requested product UUID to true if the product
+            is in the user's wishlist, false otherwise
+    """
+    in_wishlist: Dict[UUID, bool]
@@ -0,0 +1,331 @@
+"""
+Aggregate Maintenance Service for ShopNest
+
+Keeps denormalized counters in step with the rows they summarize:
+
+- Product rating histograms, total_reviews and rating_average
+- Seller rating_average / total_reviews (across all of a seller's products)
+- Seller total_sales (seller earnings on confirmed-or-later order items)
+
+Incremental updates are single atomic UPDATE statements issued inside the
+caller's transaction, so they are committed (or rolled back) together with
+the write that caused them and never lose concurrent changes. The
+recompute_* methods rebuild the same counters in bulk from the source rows
+and back the repair_aggregates.py command.
+"""
+
+from sqlalchemy.orm import Session
+from sqlalchemy.orm.attributes import set_committed_value
+from sqlalchemy import func, case, cast, update, select, or_, Numeric
+from app.models.product import Product
+from app.models.review import Review
+from app.models.seller import SellerProfile
+from app.models.order import OrderItem, OrderStatus
+from typing import Dict, Iterable, Optional
+from decimal import Decimal
+from uuid import UUID
+
+
+RATING_VALUES = (1, 2, 3, 4, 5)
+
+# Order item statuses whose seller earnings count towards total_sales
+SALES_STATUSES = (
+    OrderStatus.CONFIRMED,
+    OrderStatus.PROCESSING,
+    OrderStatus.SHIPPED,
+    OrderStatus.DELIVERED
+)
+
+# Order item statuses whose stock was already returned; items never leave them
+RETURNED_STATUSES = (OrderStatus.CANCELLED, OrderStatus.REFUNDED)
+
+
+def rating_count_column(rating: int):
+    """Return the Product histogram column holding the count for a star rating"""
+    return getattr(Product, f"rating_{rating}_count")
+
+
+def average_expression(rating_sum, total):
+    """SQL expression for a 2-decimal average that is 0 when there are no ratings"""
+    return case(
+        (total > 0, func.round(cast(rating_sum, Numeric) / total, 2)),
+        else_=0
+    )
+
+
+def rating_summary_values(counts: Dict[int, object]) -> dict:
+    """
+    Build total_reviews and rating_average expressions from histogram counts.
+    
+    `counts` maps each star rating to a SQL expression for its new count, so
+    the summary columns are always derived from the histogram itself.
+    """
+    total = counts[RATING_VALUES[0]]
+    rating_sum = RATING_VALUES[0] * counts[RATING_VALUES[0]]
+    for rating in RATING_VALUES[1:]:
+        total = total + counts[rating]
+        rating_sum = rating_sum + rating * counts[rating]
+    
+    return {
+        "total_reviews": total,
+        "rating_average": average_expression(rating_sum, total)
+    }
+
+
+class AggregateService:
+    """Service for maintaining denormalized aggregate counters"""
+    
+    def __init__(self, db: Session):
+        self.db = db
+    
+    # ============= Product ratings =============
+    
+    def apply_review_rating_change(
+        self,
+        product_id: UUID,
+        old_rating: Optional[int] = None,
+        new_rating: Optional[int] = None
+    ) -> None:
+        """
+        Apply a review create/update/delete to the rating counters of the
+        product and of the seller who owns it.
+        
+        - Create: old_rating=None, new_rating=<stars>
+        - Update: old_rating=<previous stars>, new_rating=<new stars>
+        - Delete: old_rating=<stars>, new_rating=None
+        
+        Does not commit; the caller commits together with the review write.
+        """
+        deltas = {rating: 0 for rating in RATING_VALUES}
+        if old_rating is not None:
+            deltas[old_rating] -= 1
+        if new_rating is not None:
+            deltas[new_rating] += 1
+        
+        if not any(deltas.values()):
+            return
+        
+        new_counts = {
+            rating: rating_count_column(rating) + delta if delta else rating_count_column(rating)
+            for rating, delta in deltas.items()
+        }
+        
+        values = {
+            f"rating_{rating}_count": new_counts[rating]
+            for rating, delta in deltas.items()
+            if delta
+        }
+        values.update(rating_summary_values(new_counts))
+        
+        self.db.execute(
+            update(Product)
+            .where(Product.id == product_id)
+            .values(**values)
+            .execution_options(synchronize_session=False)
+        )
+        
+        self._apply_seller_rating_change(
+            product_id,
+            count_delta=(new_rating is not None) - (old_rating is not None),
+            rating_delta=(new_rating or 0) - (old_rating or 0)
+        )
+    
+    def get_product_rating_stats(self, product_id: UUID) -> Optional[dict]:
+        """
+        Read a product's rating stats from its counters (single-row lookup).
+        
+        Returns None if the product does not exist.
+        """
+        row = self.db.query(
+            Product.rating_average,
+            *[rating_count_column(rating) for rating in RATING_VALUES]
+        ).filter(Product.id == product_id).first()
+        
+        if not row:
+            return None
+        
+        distribution = {
+            rating: getattr(row, f"rating_{rating}_count") or 0
+            for rating in RATING_VALUES
+        }
+        
+        return {
+            "total_reviews": sum(distribution.values()),
+            "average_rating": float(row.rating_average or 0),
+            "rating_distribution": distribution
+        }
+    
+    def recompute_product_ratings(self, product_ids: Optional[Iterable[UUID]] = None) -> int:
+        """
+        Rebuild rating counters from the reviews table in bulk.
+        
+        Uses one UPDATE ... FROM (aggregate) statement for products with
+        reviews and one UPDATE for products whose reviews are all gone.
+        Pass product_ids to limit the repair; omit it to repair every product.
+        Does not commit. Returns the number of product rows rewritten.
+        """
+        if product_ids is not None:
+            product_ids = list(product_ids)
+            if not product_ids:
+                return 0
+        
+        counts_query = select(
+            Review.product_id.label("product_id"),
+            *[
+                func.count(Review.id).filter(Review.rating == rating).label(f"rating_{rating}_count")
+                for rating in RATING_VALUES
+            ]
+        ).group_by(Review.product_id)
+        if product_ids is not None:
+            counts_query = counts_query.where(Review.product_id.in_(product_ids))
+        counts = counts_query.subquery()
+        
+        new_counts = {rating: counts.c[f"rating_{rating}_count"] for rating in RATING_VALUES}
+        values = {f"rating_{rating}_count": new_counts[rating] for rating in RATING_VALUES}
+        values.update(rating_summary_values(new_counts))
+        
+        updated = self.db.execute(
+            update(Product)
+            .where(Product.id == counts.c.product_id)
+            .values(**values)
+            .execution_options(synchronize_session=False)
+        ).rowcount
+        
+        # Products with no reviews left should have zeroed counters
+        has_reviews = select(Review.id).where(Review.product_id == Product.id).exists()
+        reset_query = update(Product).where(
+            ~has_reviews,
+            or_(
+                Product.total_reviews != 0,
+                Product.total_reviews.is_(None),
+                Product.rating_average != 0,
+                *[rating_count_column(rating) != 0 for rating in RATING_VALUES]
+            )
+        )
+        if product_ids is not None:
+            reset_query = reset_query.where(Product.id.in_(product_ids))
+        
+        reset_values = {f"rating_{rating}_count": 0 for rating in RATING_VALUES}
+        reset_values.update(total_reviews=0, rating_average=0)
+        
+        updated += self.db.execute(
+            reset_query
+            .values(**reset_values)
+            .execution_options(synchronize_session=False)
+        ).rowcount
+        
+        return updated
+    
+    # ============= Seller rollups =============
+    
+    def _apply_seller_rating_change(self, product_id: UUID, count_delta: int, rating_delta: int) -> None:
+        """Roll a review change into the owning seller's rating counters"""
+        if not count_delta and not rating_delta:
+            return
+        
+        seller_id = select(Product.seller_id).where(Product.id == product_id).scalar_subquery()
+        new_total = func.coalesce(SellerProfile.total_reviews, 0) + count_delta
+        new_sum = SellerProfile.rating_sum + rating_delta
+        
+        self.db.execute(
+            update(SellerProfile)
+            .where(SellerProfile.id == seller_id)
+            .values(
+                total_reviews=new_total,
+                rating_sum=new_sum,
+                rating_average=average_expression(new_sum, new_total)
+            )
+            .execution_options(synchronize_session=False)
+        )
+    
+    def set_order_item_statuses(self, items: Iterable[OrderItem], new_status: OrderStatus) -> None:
+        """
+        Set the status of order items and roll the change into seller sales.
+        
+        Statuses are written with one UPDATE for all items (the loaded
+        objects are updated in place without a flush). An item's
+        seller_earning is added to its seller's total_sales when it enters
+        one of SALES_STATUSES and removed when it leaves them. Deltas are
+        summed per seller and written with one UPDATE per seller. Items
+        already in one of RETURNED_STATUSES are skipped when cancelling or
+        refunding, so a refund never relabels a cancelled item.
+        Does not commit.
+        """
+        new_status = OrderStatus(new_status)
+        counted = new_status in SALES_STATUSES
+        deltas: Dict[UUID, Decimal] = {}
+        item_ids = []
+        
+        if new_status in RETURNED_STATUSES:
+            items = [item for item in items if item.status not in RETURNED_STATUSES]
+        
+        for item in items:
+            if (item.status in SALES_STATUSES) != counted:
+                earning = Decimal(str(item.seller_earning or 0))
+                deltas[item.seller_id] = deltas.get(item.seller_id, Decimal("0")) + (
+                    earning if counted else -earning
+                )
+            item_ids.append(item.id)
+            set_committed_value(item, "status", new_status)
+        
+        if item_ids:
+            self.db.execute(
+                update(OrderItem)
+                .where(OrderItem.id.in_(item_ids))
+                .values(status=new_status)
+                .execution_options(synchronize_session=False)
+            )
+        
+        self.apply_seller_sales_deltas(deltas)
+    
+    def apply_seller_sales_deltas(self, deltas: Dict[UUID, Decimal]) -> None:
+        """Add per-seller earning deltas to total_sales atomically. Does not commit."""
+        for seller_id, delta in deltas.items():
+            if not delta:
+                continue
+            self.db.execute(
+                update(SellerProfile)
+                .where(SellerProfile.id == seller_id)
+                .values(total_sales=func.coalesce(SellerProfile.total_sales, 0) + delta)
+                .execution_options(synchronize_session=False)
+            )
+    
+    def recompute_seller_rollups(self, seller_ids: Optional[Iterable[UUID]] = None) -> int:
+        """
+        Rebuild seller rating and total_sales rollups from source rows in bulk.
+        
+        One UPDATE over seller_profiles with correlated aggregate subqueries
+        on reviews/products and order_items. Pass seller_ids to limit the
+        repair; omit it to reconcile every seller. Does not commit. Returns
+        the number of seller rows rewritten.
+        """
+        review_count = select(func.count(Review.id)).join(
+            Product, Product.id == Review.product_id
+        ).where(Product.seller_id == SellerProfile.id).scalar_subquery()
+        
+        rating_sum = select(func.coalesce(func.sum(Review.rating), 0)).join(
+            Product, Product.id == Review.product_id
+        ).where(Product.seller_id == SellerProfile.id).scalar_subquery()
+        
+        sales = select(func.coalesce(func.sum(OrderItem.seller_earning), 0)).where(
+            OrderItem.seller_id == SellerProfile.id,
+            OrderItem.status.in_(SALES_STATUSES)
+        ).scalar_subquery()
+        
+        query = update(SellerProfile)
+        if seller_ids is not None:
+            seller_ids = list(seller_ids)
+            if not seller_ids:
+                return 0
+            query = query.where(SellerProfile.id.in_(seller_ids))
+        
+        return self.db.execute(
+            query
+            .values(
+                total_reviews=review_count,
+                rating_sum=rating_sum,
+                rating_average=average_expression(rating_sum, review_count),
+                total_sales=sales
+            )
+            .execution_options(synchronize_session=False)
+        ).rowcount
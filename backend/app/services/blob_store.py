@@ -0,0 +1,211 @@
+"""
+Content-Addressed Blob Store for ShopNest
+
+Stores uploaded product and category images on local disk under the
+SHA-256 of their content:
+
+    MEDIA_ROOT/blobs/ab/cd/abcd1234...
+
+Identical uploads (e.g. the same stock photo from many sellers) therefore
+map to one file. Blobs are served by /api/media/{sha256}; because content
+never changes for a given digest, the digest doubles as a strong ETag and
+responses can be cached forever.
+
+There is no blob table: the filesystem is the source of truth and a blob
+is referenced when a product image URL or category icon ends with its
+digest. expire_orphans removes blobs that are unreferenced and older than
+a grace period (so freshly uploaded, not yet saved images survive).
+"""
+
+import hashlib
+import os
+import re
+import tempfile
+import time
+from pathlib import Path
+from typing import BinaryIO, Iterator, List, NamedTuple, Optional
+
+from sqlalchemy import func
+from sqlalchemy.orm import Session
+
+from app.config import settings
+from app.models.category import Category
+from app.models.product import ProductImage
+
+
+DIGEST_LENGTH = 64
+DIGEST_PATTERN = re.compile(r"^[0-9a-f]{64}$")
+URL_DIGEST_PATTERN = re.compile(r"/media/([0-9a-f]{64})$")
+CHUNK_SIZE = 64 * 1024
+
+
+class StoredBlob(NamedTuple):
+    sha256: str
+    size: int
+    content_type: str
+    deduplicated: bool
+
+
+class BlobTooLarge(Exception):
+    pass
+
+
+class UnsupportedBlobType(Exception):
+    pass
+
+
+def blobs_root() -> Path:
+    return Path(settings.MEDIA_ROOT) / "blobs"
+
+
+def is_valid_digest(digest: str) -> bool:
+    return bool(DIGEST_PATTERN.match(digest))
+
+
+def blob_path(digest: str) -> Path:
+    """Sharded on-disk location of a blob"""
+    return blobs_root() / digest[:2] / digest[2:4] / digest
+
+
+def digest_from_url(url: Optional[str]) -> Optional[str]:
+    """Digest of a blob URL (…/media/<sha256>), or None for external URLs"""
+    if not url:
+        return None
+    match = URL_DIGEST_PATTERN.search(url)
+    return match.group(1) if match else None
+
+
+def sniff_image_type(header: bytes) -> Optional[str]:
+    """Detect the image type from its leading bytes (client content types are not trusted)"""
+    if header.startswith(b"\xff\xd8\xff"):
+        return "image/jpeg"
+    if header.startswith(b"\x89PNG\r\n\x1a\n"):
+        return "image/png"
+    if header.startswith((b"GIF87a", b"GIF89a")):
+        return "image/gif"
+    if header[:4] == b"RIFF" and header[8:12] == b"WEBP":
+        return "image/webp"
+    return None
+
+
+def blob_content_type(path: Path) -> str:
+    with open(path, "rb") as f:
+        return sniff_image_type(f.read(16)) or "application/octet-stream"
+
+
+def store_stream(stream: BinaryIO, max_bytes: Optional[int] = None) -> StoredBlob:
+    """
+    Hash and store an uploaded file, deduplicating identical content.
+    
+    The upload is streamed to a temp file in the blob directory while being
+    hashed, then atomically renamed into place. If the digest already exists
+    the temp file is discarded and the existing blob is touched, so a
+    pending orphan sweep does not remove it.
+    """
+    max_bytes = max_bytes or settings.MEDIA_MAX_UPLOAD_BYTES
+    root = blobs_root()
+    root.mkdir(parents=True, exist_ok=True)
+    
+    hasher = hashlib.sha256()
+    size = 0
+    header = b""
+    fd, tmp_name = tempfile.mkstemp(dir=root, prefix=".upload-")
+    
+    try:
+        with os.fdopen(fd, "wb") as out:
+            while True:
+                chunk = stream.read(CHUNK_SIZE)
+                if not chunk:
+                    break
+                size += len(chunk)
+                if size > max_bytes:
+                    raise BlobTooLarge(f"File exceeds {max_bytes} bytes")
+                if len(header) < 16:
+                    header += chunk[:16 - len(header)]
+                hasher.update(chunk)
+                out.write(chunk)
+        
+        content_type = sniff_image_type(header)
+        if content_type is None:
+            raise UnsupportedBlobType("Only JPEG, PNG, GIF and WebP images are supported")
+        
+        digest = hasher.hexdigest()
+        destination = blob_path(digest)
+        if destination.exists():
+            os.utime(destination)
+            os.unlink(tmp_name)
+            return StoredBlob(digest, size, content_type, True)
+        
+        destination.parent.mkdir(parents=True, exist_ok=True)
+        os.replace(tmp_name, destination)
+        return StoredBlob(digest, size, content_type, False)
+    except BaseException:
+        if os.path.exists(tmp_name):
+            os.unlink(tmp_name)
+        raise
+
+
+def iter_file_range(path: Path, start: int, end: int) -> Iterator[bytes]:
+    """Yield bytes start..end (inclusive) of a file in chunks"""
+    with open(path, "rb") as f:
+        f.seek(start)
+        remaining = end - start + 1
+        while remaining > 0:
+            chunk = f.read(min(CHUNK_SIZE, remaining))
+            if not chunk:
+                break
+            remaining -= len(chunk)
+            yield chunk
+
+
+class BlobStoreService:
+    """Service for finding and expiring unreferenced blobs"""
+    
+    def __init__(self, db: Session):
+        self.db = db
+    
+    def referenced_digests(self, digests: List[str]) -> set:
+        """Which of the given digests are used by a product image or category icon"""
+        if not digests:
+            return set()
+        
+        referenced = set()
+        for column in (ProductImage.image_url, Category.icon):
+            suffix = func.right(column, DIGEST_LENGTH)
+            referenced.update(
+                digest for (digest,) in self.db.query(suffix).filter(suffix.in_(digests)).distinct()
+            )
+        return referenced
+    
+    def expire_orphans(self, grace_hours: Optional[int] = None, dry_run: bool = False,
+                       batch_size: int = 500) -> List[str]:
+        """
+        Delete blobs older than the grace period that nothing references.
+        
+        Blobs are checked against the database in batches. Returns the
+        digests that were (or, with dry_run, would be) removed.
+        """
+        if grace_hours is None:
+            grace_hours = settings.MEDIA_ORPHAN_GRACE_HOURS
+        cutoff = time.time() - grace_hours * 3600
+        root = blobs_root()
+        if not root.exists():
+            return []
+        
+        candidates = [
+            path for path in root.glob("*/*/*")
+            if is_valid_digest(path.name) and path.stat().st_mtime < cutoff
+        ]
+        
+        removed = []
+        for start in range(0, len(candidates), batch_size):
+            batch = candidates[start:start + batch_size]
+            referenced = self.referenced_digests([path.name for path in batch])
+            for path in batch:
+                if path.name in referenced:
+                    continue
+                if not dry_run:
+                    path.unlink(missing_ok=True)
+                removed.append(path.name)
+        
+        return removed
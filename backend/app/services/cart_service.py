@@ -0,0 +1,192 @@
+"""
+Cart Service for ShopNest
+
+Server-side carts, so checkout can be priced and stock-checked before the
+order is placed instead of failing inside create_order.
+
+- Every change bumps the cart's `version`; writes that leave the lines
+  as they were (checkout syncing an unchanged cart) do not
+- quote() prices and stock-checks every line with one query (cart items
+  joined to products and sellers) and caches the result per
+  (cart, version) for CART_QUOTE_CACHE_SECONDS, so repeated quotes of an
+  unchanged cart during checkout cost nothing
+- Quotes are advisory: create_order still validates stock and price
+"""
+
+from collections import OrderedDict
+from datetime import datetime, timezone
+from typing import Iterable, List
+from uuid import UUID
+
+from fastapi import HTTPException, status
+from sqlalchemy import delete
+from sqlalchemy.dialects.postgresql import insert
+from sqlalchemy.orm import Session
+
+from app.config import settings
+from app.models.cart import Cart, CartItem
+from app.models.product import Product
+from app.models.seller import SellerProfile
+from app.schemas.cart import CartItemInput, CartQuote, CartQuoteLine, MAX_CART_LINES
+from app.utils.cache import TTLCache
+
+quote_cache = TTLCache(settings.CART_QUOTE_CACHE_SECONDS, name="cart_quote")
+
+
+class CartService:
+    """Service for reading, changing and quoting a user's cart"""
+    
+    def __init__(self, db: Session):
+        self.db = db
+    
+    def get_cart(self, user_id) -> Cart:
+        """The user's cart, created on first use"""
+        cart = self.db.query(Cart).filter(Cart.user_id == user_id).first()
+        if cart:
+            return cart
+        
+        self.db.execute(
+            insert(Cart)
+            .values(user_id=user_id, version=1)
+            .on_conflict_do_nothing(index_elements=["user_id"])
+        )
+        return self.db.query(Cart).filter(Cart.user_id == user_id).one()
+    
+    def _touch(self, cart: Cart) -> None:
+        cart.version = Cart.version + 1
+        self.db.flush()
+        self.db.refresh(cart)
+    
+    def replace_items(self, cart: Cart, items: List[CartItemInput]) -> None:
+        """Replace every line; duplicate products are merged. Does not commit."""
+        quantities = OrderedDict()
+        for item in items:
+            quantities[item.product_id] = quantities.get(item.product_id, 0) + item.quantity
+        
+        # Lines for products that no longer exist are dropped
+        existing = set()
+        if quantities:
+            existing = {
+                row.id for row in self.db.query(Product.id).filter(Product.id.in_(list(quantities)))
+            }
+        
+        rows = [
+            {"cart_id": cart.id, "product_id": product_id, "quantity": quantity}
+            for product_id, quantity in quantities.items() if product_id in existing
+        ]
+        current = dict(
+            self.db.query(CartItem.product_id, CartItem.quantity).filter(CartItem.cart_id == cart.id).all()
+        )
+        if current == {row["product_id"]: row["quantity"] for row in rows}:
+            return
+        
+        self.db.execute(delete(CartItem).where(CartItem.cart_id == cart.id))
+        if rows:
+            self.db.execute(insert(CartItem), rows)
+        self._touch(cart)
+    
+    def set_quantity(self, cart: Cart, product_id: UUID, quantity: int) -> None:
+        """Add, update or (quantity 0) remove one line. Does not commit."""
+        if quantity == 0:
+            removed = self.db.execute(delete(CartItem).where(
+                CartItem.cart_id == cart.id, CartItem.product_id == product_id
+            )).rowcount
+            if removed:
+                self._touch(cart)
+            return
+        
+        if not self.db.query(Product.id).filter(Product.id == product_id).first():
+            raise HTTPException(
+                status_code=status.HTTP_404_NOT_FOUND,
+                detail="Product not found"
+            )
+        
+        line_count = self.db.query(CartItem.id).filter(
+            CartItem.cart_id == cart.id, CartItem.product_id != product_id
+        ).count()
+        if line_count >= MAX_CART_LINES:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail=f"A cart can hold at most {MAX_CART_LINES} products"
+            )
+        
+        statement = insert(CartItem).values(cart_id=cart.id, product_id=product_id, quantity=quantity)
+        # No row is written (and the version stays) when the quantity is already set
+        changed = self.db.execute(statement.on_conflict_do_update(
+            constraint="uq_cart_items_cart_product",
+            set_={"quantity": statement.excluded.quantity},
+            where=CartItem.quantity != statement.excluded.quantity
+        )).rowcount
+        if changed:
+            self._touch(cart)
+    
+    def remove_products(self, user_id, product_ids: Iterable[UUID]) -> None:
+        """Drop ordered products from the user's cart, if any. Does not commit."""
+        product_ids = list(product_ids)
+        cart = self.db.query(Cart).filter(Cart.user_id == user_id).first()
+        if not cart or not product_ids:
+            return
+        
+        removed = self.db.execute(delete(CartItem).where(
+            CartItem.cart_id == cart.id, CartItem.product_id.in_(product_ids)
+        )).rowcount
+        if removed:
+            self._touch(cart)
+    
+    def quote(self, cart: Cart) -> CartQuote:
+        """Price and stock-check every line in one query (cached per cart version)"""
+        cache_key = (cart.id, cart.version)
+        cached = quote_cache.get(cache_key)
+        if cached is not None:
+            return cached
+        
+        rows = self.db.query(
+            CartItem.product_id,
+            CartItem.quantity,
+            Product.name,
+            Product.price,
+            Product.quantity.label("stock"),
+            Product.is_active,
+            SellerProfile.id.label("seller_id")
+        ).join(
+            Product, Product.id == CartItem.product_id
+        ).outerjoin(
+            SellerProfile, SellerProfile.id == Product.seller_id
+        ).filter(
+            CartItem.cart_id == cart.id
+        ).order_by(CartItem.added_at, CartItem.id).all()
+        
+        lines = []
+        subtotal = 0.0
+        for row in rows:
+            if not row.is_active or row.seller_id is None:
+                line_status, available = "unavailable", 0
+            elif row.stock < row.quantity:
+                line_status, available = "insufficient_stock", max(row.stock, 0)
+            else:
+                line_status, available = "available", row.stock
+            
+            unit_price = float(row.price)
+            line_subtotal = unit_price * row.quantity if line_status == "available" else 0.0
+            subtotal += line_subtotal
+            
+            lines.append(CartQuoteLine(
+                product_id=row.product_id,
+                name=row.name,
+                quantity=row.quantity,
+                unit_price=unit_price,
+                line_subtotal=round(line_subtotal, 2),
+                available_quantity=available,
+                status=line_status
+            ))
+        
+        quote = CartQuote(
+            version=cart.version,
+            lines=lines,
+            subtotal=round(subtotal, 2),
+            item_count=sum(line.quantity for line in lines if line.status == "available"),
+            all_available=all(line.status == "available" for line in lines),
+            quoted_at=datetime.now(timezone.utc)
+        )
+        quote_cache.set(cache_key, quote)
+        return quote
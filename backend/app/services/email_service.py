@@ -14,6 +14,7 @@ from email.mime.multipart import MIMEMultipart
 from jinja2 import Environment, FileSystemLoader, select_autoescape
 from pathlib import Path
 from app.config import settings
+from app.utils.metrics import emails_pending, emails_sent
 import logging
 import httpx
 import os
@@ -68,10 +69,16 @@ class EmailService:
             text_content: Plain text content (optional)
         """
         
-        if self.email_provider == "resend":
-            return await self._send_via_resend(to_email, subject, html_content, text_content)
-        else:
-            return await self._send_via_smtp(to_email, subject, html_content, text_content)
+        emails_pending.inc()
+        try:
+            if self.email_provider == "resend":
+                sent = await self._send_via_resend(to_email, subject, html_content, text_content)
+            else:
+                sent = await self._send_via_smtp(to_email, subject, html_content, text_content)
+        finally:
+            emails_pending.dec()
+        emails_sent.inc(provider=self.email_provider, outcome="sent" if sent else "failed")
+        return sent
     
     async def _send_via_resend(
         self,
@@ -117,7 +124,7 @@ class EmailService:
                 else:
                     logger.error(f"Resend API error: {response.status_code} - {response.text}")
                     return False
-                    
+        
         except Exception as e:
             logger.error(f"Failed to send email via Resend to {to_email}: {str(e)}")
             return False
@@ -167,7 +174,7 @@ class EmailService:
             
             logger.info(f"Email sent successfully via SMTP to {to_email}")
             return True
-            
+        
         except Exception as e:
             logger.error(f"Failed to send email via SMTP to {to_email}: {str(e)}")
             return False
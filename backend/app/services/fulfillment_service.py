@@ -0,0 +1,158 @@
+"""
+Fulfillment Service for ShopNest
+
+Bulk order item status changes for sellers (confirm, process, ship,
+deliver, cancel many items at once).
+
+- The affected orders, their items and buyers are loaded with three
+  queries, whatever the number of items
+- Transitions are validated in memory; invalid updates are reported and
+  skipped, the rest are applied with one UPDATE per target status
+- Cancelled items are restocked with one set-based UPDATE
+- Parent order statuses are recomputed in one pass and written with one
+  UPDATE per status
+- One customer notification per order is returned for the caller to send
+  after commit
+"""
+
+from typing import Dict, List, NamedTuple, Optional, Tuple
+from uuid import UUID
+
+from sqlalchemy import select, update
+from sqlalchemy.orm import Session, selectinload
+
+from app.models.order import Order, OrderItem, OrderStatus
+from app.schemas.seller import FulfillmentUpdate, FulfillmentError
+from app.services.aggregate_service import AggregateService
+from app.services.inventory_service import InventoryService
+
+VALID_TRANSITIONS = {
+    OrderStatus.PENDING: (OrderStatus.CONFIRMED, OrderStatus.CANCELLED),
+    OrderStatus.CONFIRMED: (OrderStatus.PROCESSING, OrderStatus.CANCELLED),
+    OrderStatus.PROCESSING: (OrderStatus.SHIPPED,),
+    OrderStatus.SHIPPED: (OrderStatus.DELIVERED,),
+}
+
+# Used to pick the status to notify about when one order's items move to different statuses
+STATUS_PROGRESS = [
+    OrderStatus.CANCELLED,
+    OrderStatus.CONFIRMED,
+    OrderStatus.PROCESSING,
+    OrderStatus.SHIPPED,
+    OrderStatus.DELIVERED,
+]
+
+
+class StatusNotification(NamedTuple):
+    to_email: str
+    customer_name: str
+    order_number: str
+    order_id: str
+    new_status: str
+    tracking_number: Optional[str]
+
+
+class FulfillmentService:
+    """Service for applying many order item status changes at once"""
+    
+    def __init__(self, db: Session):
+        self.db = db
+        self.aggregates = AggregateService(db)
+        self.inventory = InventoryService(db)
+    
+    def apply(self, seller_id: UUID, updates: List[FulfillmentUpdate]) -> Tuple[int, int, List[FulfillmentError], List[StatusNotification]]:
+        """
+        Apply the valid updates for items of `seller_id`. Does not commit.
+        
+        Returns (items updated, orders whose status changed, errors,
+        notifications to send once committed).
+        """
+        item_ids = [update_.order_item_id for update_ in updates]
+        
+        # Lock the parent orders so concurrent bulk updates of the same orders serialize
+        orders = self.db.query(Order).options(
+            selectinload(Order.items), selectinload(Order.buyer)
+        ).filter(
+            Order.id.in_(select(OrderItem.order_id).where(OrderItem.id.in_(item_ids)))
+        ).with_for_update(of=Order).all()
+        items_by_id = {item.id: item for order in orders for item in order.items}
+        
+        errors: List[FulfillmentError] = []
+        by_status: Dict[OrderStatus, List[OrderItem]] = {}
+        tracking_by_order: Dict[UUID, str] = {}
+        applied_by_order: Dict[UUID, List[OrderStatus]] = {}
+        seen = set()
+        
+        for update_ in updates:
+            item = items_by_id.get(update_.order_item_id)
+            new_status = OrderStatus(update_.status)
+            
+            if update_.order_item_id in seen:
+                detail = "Duplicate update for this item"
+            elif item is None:
+                detail = "Order item not found"
+            elif item.seller_id != seller_id:
+                detail = "Access denied"
+            elif new_status not in VALID_TRANSITIONS.get(item.status, ()):
+                detail = f"Cannot transition from {item.status.value} to {new_status.value}"
+            elif new_status == OrderStatus.SHIPPED and not update_.tracking_number:
+                detail = "Tracking number is required for shipped status"
+            else:
+                detail = None
+            
+            seen.add(update_.order_item_id)
+            if detail:
+                errors.append(FulfillmentError(order_item_id=update_.order_item_id, detail=detail))
+                continue
+            
+            by_status.setdefault(new_status, []).append(item)
+            applied_by_order.setdefault(item.order_id, []).append(new_status)
+            if new_status == OrderStatus.SHIPPED:
+                tracking_by_order[item.order_id] = update_.tracking_number
+        
+        # One UPDATE per target status; cancelled items also return their stock
+        for new_status, items in by_status.items():
+            if new_status == OrderStatus.CANCELLED:
+                self.inventory.restock_order_items(items, new_status)
+            else:
+                self.aggregates.set_order_item_statuses(items, new_status)
+        
+        # Recompute parent orders in one pass: an order takes its items' status once they all agree
+        orders_by_status: Dict[OrderStatus, List[UUID]] = {}
+        notifications = []
+        for order in orders:
+            if order.id not in applied_by_order:
+                continue
+            
+            item_statuses = {item.status for item in order.items}
+            if len(item_statuses) == 1:
+                order_status = item_statuses.pop()
+                if order.status != order_status:
+                    orders_by_status.setdefault(order_status, []).append(order.id)
+            
+            tracking_number = tracking_by_order.get(order.id)
+            if tracking_number:
+                order.tracking_number = tracking_number
+            
+            buyer = order.buyer
+            notified_status = max(applied_by_order[order.id], key=STATUS_PROGRESS.index)
+            notifications.append(StatusNotification(
+                to_email=buyer.email,
+                customer_name=f"{buyer.first_name or ''} {buyer.last_name or ''}".strip() or "Customer",
+                order_number=order.order_number,
+                order_id=str(order.id),
+                new_status=notified_status.value,
+                tracking_number=order.tracking_number if notified_status == OrderStatus.SHIPPED else None
+            ))
+        
+        for order_status, order_ids in orders_by_status.items():
+            self.db.execute(
+                update(Order)
+                .where(Order.id.in_(order_ids))
+                .values(status=order_status)
+                .execution_options(synchronize_session=False)
+            )
+        
+        updated = sum(len(items) for items in by_status.values())
+        orders_updated = sum(len(order_ids) for order_ids in orders_by_status.values())
+        return updated, orders_updated, errors, notifications
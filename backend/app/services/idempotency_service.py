@@ -0,0 +1,157 @@
+"""
+Idempotency Key Service for ShopNest
+
+Lets clients safely retry non-idempotent POSTs (order creation, payment
+intents) by sending an `Idempotency-Key` header.
+
+Flow for a request with a key:
+1. begin() claims the key with INSERT ... ON CONFLICT DO NOTHING and
+   commits, so concurrent retries see it immediately.
+2. If the key already exists:
+   - completed with the same request body -> the stored response is replayed
+   - still in progress                    -> 409 (unless the lock went stale)
+   - used with a different request body   -> 422
+3. The endpoint does its work and calls complete() before its own commit,
+   so the stored response is written atomically with the work.
+4. If the work fails, release() deletes the claim so the client can retry.
+
+Keys expire after IDEMPOTENCY_KEY_TTL_HOURS.
+"""
+
+import hashlib
+import json
+from datetime import datetime, timedelta, timezone
+from typing import Any, Optional, Tuple
+
+from fastapi import HTTPException, status
+from fastapi.encoders import jsonable_encoder
+from sqlalchemy import delete
+from sqlalchemy.dialects.postgresql import insert
+from sqlalchemy.orm import Session
+
+from app.config import settings
+from app.models.idempotency import IdempotencyKey
+
+MAX_KEY_LENGTH = 255
+
+
+def request_fingerprint(payload: Any) -> str:
+    """Stable SHA-256 of a request body"""
+    body = json.dumps(jsonable_encoder(payload), sort_keys=True, separators=(",", ":"))
+    return hashlib.sha256(body.encode()).hexdigest()
+
+
+class IdempotencyService:
+    """Service for claiming, completing and replaying idempotency keys"""
+    
+    def __init__(self, db: Session):
+        self.db = db
+    
+    def begin(self, user_id, endpoint: str, key: Optional[str], payload: Any) -> Tuple[Optional[IdempotencyKey], Optional[IdempotencyKey]]:
+        """
+        Claim `key` for this request.
+        
+        Returns (claim, replay): `claim` is the new row to complete or
+        release, `replay` a completed row whose response should be returned
+        as-is. Both are None when no key was sent. Commits the claim.
+        """
+        if not key:
+            return None, None
+        
+        key = key.strip()
+        if not key or len(key) > MAX_KEY_LENGTH:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail=f"Idempotency-Key must be 1-{MAX_KEY_LENGTH} characters"
+            )
+        
+        request_hash = request_fingerprint(payload)
+        now = datetime.now(timezone.utc)
+        
+        claim_id = self.db.execute(
+            insert(IdempotencyKey)
+            .values(
+                user_id=user_id,
+                endpoint=endpoint,
+                key=key,
+                request_hash=request_hash,
+                expires_at=now + timedelta(hours=settings.IDEMPOTENCY_KEY_TTL_HOURS)
+            )
+            .on_conflict_do_nothing(constraint="uq_idempotency_keys_user_endpoint_key")
+            .returning(IdempotencyKey.id)
+        ).scalar()
+        
+        if claim_id is not None:
+            self.db.commit()
+            return self.db.get(IdempotencyKey, claim_id), None
+        
+        existing = self.db.query(IdempotencyKey).filter(
+            IdempotencyKey.user_id == user_id,
+            IdempotencyKey.endpoint == endpoint,
+            IdempotencyKey.key == key
+        ).with_for_update().first()
+        
+        if existing is None:
+            # Released between our insert and select; try once more
+            self.db.rollback()
+            return self.begin(user_id, endpoint, key, payload)
+        
+        lock_expired = existing.created_at < now - timedelta(seconds=settings.IDEMPOTENCY_LOCK_SECONDS)
+        
+        if existing.expires_at < now or (existing.response_status is None and lock_expired):
+            # Expired key, or a claim abandoned by a crashed request: take it over
+            existing.request_hash = request_hash
+            existing.response_status = None
+            existing.response_body = None
+            existing.created_at = now
+            existing.expires_at = now + timedelta(hours=settings.IDEMPOTENCY_KEY_TTL_HOURS)
+            self.db.commit()
+            return existing, None
+        
+        same_request = existing.request_hash == request_hash
+        in_progress = existing.response_status is None
+        
+        # Read-only from here on: release the row lock, keeping the loaded values
+        self.db.expunge(existing)
+        self.db.commit()
+        
+        if not same_request:
+            raise HTTPException(
+                status_code=status.HTTP_422_UNPROCESSABLE_ENTITY,
+                detail="Idempotency-Key was already used with a different request"
+            )
+        
+        if in_progress:
+            raise HTTPException(
+                status_code=status.HTTP_409_CONFLICT,
+                detail="A request with this Idempotency-Key is still being processed"
+            )
+        
+        return None, existing
+    
+    def complete(self, claim: Optional[IdempotencyKey], status_code: int, body: Any) -> None:
+        """Store the response for a claim. Does not commit."""
+        if claim is None:
+            return
+        claim.response_status = status_code
+        claim.response_body = jsonable_encoder(body)
+    
+    def release(self, claim: Optional[IdempotencyKey]) -> None:
+        """Drop a claim after the request failed, so the key can be retried. Commits."""
+        if claim is None:
+            return
+        self.db.execute(
+            delete(IdempotencyKey)
+            .where(IdempotencyKey.id == claim.id, IdempotencyKey.response_status.is_(None))
+            .execution_options(synchronize_session=False)
+        )
+        self.db.commit()
+    
+    def purge_expired(self) -> int:
+        """Delete expired keys. Does not commit. Returns the number removed."""
+        result = self.db.execute(
+            delete(IdempotencyKey)
+            .where(IdempotencyKey.expires_at < datetime.now(timezone.utc))
+            .execution_options(synchronize_session=False)
+        )
+        return result.rowcount
@@ -0,0 +1,241 @@
+"""
+Image Pipeline Service for ShopNest
+
+Ingests product images into local media storage and generates WebP
+derivatives at fixed sizes, so list views can serve small files instead of
+full-size originals.
+
+- Originals are downloaded once (size- and time-limited) into
+  MEDIA_ROOT/originals; images uploaded to the blob store are read from it
+  directly. Downloads only go to public addresses: every host, including
+  each redirect target, is resolved and rejected if private, loopback or
+  link-local
+- Only MEDIA_ROOT/products (the derivatives) is served as static files.
+  Originals are arbitrary remote bytes and never are: a download Pillow
+  cannot open, or cannot render, is deleted
+- Resizing runs in a process pool, so CPU-heavy Pillow work neither blocks
+  the event loop nor contends for the GIL with request threads
+- Derivative URLs are stored on ProductImage (thumbnail_url, medium_url)
+
+New images are processed in the background after a product is saved;
+process_images.py backfills anything still pending (e.g. bulk imports).
+"""
+
+import hashlib
+import ipaddress
+import logging
+import os
+import socket
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional
+from urllib.parse import urlsplit
+from uuid import UUID
+
+import httpx
+from PIL import Image
+
+from app.config import settings
+from app.database import SessionLocal
+from app.models.product import ProductImage
+from app.services.blob_store import blob_path, digest_from_url
+
+logger = logging.getLogger(__name__)
+
+
+# Fixed derivative sizes (longest edge, in px) and the ProductImage column each fills
+VARIANTS = {
+    "thumbnail_url": 200,
+    "medium_url": 600,
+}
+
+WEBP_QUALITY = 80
+MAX_SOURCE_BYTES = 15 * 1024 * 1024
+DOWNLOAD_TIMEOUT = 15.0
+MAX_REDIRECTS = 5
+
+_pool: Optional[ProcessPoolExecutor] = None
+
+
+def get_pool() -> ProcessPoolExecutor:
+    """Process pool for image rendering, created on first use"""
+    global _pool
+    if _pool is None:
+        _pool = ProcessPoolExecutor(max_workers=settings.IMAGE_WORKERS)
+    return _pool
+
+
+def shutdown_pool() -> None:
+    """Stop the rendering pool (called on application shutdown)"""
+    global _pool
+    if _pool is not None:
+        _pool.shutdown(wait=False, cancel_futures=True)
+        _pool = None
+
+
+def media_path(*parts: str) -> Path:
+    return Path(settings.MEDIA_ROOT).joinpath(*parts)
+
+
+def media_url(*parts: str) -> str:
+    return "/".join([settings.MEDIA_URL.rstrip("/"), *parts])
+
+
+def render_variants(source_path: str, output_dir: str, sizes: Dict[str, int]) -> Dict[str, str]:
+    """
+    Render WebP derivatives of one image (runs in a worker process).
+    
+    Returns a map of variant name to written file name.
+    """
+    written = {}
+    os.makedirs(output_dir, exist_ok=True)
+    
+    with Image.open(source_path) as source:
+        source.load()
+        if source.mode not in ("RGB", "RGBA"):
+            source = source.convert("RGBA" if "transparency" in source.info else "RGB")
+        
+        for name, size in sizes.items():
+            variant = source.copy()
+            variant.thumbnail((size, size), Image.LANCZOS)
+            filename = f"{size}.webp"
+            tmp_path = os.path.join(output_dir, f".{filename}.tmp")
+            variant.save(tmp_path, "WEBP", quality=WEBP_QUALITY, method=4)
+            os.replace(tmp_path, os.path.join(output_dir, filename))
+            written[name] = filename
+    
+    return written
+
+
+def check_public_url(url: str) -> None:
+    """Raise ValueError unless `url` is http(s) and its host resolves only to public addresses"""
+    parsed = urlsplit(url)
+    if parsed.scheme not in ("http", "https") or not parsed.hostname:
+        raise ValueError(f"Unsupported image URL: {url}")
+    
+    try:
+        addresses = socket.getaddrinfo(parsed.hostname, parsed.port or (443 if parsed.scheme == "https" else 80))
+    except socket.gaierror:
+        raise ValueError(f"Cannot resolve image host: {parsed.hostname}")
+    
+    for *_, sockaddr in addresses:
+        address = ipaddress.ip_address(sockaddr[0].split("%", 1)[0])
+        if address.version == 6 and address.ipv4_mapped:
+            address = address.ipv4_mapped
+        if not address.is_global or address.is_multicast:
+            raise ValueError(f"Image host {parsed.hostname} resolves to a non-public address")
+
+
+def download_original(url: str, destination: Path) -> None:
+    """
+    Download an image to local storage with size and time limits. Nothing
+    is kept unless Pillow recognizes the download as an image.
+    """
+    destination.parent.mkdir(parents=True, exist_ok=True)
+    tmp_path = destination.with_suffix(".tmp")
+    received = 0
+    
+    try:
+        with httpx.Client(timeout=DOWNLOAD_TIMEOUT, follow_redirects=False) as client:
+            # Redirects are followed by hand so every hop is checked
+            for _ in range(MAX_REDIRECTS + 1):
+                check_public_url(url)
+                with client.stream("GET", url) as response:
+                    if response.is_redirect:
+                        url = str(response.url.join(response.headers["location"]))
+                        continue
+                    
+                    response.raise_for_status()
+                    with open(tmp_path, "wb") as out:
+                        for chunk in response.iter_bytes():
+                            received += len(chunk)
+                            if received > MAX_SOURCE_BYTES:
+                                raise ValueError(f"Image exceeds {MAX_SOURCE_BYTES} bytes: {url}")
+                            out.write(chunk)
+                    break
+            else:
+                raise ValueError(f"Too many redirects: {url}")
+        
+        try:
+            with Image.open(tmp_path) as downloaded:
+                downloaded.verify()
+        except Exception as e:
+            raise ValueError(f"Not a valid image: {url} ({e})")
+        
+        os.replace(tmp_path, destination)
+    finally:
+        tmp_path.unlink(missing_ok=True)
+
+
+class ImageService:
+    """Service for ingesting product images and generating derivatives"""
+    
+    def __init__(self, db):
+        self.db = db
+    
+    def _source_for(self, image: ProductImage) -> Path:
+        """Local copy of an image's original, downloaded if not already stored"""
+        digest = digest_from_url(image.image_url)
+        if digest and blob_path(digest).exists():
+            return blob_path(digest)
+        
+        key = hashlib.sha256(image.image_url.encode()).hexdigest()
+        source = media_path("originals", key[:2], key)
+        if not source.exists():
+            download_original(image.image_url, source)
+        return source
+    
+    def process_images(self, images: Iterable[ProductImage]) -> int:
+        """
+        Ingest images and render their derivatives in the process pool.
+        
+        Downloads happen in this thread; rendering happens in parallel in
+        worker processes. Failures are logged and leave the image pending.
+        Does not commit. Returns the number of images processed.
+        """
+        pool = get_pool()
+        futures = {}
+        
+        for image in images:
+            try:
+                source = self._source_for(image)
+            except Exception as e:
+                logger.warning(f"Could not ingest image {image.id} ({image.image_url}): {e}")
+                continue
+            output_dir = media_path("products", str(image.id))
+            future = pool.submit(render_variants, str(source), str(output_dir), VARIANTS)
+            futures[future] = (image, source)
+        
+        processed = 0
+        for future in as_completed(futures):
+            image, source = futures[future]
+            try:
+                written = future.result()
+            except Exception as e:
+                logger.warning(f"Could not render image {image.id}: {e}")
+                # Downloads that fail to render are not kept (blobs are managed by the blob store)
+                if media_path("originals") in source.parents:
+                    source.unlink(missing_ok=True)
+                continue
+            for column, filename in written.items():
+                setattr(image, column, media_url("products", str(image.id), filename))
+            processed += 1
+        
+        return processed
+
+
+def process_product_images(image_ids: List[UUID]) -> None:
+    """Background task: generate derivatives for newly saved images"""
+    if not image_ids:
+        return
+    
+    db = SessionLocal()
+    try:
+        images = db.query(ProductImage).filter(ProductImage.id.in_(image_ids)).all()
+        ImageService(db).process_images(images)
+        db.commit()
+    except Exception as e:
+        db.rollback()
+        logger.error(f"Image processing failed: {e}")
+    finally:
+        db.close()
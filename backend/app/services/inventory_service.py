@@ -0,0 +1,314 @@
+"""
+Inventory Service for ShopNest
+
+Stock reservations for unpaid orders, and set-based stock adjustments.
+
+- Only orders paid through Stripe hold stock: create_order records a hold
+  per line for STRIPE_PAYMENT_METHODS, and starting a Stripe payment
+  creates (or extends) the holds of any other order; holds expire after
+  STOCK_RESERVATION_MINUTES. Cash on delivery, mobile money, ... orders
+  never hold stock, since they never become PAID here
+- Paying the order commits its holds: the decrement becomes permanent
+- A background sweeper cancels the still PENDING items of unpaid orders
+  whose holds expired and puts their stock back with one
+  UPDATE ... FROM (VALUES ...) per batch; the order itself is cancelled
+  once none of its items is left
+- Cancellations and refunds return stock the same way (restock_order_items),
+  whatever the number of lines; items already cancelled or refunded are
+  never restocked twice
+- Orders are locked with FOR UPDATE SKIP LOCKED, so several app processes
+  can sweep at once
+- A payment that lands after its order expired is recorded as paid on the
+  cancelled order and logged for a refund; it never revives the order,
+  and the refund does not restock it again
+"""
+
+import asyncio
+import logging
+from datetime import datetime, timedelta, timezone
+from typing import Dict, Iterable, List, Optional, Tuple
+from uuid import UUID
+
+from sqlalchemy import Integer, cast, column, exists, func, select, tuple_, update, values
+from sqlalchemy.dialects.postgresql import UUID as PG_UUID
+from sqlalchemy.orm import Session
+from starlette.concurrency import run_in_threadpool
+
+from app.config import settings
+from app.database import SessionLocal
+from app.models.order import Order, OrderItem, OrderStatus, PaymentStatus
+from app.models.product import Product
+from app.models.stock_reservation import StockReservation
+from app.services.aggregate_service import RETURNED_STATUSES, AggregateService
+from app.utils.metrics import background_items, background_runs
+
+logger = logging.getLogger(__name__)
+
+EXPIRED_REASON = "Payment not received before the stock reservation expired"
+
+# Payment methods settled through Stripe (create-intent / confirm / webhooks)
+STRIPE_PAYMENT_METHODS = ("stripe",)
+
+
+def pays_through_stripe(order: Order) -> bool:
+    """Whether `order` can become PAID (and so may hold stock until it does)"""
+    return order.payment_method in STRIPE_PAYMENT_METHODS or bool(order.stripe_payment_intent_id)
+
+
+class InventoryService:
+    """Service for stock holds and bulk stock adjustments"""
+    
+    def __init__(self, db: Session):
+        self.db = db
+        self.aggregates = AggregateService(db)
+    
+    def restock(self, quantities: Dict[UUID, int]) -> None:
+        """
+        Put stock back for many products in one statement. Does not commit.
+        
+        `quantities` maps product id to the number of units returned; sales
+        counts are reduced by the same amount (never below zero).
+        """
+        quantities = {product_id: quantity for product_id, quantity in quantities.items() if quantity}
+        if not quantities:
+            return
+        
+        returned = values(
+            column("product_id", PG_UUID(as_uuid=True)),
+            column("quantity", Integer),
+            name="returned"
+        ).data(sorted(quantities.items(), key=lambda row: str(row[0])))
+        
+        self.db.execute(
+            update(Product)
+            .where(Product.id == cast(returned.c.product_id, PG_UUID(as_uuid=True)))
+            .values(
+                quantity=Product.quantity + returned.c.quantity,
+                sales_count=func.greatest(Product.sales_count - returned.c.quantity, 0)
+            )
+            .execution_options(synchronize_session=False)
+        )
+    
+    def restock_order_items(self, items: Iterable[OrderItem], new_status: OrderStatus) -> None:
+        """
+        Return the stock of order items and move them to `new_status`
+        (cancellations and refunds). One UPDATE for the products, one for
+        the item statuses, plus seller sales rollups. Items already cancelled
+        or refunded (e.g. cancelled one by one by their seller) returned their
+        stock then and are skipped. Holds on the returned lines are released
+        so the sweeper cannot restock them again. Does not commit.
+        """
+        items = [item for item in items if item.status not in RETURNED_STATUSES]
+        if not items:
+            return
+        quantities: Dict[UUID, int] = {}
+        for item in items:
+            quantities[item.product_id] = quantities.get(item.product_id, 0) + item.quantity
+        
+        self.restock(quantities)
+        self.aggregates.set_order_item_statuses(items, new_status)
+        self.db.query(StockReservation).filter(
+            tuple_(StockReservation.order_id, StockReservation.product_id).in_(
+                list({(item.order_id, item.product_id) for item in items})
+            ),
+            StockReservation.status == "held"
+        ).update(
+            {"status": "released", "resolved_at": datetime.now(timezone.utc)},
+            synchronize_session=False
+        )
+    
+    def hold(self, order_id: UUID, lines: Iterable[Tuple[UUID, int]]) -> None:
+        """Record holds for stock already taken by a new order. Does not commit."""
+        expires_at = datetime.now(timezone.utc) + timedelta(minutes=settings.STOCK_RESERVATION_MINUTES)
+        self.db.add_all([
+            StockReservation(
+                order_id=order_id,
+                product_id=product_id,
+                quantity=quantity,
+                status="held",
+                expires_at=expires_at
+            )
+            for product_id, quantity in lines
+        ])
+    
+    def extend_holds(self, order: Order) -> None:
+        """
+        Give a buyer who started a Stripe payment a full reservation window.
+        Orders that never held stock (placed with another payment method)
+        get holds for their pending items. Does not commit.
+        """
+        extended = self._held(order.id).update(
+            {"expires_at": datetime.now(timezone.utc) + timedelta(minutes=settings.STOCK_RESERVATION_MINUTES)},
+            synchronize_session=False
+        )
+        if extended:
+            return
+        
+        # Holds already committed or released are never recreated
+        has_holds = self.db.query(StockReservation.id).filter(StockReservation.order_id == order.id).first()
+        if not has_holds:
+            self.hold(order.id, [
+                (item.product_id, item.quantity) for item in order.items if item.status == OrderStatus.PENDING
+            ])
+    
+    def commit_holds(self, order_id: UUID) -> None:
+        """Make an order's stock decrement permanent (it was paid). Does not commit."""
+        self._resolve([order_id], "committed")
+    
+    def release_holds(self, order_id: UUID) -> None:
+        """
+        Drop an order's holds without restocking, for callers that restock
+        the order themselves (e.g. cancel_order). Does not commit.
+        """
+        self._resolve([order_id], "released")
+    
+    def _held(self, order_id: UUID):
+        return self.db.query(StockReservation).filter(
+            StockReservation.order_id == order_id,
+            StockReservation.status == "held"
+        )
+    
+    def _resolve(self, order_ids: List[UUID], new_status: str) -> None:
+        if not order_ids:
+            return
+        self.db.query(StockReservation).filter(
+            StockReservation.order_id.in_(order_ids),
+            StockReservation.status == "held"
+        ).update(
+            {"status": new_status, "resolved_at": datetime.now(timezone.utc)},
+            synchronize_session=False
+        )
+    
+    def release_expired(self, limit: int) -> int:
+        """
+        Resolve expired holds of up to `limit` orders. Commits.
+        
+        Still PENDING items of unpaid Stripe orders are cancelled and
+        restocked; items a seller already moved on are left alone, and the
+        order is cancelled only when no other item is left. Holds of orders
+        that were paid or cancelled meanwhile, or that do not pay through
+        Stripe, are just closed. Returns the number of orders handled.
+        """
+        now = datetime.now(timezone.utc)
+        order_ids = self.db.execute(
+            select(StockReservation.order_id)
+            .where(StockReservation.status == "held", StockReservation.expires_at <= now)
+            .group_by(StockReservation.order_id)
+            .limit(limit)
+        ).scalars().all()
+        if not order_ids:
+            return 0
+        
+        # Orders being paid or cancelled right now (both lock the order) are
+        # skipped until the next sweep
+        orders = self.db.query(Order).filter(
+            Order.id.in_(order_ids)
+        ).with_for_update(skip_locked=True).all()
+        
+        expired = [
+            order.id for order in orders
+            if order.status == OrderStatus.PENDING
+            and order.payment_status != PaymentStatus.PAID
+            and pays_through_stripe(order)
+        ]
+        paid = [order.id for order in orders if order.payment_status == PaymentStatus.PAID]
+        # Anything else was cancelled (and restocked) by other means, or never needed a hold
+        settled = [order.id for order in orders if order.id not in expired and order.id not in paid]
+        
+        if expired:
+            pending_items = self.db.query(
+                OrderItem.id, OrderItem.product_id, OrderItem.quantity
+            ).filter(
+                OrderItem.order_id.in_(expired),
+                OrderItem.status == OrderStatus.PENDING
+            ).all()
+            
+            quantities: Dict[UUID, int] = {}
+            for _, product_id, quantity in pending_items:
+                quantities[product_id] = quantities.get(product_id, 0) + quantity
+            self.restock(quantities)
+            
+            # Pending items carry no seller sales, so no rollups to adjust
+            if pending_items:
+                self.db.execute(
+                    update(OrderItem)
+                    .where(OrderItem.id.in_([item_id for item_id, _, _ in pending_items]))
+                    .values(status=OrderStatus.CANCELLED)
+                    .execution_options(synchronize_session=False)
+                )
+            
+            # Orders left with only cancelled items are cancelled themselves
+            self.db.execute(
+                update(Order)
+                .where(
+                    Order.id.in_(expired),
+                    ~exists().where(OrderItem.order_id == Order.id, OrderItem.status != OrderStatus.CANCELLED)
+                )
+                .values(status=OrderStatus.CANCELLED, cancelled_at=now, cancelled_reason=EXPIRED_REASON)
+                .execution_options(synchronize_session=False)
+            )
+        
+        self._resolve(expired + settled, "released")
+        self._resolve(paid, "committed")
+        self.db.commit()
+        
+        if expired:
+            logger.info(f"Released stock of {len(pending_items)} items of {len(expired)} expired orders")
+        return len(orders)
+    
+    def sweep(self, batch_size: Optional[int] = None) -> int:
+        """Resolve expired holds until none are left. Returns the number of orders handled."""
+        batch_size = batch_size or settings.RESERVATION_SWEEP_BATCH_SIZE
+        total = 0
+        while True:
+            handled = self.release_expired(batch_size)
+            total += handled
+            # A short batch means the backlog is done (or the rest is locked by other workers)
+            if handled < batch_size:
+                return total
+
+
+def sweep_expired_reservations() -> int:
+    """Release expired holds with a dedicated session"""
+    db = SessionLocal()
+    try:
+        return InventoryService(db).sweep()
+    finally:
+        db.close()
+
+
+# ============= Background sweeper =============
+
+_sweeper = None
+
+
+async def _run_sweeper() -> None:
+    while True:
+        await asyncio.sleep(settings.RESERVATION_SWEEP_SECONDS)
+        try:
+            handled = await run_in_threadpool(sweep_expired_reservations)
+            background_runs.inc(job="reservation_sweep", outcome="ok")
+            background_items.inc(handled, job="reservation_sweep")
+        except Exception as e:
+            background_runs.inc(job="reservation_sweep", outcome="error")
+            logger.error(f"Reservation sweeper error: {e}")
+
+
+def start_reservation_sweeper() -> None:
+    """Start releasing expired holds periodically (called on application startup)"""
+    global _sweeper
+    if not settings.RESERVATION_SWEEPER_ENABLED or _sweeper is not None:
+        return
+    _sweeper = asyncio.create_task(_run_sweeper())
+
+
+async def stop_reservation_sweeper() -> None:
+    """Stop the sweeper (called on application shutdown)"""
+    global _sweeper
+    if _sweeper is not None:
+        _sweeper.cancel()
+        try:
+            await _sweeper
+        except asyncio.CancelledError:
+            pass
+        _sweeper = None
@@ -0,0 +1,281 @@
+"""
+Payment Gateway for ShopNest
+
+Async access to the payment provider, used by the payment endpoints
+instead of the blocking Stripe SDK calls.
+
+- StripeGateway talks to the Stripe REST API with a pooled httpx.AsyncClient,
+  per-call timeouts, retries with exponential backoff and full jitter, and a
+  circuit breaker that fails fast while Stripe is unreachable
+- FakeGateway keeps payment intents in memory so the payment flow can be
+  run and load-tested offline (PAYMENT_GATEWAY=fake)
+
+Webhook signature checks stay on the Stripe SDK: they are local CPU work,
+not network calls.
+"""
+
+import asyncio
+import logging
+import random
+import secrets
+import time
+import uuid
+from typing import Dict, NamedTuple, Optional
+
+import httpx
+
+from app.config import settings
+
+logger = logging.getLogger(__name__)
+
+
+class PaymentIntent(NamedTuple):
+    id: str
+    status: str
+    client_secret: Optional[str]
+    amount: int  # Smallest currency unit (cents)
+    currency: str
+    metadata: Dict[str, str]
+
+
+class PaymentGatewayError(Exception):
+    """The provider rejected the request (bad parameters, card errors, ...)"""
+    pass
+
+
+class PaymentIntentNotFound(PaymentGatewayError):
+    pass
+
+
+class PaymentGatewayUnavailable(PaymentGatewayError):
+    """The provider could not be reached (timeouts, 5xx, open circuit)"""
+    pass
+
+
+class CircuitBreaker:
+    """
+    Consecutive-failure circuit breaker.
+    
+    After `failure_threshold` failures in a row the circuit opens and calls
+    fail immediately for `reset_timeout` seconds. Then it is half-open: one
+    call is let through as a probe while the others keep failing fast;
+    success closes the circuit, failure re-opens it. A probe that never
+    reports back (e.g. cancelled) is replaced after another `reset_timeout`.
+    
+    Used from the event loop only, so the check-and-claim needs no lock.
+    """
+    
+    def __init__(self, failure_threshold: int, reset_timeout: float):
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.failures = 0
+        self.opened_at: Optional[float] = None
+        self.probe_started_at: Optional[float] = None
+    
+    @property
+    def is_open(self) -> bool:
+        return self.opened_at is not None and time.monotonic() - self.opened_at < self.reset_timeout
+    
+    def before_call(self) -> None:
+        if self.opened_at is None:
+            return
+        now = time.monotonic()
+        if self.is_open or (
+            self.probe_started_at is not None and now - self.probe_started_at < self.reset_timeout
+        ):
+            raise PaymentGatewayUnavailable("Payment provider temporarily unavailable")
+        self.probe_started_at = now
+    
+    def record_success(self) -> None:
+        self.failures = 0
+        self.opened_at = None
+        self.probe_started_at = None
+    
+    def record_failure(self) -> None:
+        self.failures += 1
+        if self.failures >= self.failure_threshold:
+            if self.opened_at is None or not self.is_open:
+                logger.warning(f"Payment gateway circuit opened after {self.failures} failures")
+            self.opened_at = time.monotonic()
+            self.probe_started_at = None
+
+
+def flatten_form(data: dict, prefix: str = "") -> dict:
+    """Encode nested dicts the way Stripe expects (metadata[order_id]=...)"""
+    flat = {}
+    for key, value in data.items():
+        name = f"{prefix}[{key}]" if prefix else key
+        if isinstance(value, dict):
+            flat.update(flatten_form(value, name))
+        elif isinstance(value, bool):
+            flat[name] = "true" if value else "false"
+        elif value is not None:
+            flat[name] = str(value)
+    return flat
+
+
+def to_payment_intent(data: dict) -> PaymentIntent:
+    return PaymentIntent(
+        id=data["id"],
+        status=data["status"],
+        client_secret=data.get("client_secret"),
+        amount=data["amount"],
+        currency=data["currency"],
+        metadata=data.get("metadata") or {}
+    )
+
+
+class StripeGateway:
+    """Async Stripe REST client with timeouts, retries and a circuit breaker"""
+    
+    RETRY_STATUSES = {409, 429, 500, 502, 503, 504}
+    
+    def __init__(self):
+        self.max_retries = settings.STRIPE_MAX_RETRIES
+        self.backoff_base = 0.25
+        self.breaker = CircuitBreaker(
+            settings.STRIPE_CIRCUIT_FAILURE_THRESHOLD,
+            settings.STRIPE_CIRCUIT_RESET_SECONDS
+        )
+        self.client = httpx.AsyncClient(
+            base_url=settings.STRIPE_API_BASE,
+            auth=(settings.STRIPE_SECRET_KEY, ""),
+            timeout=httpx.Timeout(settings.STRIPE_TIMEOUT_SECONDS, connect=settings.STRIPE_CONNECT_TIMEOUT_SECONDS),
+            limits=httpx.Limits(max_connections=50, max_keepalive_connections=20)
+        )
+    
+    async def close(self) -> None:
+        await self.client.aclose()
+    
+    async def _request(self, method: str, path: str, data: Optional[dict] = None,
+                       idempotency_key: Optional[str] = None) -> dict:
+        """
+        Send one API call, retrying transient failures.
+        
+        POSTs always carry an Idempotency-Key (generated if not given), so a
+        retried create can never charge or create twice.
+        """
+        self.breaker.before_call()
+        
+        headers = {}
+        if method == "POST":
+            headers["Idempotency-Key"] = idempotency_key or str(uuid.uuid4())
+        
+        last_error = None
+        for attempt in range(self.max_retries + 1):
+            if attempt:
+                # Exponential backoff with full jitter
+                await asyncio.sleep(random.uniform(0, self.backoff_base * 2 ** attempt))
+            try:
+                response = await self.client.request(
+                    method, path, data=flatten_form(data) if data else None, headers=headers
+                )
+            except httpx.TransportError as e:
+                last_error = f"{type(e).__name__}: {e}"
+                continue
+            
+            if response.status_code in self.RETRY_STATUSES:
+                last_error = f"HTTP {response.status_code}"
+                continue
+            
+            self.breaker.record_success()
+            try:
+                body = response.json()
+            except ValueError:
+                raise PaymentGatewayError(f"Invalid response from payment provider (HTTP {response.status_code})")
+            if response.is_success:
+                return body
+            
+            error = body.get("error", {})
+            message = error.get("message") or f"HTTP {response.status_code}"
+            if response.status_code == 404 or error.get("code") == "resource_missing":
+                raise PaymentIntentNotFound(message)
+            raise PaymentGatewayError(message)
+        
+        self.breaker.record_failure()
+        raise PaymentGatewayUnavailable(f"Payment provider unavailable ({last_error})")
+    
+    async def create_payment_intent(self, amount: int, currency: str, metadata: Dict[str, str],
+                                    description: str, idempotency_key: Optional[str] = None) -> PaymentIntent:
+        data = await self._request("POST", "/payment_intents", {
+            "amount": amount,
+            "currency": currency,
+            "metadata": metadata,
+            "description": description,
+            "automatic_payment_methods": {"enabled": True}
+        }, idempotency_key=idempotency_key)
+        return to_payment_intent(data)
+    
+    async def retrieve_payment_intent(self, intent_id: str) -> PaymentIntent:
+        data = await self._request("GET", f"/payment_intents/{intent_id}")
+        return to_payment_intent(data)
+
+
+class FakeGateway:
+    """
+    In-memory gateway for offline runs and load tests.
+    
+    Intents are created in `requires_payment_method`. With
+    PAYMENT_FAKE_AUTO_SUCCEED they report `succeeded` when retrieved, as if
+    the buyer had paid. PAYMENT_FAKE_LATENCY_MS simulates provider latency.
+    """
+    
+    def __init__(self):
+        self.intents: Dict[str, PaymentIntent] = {}
+        self.idempotent: Dict[str, str] = {}
+    
+    async def close(self) -> None:
+        pass
+    
+    async def _latency(self) -> None:
+        if settings.PAYMENT_FAKE_LATENCY_MS:
+            await asyncio.sleep(settings.PAYMENT_FAKE_LATENCY_MS / 1000)
+    
+    async def create_payment_intent(self, amount: int, currency: str, metadata: Dict[str, str],
+                                    description: str, idempotency_key: Optional[str] = None) -> PaymentIntent:
+        await self._latency()
+        if idempotency_key and idempotency_key in self.idempotent:
+            return self.intents[self.idempotent[idempotency_key]]
+        
+        intent_id = f"pi_fake_{secrets.token_hex(12)}"
+        intent = PaymentIntent(
+            id=intent_id,
+            status="requires_payment_method",
+            client_secret=f"{intent_id}_secret_{secrets.token_hex(12)}",
+            amount=amount,
+            currency=currency,
+            metadata=dict(metadata)
+        )
+        self.intents[intent_id] = intent
+        if idempotency_key:
+            self.idempotent[idempotency_key] = intent_id
+        return intent
+    
+    async def retrieve_payment_intent(self, intent_id: str) -> PaymentIntent:
+        await self._latency()
+        intent = self.intents.get(intent_id)
+        if intent is None:
+            raise PaymentIntentNotFound(f"No such payment_intent: '{intent_id}'")
+        if settings.PAYMENT_FAKE_AUTO_SUCCEED and intent.status != "succeeded":
+            intent = intent._replace(status="succeeded")
+            self.intents[intent_id] = intent
+        return intent
+
+
+_gateway = None
+
+
+def get_payment_gateway():
+    """The configured gateway (FastAPI dependency), created on first use"""
+    global _gateway
+    if _gateway is None:
+        _gateway = FakeGateway() if settings.PAYMENT_GATEWAY == "fake" else StripeGateway()
+    return _gateway
+
+
+async def close_payment_gateway() -> None:
+    """Close pooled connections (called on application shutdown)"""
+    global _gateway
+    if _gateway is not None:
+        await _gateway.close()
+        _gateway = None
@@ -0,0 +1,292 @@
+"""
+Product Import Service for ShopNest
+
+Bulk create/update of a seller's catalog from CSV or NDJSON.
+
+Input is streamed and processed in chunks. Each chunk is validated row by
+row with Pydantic, then checked against the database with a fixed number
+of set-based queries (categories, SKUs, slugs), and written with
+executemany-style bulk INSERT/UPDATE statements. Every chunk is committed
+on its own, so a bad row never blocks the rest of the file; row-level
+problems are collected and reported back with their row numbers.
+"""
+
+import csv
+import io
+import json
+import logging
+import uuid
+from sqlalchemy.orm import Session
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy import insert, update, delete, or_
+from pydantic import ValidationError
+from app.models.product import Product, ProductImage
+from app.models.category import Category
+from app.models.seller import SellerProfile
+from app.schemas.product import ProductImportRow, ProductImportError, ProductImportResult
+from app.services.slug_service import SlugAllocator, is_slug_violation, MAX_ATTEMPTS
+from typing import Dict, Iterable, Iterator, List, Optional, Tuple, BinaryIO
+
+logger = logging.getLogger(__name__)
+
+
+DEFAULT_CHUNK_SIZE = 500
+
+# Product columns written from an import row (besides id/seller/category/slug)
+IMPORT_FIELDS = (
+    "name", "description", "price", "compare_at_price", "cost_per_item",
+    "sku", "barcode", "quantity", "low_stock_threshold", "weight",
+    "is_digital", "digital_file_url", "is_active"
+)
+
+
+def iter_import_rows(stream: BinaryIO, file_format: str) -> Iterator[Tuple[int, object]]:
+    """
+    Stream (row_number, raw_row) pairs from a CSV or NDJSON byte stream.
+    
+    raw_row is a dict, or an error message string for lines that cannot be
+    parsed. Blank CSV cells are dropped so schema defaults apply. Reading
+    stops with an error row at the first bytes that are not UTF-8.
+    """
+    text = io.TextIOWrapper(stream, encoding="utf-8-sig", newline="")
+    row_number = 0
+    
+    try:
+        if file_format == "csv":
+            for row_number, row in enumerate(csv.DictReader(text), start=1):
+                data = {key.strip(): value.strip() for key, value in row.items() if key and value and value.strip()}
+                if "image_urls" in data:
+                    data["image_urls"] = [url.strip() for url in data["image_urls"].split("|") if url.strip()]
+                yield row_number, data
+        else:
+            for line in text:
+                if not line.strip():
+                    continue
+                row_number += 1
+                try:
+                    data = json.loads(line)
+                except ValueError as e:
+                    yield row_number, f"Invalid JSON: {e}"
+                    continue
+                if not isinstance(data, dict):
+                    yield row_number, "Each NDJSON line must be a JSON object"
+                    continue
+                yield row_number, data
+    except UnicodeDecodeError:
+        yield row_number + 1, "File is not valid UTF-8; this row and the rest of the file were not imported"
+
+
+def chunked(rows: Iterable, size: int) -> Iterator[list]:
+    """Group an iterable into lists of at most `size` items"""
+    chunk = []
+    for row in rows:
+        chunk.append(row)
+        if len(chunk) >= size:
+            yield chunk
+            chunk = []
+    if chunk:
+        yield chunk
+
+
+class ProductImportService:
+    """Service for bulk importing products for one seller"""
+    
+    def __init__(self, db: Session, seller: SellerProfile, chunk_size: int = DEFAULT_CHUNK_SIZE):
+        self.db = db
+        self.seller = seller
+        self.chunk_size = chunk_size
+        self.result = ProductImportResult()
+        self._category_ids_by_slug: Dict[str, object] = {}
+        self._known_category_ids = set()
+        self._seen_skus = set()
+    
+    def import_stream(self, stream: BinaryIO, file_format: str) -> ProductImportResult:
+        """Import a CSV/NDJSON stream and return the summary with per-row errors"""
+        for chunk in chunked(iter_import_rows(stream, file_format), self.chunk_size):
+            self._import_chunk(chunk)
+        return self.result
+    
+    # ============= Chunk processing =============
+    
+    def _error(self, row_number: int, message: str, sku: Optional[str] = None) -> None:
+        self.result.failed += 1
+        self.result.errors.append(ProductImportError(row=row_number, sku=sku, message=message))
+    
+    def _import_chunk(self, chunk: List[Tuple[int, object]]) -> None:
+        self.result.total_rows += len(chunk)
+        
+        # 1. Row-level validation
+        rows: List[Tuple[int, ProductImportRow]] = []
+        chunk_skus = set()
+        for row_number, raw in chunk:
+            if isinstance(raw, str):
+                self._error(row_number, raw)
+                continue
+            try:
+                row = ProductImportRow.model_validate(raw)
+            except ValidationError as e:
+                details = "; ".join(
+                    f"{'.'.join(str(part) for part in err['loc'])}: {err['msg']}" for err in e.errors()
+                )
+                self._error(row_number, details, raw.get("sku"))
+                continue
+            if not row.category_id and not row.category_slug:
+                self._error(row_number, "category_id or category_slug is required", row.sku)
+                continue
+            if row.sku:
+                if row.sku in self._seen_skus or row.sku in chunk_skus:
+                    self._error(row_number, "Duplicate SKU in import file", row.sku)
+                    continue
+                chunk_skus.add(row.sku)
+            rows.append((row_number, row))
+        
+        if not rows:
+            return
+        
+        # 2. Set-based checks: categories and SKUs
+        self._load_categories(rows)
+        existing_by_sku = self._load_existing_skus([row.sku for _, row in rows if row.sku])
+        
+        to_create: List[Tuple[int, ProductImportRow, object]] = []
+        to_update: List[Tuple[int, ProductImportRow, object, object]] = []
+        for row_number, row in rows:
+            category_id = self._resolve_category(row)
+            if category_id is None:
+                self._error(row_number, "Category not found", row.sku)
+                continue
+            existing = existing_by_sku.get(row.sku) if row.sku else None
+            if existing is None:
+                to_create.append((row_number, row, category_id))
+            elif existing.seller_id != self.seller.id:
+                self._error(row_number, "SKU already exists", row.sku)
+            else:
+                to_update.append((row_number, row, category_id, existing.id))
+        
+        # 3. Bulk writes, committed per chunk (retried if a slug was taken concurrently)
+        for attempt in range(MAX_ATTEMPTS):
+            try:
+                self._write(to_create, to_update)
+                self.db.commit()
+                break
+            except IntegrityError as e:
+                self.db.rollback()
+                if is_slug_violation(e) and attempt < MAX_ATTEMPTS - 1:
+                    continue
+                self._fail_chunk(to_create + to_update, e)
+                return
+            except Exception as e:
+                self.db.rollback()
+                self._fail_chunk(to_create + to_update, e)
+                return
+        
+        self.result.created += len(to_create)
+        self.result.updated += len(to_update)
+        # Only SKUs that were written count as seen; rows of a failed chunk can be fixed later in the file
+        self._seen_skus.update(row.sku for _, row, *_ in to_create + to_update if row.sku)
+    
+    def _fail_chunk(self, rows, error: Exception) -> None:
+        # The exception text carries the SQL and the whole chunk's parameters:
+        # it goes to the log, sellers get the violated constraint at most
+        logger.error(f"Product import of seller {self.seller.id} failed for {len(rows)} rows: {error}")
+        constraint = getattr(getattr(getattr(error, "orig", None), "diag", None), "constraint_name", None)
+        message = f"Database error (constraint {constraint})" if constraint else "Database error"
+        for row_number, row, *_ in rows:
+            self._error(row_number, message, row.sku)
+    
+    def _load_categories(self, rows: List[Tuple[int, ProductImportRow]]) -> None:
+        """Resolve every category id/slug of the chunk with one query (cached across chunks)"""
+        ids = {row.category_id for _, row in rows if row.category_id} - self._known_category_ids
+        slugs = {row.category_slug for _, row in rows if row.category_slug} - set(self._category_ids_by_slug)
+        if not ids and not slugs:
+            return
+        
+        for category in self.db.query(Category.id, Category.slug).filter(
+            or_(Category.id.in_(ids), Category.slug.in_(slugs))
+        ).all():
+            self._known_category_ids.add(category.id)
+            self._category_ids_by_slug[category.slug] = category.id
+    
+    def _resolve_category(self, row: ProductImportRow):
+        if row.category_id:
+            return row.category_id if row.category_id in self._known_category_ids else None
+        return self._category_ids_by_slug.get(row.category_slug)
+    
+    def _load_existing_skus(self, skus: List[str]) -> dict:
+        """Look up all SKUs of the chunk with one query"""
+        if not skus:
+            return {}
+        return {
+            product.sku: product
+            for product in self.db.query(Product.id, Product.sku, Product.seller_id).filter(
+                Product.sku.in_(skus)
+            ).all()
+        }
+    
+    def _image_rows(self, product_id, row: ProductImportRow) -> List[dict]:
+        images = row.images or [
+            {"image_url": url, "position": position, "is_primary": position == 0}
+            for position, url in enumerate(row.image_urls)
+        ]
+        image_rows = []
+        for image in images:
+            image = image if isinstance(image, dict) else image.model_dump()
+            image_rows.append({
+                "id": uuid.uuid4(),
+                "product_id": product_id,
+                "image_url": image["image_url"],
+                "alt_text": image.get("alt_text"),
+                "position": image.get("position", 0),
+                "is_primary": image.get("is_primary", False)
+            })
+        return image_rows
+    
+    def _write(self, to_create, to_update) -> None:
+        image_rows = []
+        
+        if to_create:
+            slugs = SlugAllocator(self.db, Product).allocate_many(
+                [row.name for _, row, _ in to_create], fallback="product"
+            )
+            product_rows = []
+            for (_, row, category_id), slug in zip(to_create, slugs):
+                product_id = uuid.uuid4()
+                product_rows.append({
+                    "id": product_id,
+                    "seller_id": self.seller.id,
+                    "category_id": category_id,
+                    "slug": slug,
+                    "is_featured": False,
+                    "views_count": 0,
+                    "sales_count": 0,
+                    "rating_average": 0,
+                    "total_reviews": 0,
+                    **{field: getattr(row, field) for field in IMPORT_FIELDS}
+                })
+                image_rows.extend(self._image_rows(product_id, row))
+            self.db.execute(insert(Product), product_rows)
+        
+        if to_update:
+            # Only the columns a row sets are written; omitted columns (and
+            # blank CSV cells) keep the product's current values
+            self.db.execute(update(Product), [
+                {
+                    "id": product_id,
+                    "category_id": category_id,
+                    **{field: getattr(row, field) for field in IMPORT_FIELDS if field in row.model_fields_set}
+                }
+                for _, row, category_id, product_id in to_update
+            ])
+            
+            # Rows that list images replace the product's images
+            replaced = [(product_id, row) for _, row, _, product_id in to_update if row.images or row.image_urls]
+            if replaced:
+                self.db.execute(
+                    delete(ProductImage)
+                    .where(ProductImage.product_id.in_([product_id for product_id, _ in replaced]))
+                    .execution_options(synchronize_session=False)
+                )
+                for product_id, row in replaced:
+                    image_rows.extend(self._image_rows(product_id, row))
+        
+        if image_rows:
+            self.db.execute(insert(ProductImage), image_rows)
@@ -0,0 +1,56 @@
+"""
+Settings Audit Archive Service for ShopNest
+
+The settings audit log is append-only. Entries older than the retention
+window are moved in batches to settings_audit_log_archive, so the live
+table and its indexes stay small while history is kept.
+
+Each batch is a single statement: DELETE ... RETURNING feeds an
+INSERT ... SELECT through a CTE, so rows are never lost or duplicated
+between the two tables.
+"""
+
+from datetime import datetime, timedelta, timezone
+from typing import Optional
+
+from sqlalchemy import delete, insert, select
+from sqlalchemy.orm import Session
+
+from app.config import settings
+from app.models.platform_setting import SettingsAuditLog, SettingsAuditLogArchive
+
+ARCHIVED_COLUMNS = (
+    "id", "setting_id", "setting_key", "old_value", "new_value",
+    "change_reason", "changed_by", "ip_address", "user_agent", "created_at"
+)
+
+
+class SettingsAuditService:
+    """Service for archiving old settings audit entries"""
+    
+    def __init__(self, db: Session):
+        self.db = db
+    
+    def retention_cutoff(self, days: Optional[int] = None) -> datetime:
+        days = settings.SETTINGS_AUDIT_RETENTION_DAYS if days is None else days
+        return datetime.now(timezone.utc) - timedelta(days=days)
+    
+    def archive_batch(self, cutoff: datetime, batch_size: int = 1000) -> int:
+        """Move up to `batch_size` entries created before `cutoff`. Does not commit."""
+        oldest = select(SettingsAuditLog.id).where(
+            SettingsAuditLog.created_at < cutoff
+        ).order_by(SettingsAuditLog.created_at).limit(batch_size).with_for_update(skip_locked=True)
+        
+        moved = delete(SettingsAuditLog).where(
+            SettingsAuditLog.id.in_(oldest.scalar_subquery())
+        ).returning(
+            *(getattr(SettingsAuditLog, column) for column in ARCHIVED_COLUMNS)
+        ).cte("moved")
+        
+        result = self.db.execute(
+            insert(SettingsAuditLogArchive).from_select(
+                list(ARCHIVED_COLUMNS),
+                select(*(moved.c[column] for column in ARCHIVED_COLUMNS))
+            )
+        )
+        return result.rowcount
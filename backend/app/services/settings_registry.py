@@ -0,0 +1,160 @@
+"""
+Platform Settings Registry for ShopNest
+
+In-memory, typed view of the `platform_settings` table so business code
+(order creation, seller onboarding, ...) can read admin-managed settings
+on hot paths without a query.
+
+- All settings are loaded in one query on first use and served from memory
+- Changes are committed together with a bump of the single-row generation
+  counter (bump_generation); every process checks the counter at most once
+  per PLATFORM_SETTINGS_POLL_SECONDS and reloads when it moved
+- The process that made the change reloads right away (invalidate)
+- Known keys are coerced to their declared type; a missing or malformed
+  row falls back to the default, so a bad value never breaks checkout
+"""
+
+import logging
+import threading
+import time
+from typing import Any, Dict, NamedTuple, Optional
+
+from sqlalchemy import select, update
+from sqlalchemy.orm import Session
+
+from app.config import settings
+from app.database import SessionLocal
+from app.models.platform_setting import PlatformSetting, PlatformSettingsGeneration
+
+logger = logging.getLogger(__name__)
+
+
+class SettingDefinition(NamedTuple):
+    type: type
+    default: Any
+
+
+# Settings read by application code, with their type and fallback value
+DEFINITIONS: Dict[str, SettingDefinition] = {
+    "default_commission_rate": SettingDefinition(float, settings.PLATFORM_COMMISSION_RATE),
+    "apply_commission_to_existing": SettingDefinition(bool, False),
+    "low_stock_threshold": SettingDefinition(int, settings.LOW_STOCK_THRESHOLD),
+    "platform_name": SettingDefinition(str, "ShopNest"),
+    "platform_email": SettingDefinition(str, "support@shopnest.com"),
+    "maintenance_mode": SettingDefinition(bool, False),
+    "featured_products_limit": SettingDefinition(int, 12),
+    "max_product_images": SettingDefinition(int, 10),
+    "seller_approval_required": SettingDefinition(bool, True),
+}
+
+
+def coerce(value: Any, to_type: type) -> Any:
+    """Convert a JSON setting value to `to_type` (raises ValueError/TypeError)"""
+    if to_type is bool:
+        if isinstance(value, str):
+            if value.strip().lower() in ("true", "1", "yes", "on"):
+                return True
+            if value.strip().lower() in ("false", "0", "no", "off"):
+                return False
+            raise ValueError(f"Not a boolean: {value!r}")
+        return bool(value)
+    return to_type(value)
+
+
+def bump_generation(db: Session) -> None:
+    """
+    Mark the settings as changed. Does not commit.
+    
+    Call in the same transaction as the settings change, so other processes
+    can never see the new generation before the new values.
+    """
+    db.execute(
+        update(PlatformSettingsGeneration)
+        .where(PlatformSettingsGeneration.id == 1)
+        .values(generation=PlatformSettingsGeneration.generation + 1)
+    )
+
+
+class PlatformSettingsRegistry:
+    """Process-wide cache of platform settings, reloaded when the generation changes"""
+    
+    def __init__(self, poll_seconds: float):
+        self.poll_seconds = poll_seconds
+        self._values: Dict[str, Any] = {}
+        self._generation: Optional[int] = None
+        self._checked_at = float("-inf")
+        self._lock = threading.Lock()
+    
+    def _read_generation(self, db: Session) -> int:
+        return db.execute(
+            select(PlatformSettingsGeneration.generation).where(PlatformSettingsGeneration.id == 1)
+        ).scalar() or 0
+    
+    def _load(self, db: Session) -> None:
+        generation = self._read_generation(db)
+        rows = db.execute(select(PlatformSetting.setting_key, PlatformSetting.setting_value)).all()
+        
+        values = {}
+        for key, raw in rows:
+            definition = DEFINITIONS.get(key)
+            if definition is None:
+                values[key] = raw
+                continue
+            try:
+                values[key] = coerce(raw, definition.type)
+            except (TypeError, ValueError):
+                logger.warning(f"Ignoring invalid value for setting {key}: {raw!r}")
+        
+        self._values = values
+        self._generation = generation
+    
+    def _refresh(self) -> None:
+        """Reload if the generation moved; at most one check per poll interval"""
+        now = time.monotonic()
+        if now - self._checked_at < self.poll_seconds:
+            return
+        
+        with self._lock:
+            if now - self._checked_at < self.poll_seconds:
+                return
+            db = SessionLocal()
+            try:
+                if self._generation is None or self._read_generation(db) != self._generation:
+                    self._load(db)
+            except Exception as e:
+                # Keep serving the last known values (or defaults) if the DB is unreachable
+                logger.error(f"Could not refresh platform settings: {e}")
+            finally:
+                db.close()
+            self._checked_at = now
+    
+    def invalidate(self) -> None:
+        """Force a reload on the next read (after this process changed a setting)"""
+        with self._lock:
+            self._checked_at = float("-inf")
+            self._generation = None
+    
+    def get(self, key: str, default: Any = None) -> Any:
+        """Current value of `key`, typed if the key is in DEFINITIONS"""
+        self._refresh()
+        if key in self._values:
+            return self._values[key]
+        definition = DEFINITIONS.get(key)
+        return definition.default if definition and default is None else default
+    
+    @property
+    def default_commission_rate(self) -> float:
+        return self.get("default_commission_rate")
+    
+    @property
+    def apply_commission_to_existing(self) -> bool:
+        return self.get("apply_commission_to_existing")
+    
+    def commission_rate_for(self, seller_rate) -> float:
+        """Commission (%) to charge a seller with rate `seller_rate` on a new order"""
+        if seller_rate is None or self.apply_commission_to_existing:
+            return self.default_commission_rate
+        return float(seller_rate)
+
+
+platform_settings = PlatformSettingsRegistry(settings.PLATFORM_SETTINGS_POLL_SECONDS)
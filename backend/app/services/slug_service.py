@@ -0,0 +1,130 @@
+"""
+Slug Allocation Service for ShopNest
+
+Finds free URL slugs for any model with a unique `slug` column (products,
+categories).
+
+A slug is allocated with a single aggregate query over the slug index:
+whether the base slug is taken, and the highest numeric suffix already in
+use ("t-shirt-17" -> 17). The next free slug is then base-(max + 1), so
+the cost does not grow with the number of existing duplicates. Because
+another request can still claim the same slug between allocation and
+insert, flush_with_slug retries inside a SAVEPOINT on unique violations.
+"""
+
+import re
+from sqlalchemy.orm import Session
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy import func, case, cast, and_, or_, true, Integer
+from app.utils.helpers import generate_slug
+from typing import List, Optional
+
+
+MAX_ATTEMPTS = 5
+
+# Numeric suffixes we consider; longer digit runs are part of the name
+SUFFIX_PATTERN = r"^[0-9]{1,9}$"
+
+
+def is_slug_violation(error: IntegrityError) -> bool:
+    """Whether an IntegrityError was caused by a duplicate slug"""
+    return "slug" in str(getattr(error, "orig", error)).lower()
+
+
+class SlugAllocator:
+    """Allocates unique slugs for a model with a unique `slug` column"""
+    
+    def __init__(self, db: Session, model):
+        self.db = db
+        self.model = model
+    
+    def allocate(self, text: str, exclude_id=None, fallback: str = "item") -> str:
+        """
+        Return a free slug for `text` using one query.
+        
+        exclude_id is the row being renamed: its current slug is kept when it
+        still belongs to the new base ("t-shirt" or "t-shirt-3" for a
+        "T-Shirt"), and otherwise it does not count as taken.
+        """
+        base = generate_slug(text) or fallback
+        slug_column = self.model.slug
+        suffix = func.substr(slug_column, len(base) + 2)
+        others = self.model.id != exclude_id if exclude_id is not None else true()
+        
+        row = self.db.query(
+            func.count(case((and_(others, slug_column == base), 1))).label("base_taken"),
+            func.max(
+                case((and_(others, suffix.op("~")(SUFFIX_PATTERN)), cast(suffix, Integer)))
+            ).label("max_suffix"),
+            func.max(case((~others, slug_column))).label("current_slug")
+        ).filter(
+            or_(slug_column == base, slug_column.like(f"{base}-%"))
+        ).one()
+        
+        if row.current_slug and re.match(rf"^{re.escape(base)}(-[0-9]{{1,9}})?$", row.current_slug):
+            return row.current_slug
+        if not row.base_taken:
+            return base
+        return f"{base}-{(row.max_suffix or 0) + 1}"
+    
+    def allocate_many(self, texts: List[str], fallback: str = "item") -> List[str]:
+        """
+        Return free, mutually distinct slugs for a batch of texts using one query.
+        
+        Used by bulk imports, where many rows may share a base slug.
+        """
+        bases = [generate_slug(text) or fallback for text in texts]
+        unique_bases = set(bases)
+        if not unique_bases:
+            return []
+        
+        slug_column = self.model.slug
+        next_suffix = {}
+        taken = set()
+        for (slug,) in self.db.query(slug_column).filter(
+            or_(
+                slug_column.in_(unique_bases),
+                *[slug_column.like(f"{base}-%") for base in unique_bases]
+            )
+        ).all():
+            taken.add(slug)
+            match = re.match(r"^(.*)-([0-9]{1,9})$", slug)
+            if match and match.group(1) in unique_bases:
+                base, number = match.group(1), int(match.group(2))
+                next_suffix[base] = max(next_suffix.get(base, 1), number + 1)
+        
+        slugs = []
+        for base in bases:
+            if base not in taken:
+                slug = base
+            else:
+                number = next_suffix.get(base, 1)
+                slug = f"{base}-{number}"
+                next_suffix[base] = number + 1
+            taken.add(slug)
+            slugs.append(slug)
+        return slugs
+    
+    def flush_with_slug(self, instance, text: str, fallback: str = "item") -> str:
+        """
+        Assign a free slug to `instance` and flush it, retrying on races.
+        
+        Each attempt runs in a SAVEPOINT, so a unique violation caused by a
+        concurrent request only rolls back the attempt, not the caller's
+        transaction. Works for new and already-persistent instances.
+        """
+        exclude_id = instance.id if instance.id is not None else None
+        
+        for attempt in range(MAX_ATTEMPTS):
+            slug = self.allocate(text, exclude_id=exclude_id, fallback=fallback)
+            try:
+                with self.db.begin_nested():
+                    instance.slug = slug
+                    self.db.add(instance)
+                    self.db.flush()
+                return slug
+            except IntegrityError as e:
+                if not is_slug_violation(e) or attempt == MAX_ATTEMPTS - 1:
+                    raise
+        
+        return instance.slug
@@ -0,0 +1,279 @@
+"""
+Webhook Queue Service for ShopNest
+
+Stripe webhooks are stored on receipt and processed in the background, so
+the endpoint can acknowledge within milliseconds and Stripe has no reason
+to redeliver.
+
+- record_event inserts the verified event with ON CONFLICT DO NOTHING on
+  the Stripe event id, so replayed deliveries are stored once
+- A background worker claims due events with FOR UPDATE SKIP LOCKED (safe
+  with several app processes), loads every order the batch touches in one
+  query, and applies each event in its own savepoint
+- Failed events are retried with exponential backoff and jitter up to
+  WEBHOOK_MAX_ATTEMPTS; events whose worker died are re-claimed once
+  their lease expires
+"""
+
+import asyncio
+import logging
+import random
+from datetime import datetime, timedelta, timezone
+from typing import Dict, List, Optional
+from uuid import UUID
+
+from sqlalchemy import or_
+from sqlalchemy.dialects.postgresql import insert
+from sqlalchemy.orm import Session, selectinload
+from starlette.concurrency import run_in_threadpool
+
+from app.config import settings
+from app.database import SessionLocal
+from app.models.order import Order, OrderStatus, PaymentStatus
+from app.models.webhook_event import WebhookEvent
+from app.services.aggregate_service import AggregateService
+from app.services.inventory_service import InventoryService
+from app.utils.metrics import background_items, background_runs
+
+logger = logging.getLogger(__name__)
+
+
+# How long a claimed event is reserved for the worker that claimed it
+CLAIM_LEASE = timedelta(minutes=5)
+MAX_RETRY_DELAY = timedelta(hours=6)
+
+PAYMENT_INTENT_EVENTS = {
+    "payment_intent.succeeded",
+    "payment_intent.payment_failed",
+    "payment_intent.canceled"
+}
+REFUND_EVENTS = {"charge.refunded"}
+
+
+def retry_delay(attempts: int) -> timedelta:
+    """Exponential backoff with jitter: ~30s, 1m, 2m, ... capped at MAX_RETRY_DELAY"""
+    delay = min(30 * 2 ** (attempts - 1), MAX_RETRY_DELAY.total_seconds())
+    return timedelta(seconds=random.uniform(delay / 2, delay))
+
+
+def record_event(db: Session, event: dict) -> bool:
+    """Store a verified webhook event. Commits. Returns False for a duplicate delivery."""
+    inserted_id = db.execute(
+        insert(WebhookEvent)
+        .values(
+            event_id=event["id"],
+            event_type=event["type"],
+            payload=event["data"]["object"],
+            status="pending"
+        )
+        .on_conflict_do_nothing(index_elements=["event_id"])
+        .returning(WebhookEvent.id)
+    ).scalar()
+    db.commit()
+    return inserted_id is not None
+
+
+def parse_uuid(value) -> Optional[UUID]:
+    try:
+        return UUID(str(value))
+    except (TypeError, ValueError):
+        return None
+
+
+class WebhookProcessor:
+    """Service for claiming and applying queued webhook events"""
+    
+    def __init__(self, db: Session):
+        self.db = db
+        self.aggregates = AggregateService(db)
+        self.inventory = InventoryService(db)
+    
+    def claim_batch(self, limit: int) -> List[WebhookEvent]:
+        """Lease up to `limit` due events to this worker. Commits."""
+        now = datetime.now(timezone.utc)
+        events = self.db.query(WebhookEvent).filter(
+            WebhookEvent.status.in_(("pending", "processing")),
+            WebhookEvent.next_attempt_at <= now
+        ).order_by(
+            WebhookEvent.next_attempt_at, WebhookEvent.received_at
+        ).limit(limit).with_for_update(skip_locked=True).all()
+        
+        for event in events:
+            event.status = "processing"
+            event.attempts += 1
+            event.next_attempt_at = now + CLAIM_LEASE
+        
+        self.db.commit()
+        return events
+    
+    def process_batch(self, events: List[WebhookEvent]) -> None:
+        """Apply a batch of claimed events and record the outcome of each. Commits."""
+        order_ids = set()
+        intent_ids = set()
+        for event in events:
+            if event.event_type in PAYMENT_INTENT_EVENTS:
+                order_id = parse_uuid((event.payload.get("metadata") or {}).get("order_id"))
+                if order_id:
+                    order_ids.add(order_id)
+            elif event.event_type in REFUND_EVENTS and event.payload.get("payment_intent"):
+                intent_ids.add(event.payload["payment_intent"])
+        
+        # Every order (with items) the batch touches, in one query; locked so the
+        # reservation sweeper cannot cancel and restock an order being paid
+        orders = []
+        if order_ids or intent_ids:
+            orders = self.db.query(Order).options(selectinload(Order.items)).filter(
+                or_(Order.id.in_(order_ids), Order.stripe_payment_intent_id.in_(intent_ids))
+            ).order_by(Order.id).populate_existing().with_for_update(of=Order).all()
+        orders_by_id = {order.id: order for order in orders}
+        orders_by_intent = {order.stripe_payment_intent_id: order for order in orders if order.stripe_payment_intent_id}
+        
+        now = datetime.now(timezone.utc)
+        for event in events:
+            try:
+                with self.db.begin_nested():
+                    self._apply(event, orders_by_id, orders_by_intent)
+                event.status = "processed"
+                event.processed_at = now
+                event.last_error = None
+            except Exception as e:
+                logger.warning(f"Webhook {event.event_id} ({event.event_type}) failed: {e}")
+                event.last_error = str(e)
+                if event.attempts >= settings.WEBHOOK_MAX_ATTEMPTS:
+                    event.status = "failed"
+                else:
+                    event.status = "pending"
+                    event.next_attempt_at = now + retry_delay(event.attempts)
+        
+        self.db.commit()
+    
+    def _apply(self, event: WebhookEvent, orders_by_id: Dict, orders_by_intent: Dict) -> None:
+        payload = event.payload
+        
+        if event.event_type in PAYMENT_INTENT_EVENTS:
+            order = orders_by_id.get(parse_uuid((payload.get("metadata") or {}).get("order_id")))
+            if not order:
+                return
+            
+            if event.event_type == "payment_intent.succeeded" and order.status == OrderStatus.CANCELLED:
+                # Paid after the order was cancelled (e.g. its stock reservation expired)
+                if order.payment_status != PaymentStatus.PAID:
+                    order.payment_status = PaymentStatus.PAID
+                    order.stripe_payment_intent_id = payload["id"]
+                    logger.error(f"Payment {payload['id']} received for cancelled order {order.order_number}; refund required")
+            
+            elif event.event_type == "payment_intent.succeeded":
+                # Only update if not already paid (idempotency)
+                if order.payment_status != PaymentStatus.PAID:
+                    order.payment_status = PaymentStatus.PAID
+                    order.status = OrderStatus.CONFIRMED
+                    order.stripe_payment_intent_id = payload["id"]
+                    
+                    # Update order items
+                    self.aggregates.set_order_item_statuses(
+                        [item for item in order.items if item.status == OrderStatus.PENDING],
+                        OrderStatus.CONFIRMED
+                    )
+                    self.inventory.commit_holds(order.id)
+                    
+                    # TODO: Send confirmation emails
+                    # send_order_confirmation_email(order)
+                    # send_seller_new_order_notifications(order)
+            
+            # Failed or canceled: mark as failed (user can try again), but a
+            # late failure event never overrides a completed payment
+            elif order.payment_status != PaymentStatus.PAID:
+                order.payment_status = PaymentStatus.FAILED
+                
+                # TODO: Send payment failed email
+                # send_payment_failed_email(order)
+        
+        elif event.event_type in REFUND_EVENTS:
+            order = orders_by_intent.get(payload.get("payment_intent"))
+            if not order or order.payment_status == PaymentStatus.REFUNDED:
+                return
+            
+            order.payment_status = PaymentStatus.REFUNDED
+            
+            # A payment that arrived after the order was cancelled (e.g. its
+            # reservation expired) is refunded, but the order stays cancelled:
+            # its stock was already returned on cancellation
+            if order.status != OrderStatus.CANCELLED:
+                order.status = OrderStatus.REFUNDED
+                
+                # Restore inventory
+                self.inventory.restock_order_items(order.items, OrderStatus.REFUNDED)
+            
+            # TODO: Send refund confirmation email
+            # send_refund_confirmation_email(order)
+        
+        self.db.flush()
+    
+    def drain(self, batch_size: Optional[int] = None) -> int:
+        """Process due events until none are left. Returns the number processed."""
+        batch_size = batch_size or settings.WEBHOOK_BATCH_SIZE
+        total = 0
+        while True:
+            events = self.claim_batch(batch_size)
+            if not events:
+                return total
+            self.process_batch(events)
+            total += len(events)
+
+
+def drain_webhook_events() -> int:
+    """Process all due webhook events with a dedicated session"""
+    db = SessionLocal()
+    try:
+        return WebhookProcessor(db).drain()
+    finally:
+        db.close()
+
+
+# ============= Background worker =============
+
+_wakeup: Optional[asyncio.Event] = None
+_worker: Optional[asyncio.Task] = None
+
+
+async def _run_worker() -> None:
+    while True:
+        try:
+            await asyncio.wait_for(_wakeup.wait(), timeout=settings.WEBHOOK_POLL_SECONDS)
+        except asyncio.TimeoutError:
+            pass
+        _wakeup.clear()
+        try:
+            processed = await run_in_threadpool(drain_webhook_events)
+            background_runs.inc(job="webhooks", outcome="ok")
+            background_items.inc(processed, job="webhooks")
+        except Exception as e:
+            background_runs.inc(job="webhooks", outcome="error")
+            logger.error(f"Webhook worker error: {e}")
+
+
+def start_webhook_worker() -> None:
+    """Start polling the webhook queue (called on application startup)"""
+    global _wakeup, _worker
+    if not settings.WEBHOOK_WORKER_ENABLED or _worker is not None:
+        return
+    _wakeup = asyncio.Event()
+    _worker = asyncio.create_task(_run_worker())
+
+
+async def stop_webhook_worker() -> None:
+    """Stop the webhook worker (called on application shutdown)"""
+    global _worker
+    if _worker is not None:
+        _worker.cancel()
+        try:
+            await _worker
+        except asyncio.CancelledError:
+            pass
+        _worker = None
+
+
+def notify_webhook_worker() -> None:
+    """Wake the worker now instead of at its next poll"""
+    if _wakeup is not None:
+        _wakeup.set()
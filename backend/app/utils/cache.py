@@ -0,0 +1,48 @@
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Hashable, Optional
+
+from app.utils.metrics import cache_requests
+
+
+class TTLCache:
+    """
+    Small in-process cache with per-entry expiry and LRU eviction.
+    
+    Entries expire `ttl_seconds` after they were set; beyond `max_entries`
+    the least recently used are dropped. Caches are per worker process.
+    Lookups are counted per `name` in the cache_requests_total metric.
+    """
+    
+    def __init__(self, ttl_seconds: float, max_entries: int = 10000, name: str = "default"):
+        self.name = name
+        self.ttl = ttl_seconds
+        self.max_entries = max_entries
+        self._entries: "OrderedDict[Hashable, tuple]" = OrderedDict()
+        self._lock = threading.Lock()
+    
+    def get(self, key: Hashable) -> Optional[Any]:
+        now = time.monotonic()
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                cache_requests.inc(cache=self.name, result="miss")
+                return None
+            value, expires_at = entry
+            if expires_at <= now:
+                del self._entries[key]
+                cache_requests.inc(cache=self.name, result="miss")
+                return None
+            self._entries.move_to_end(key)
+            cache_requests.inc(cache=self.name, result="hit")
+            return value
+    
+    def set(self, key: Hashable, value: Any) -> None:
+        if self.ttl <= 0:
+            return
+        with self._lock:
+            self._entries[key] = (value, time.monotonic() + self.ttl)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
@@ -0,0 +1,393 @@
+"""
+Prometheus-style metrics without external dependencies.
+
+Each worker process keeps its metrics in dicts (guarded by a per-metric
+lock, so snapshots taken from the threadpool never see a dict changing
+size) and periodically writes a snapshot to
+METRICS_DIR/metrics-<pid>-<instance>.json. GET /metrics merges the
+snapshots of every worker, so any worker can answer a scrape:
+
+- a snapshot not rewritten for 3 flush intervals (at least a minute)
+  belongs to a worker that exited: its counters and histograms are folded
+  into metrics-archive.json and the file is removed, so totals never go
+  backwards, not even when a PID is reused
+- counters and histograms are summed over live snapshots and the archive
+- gauges are summed over live workers only
+"""
+
+import asyncio
+import json
+import logging
+import os
+import threading
+import time
+import uuid
+from contextlib import contextmanager
+from typing import Callable, Dict, Iterable, List, Optional, Tuple
+
+try:
+    import fcntl
+except ImportError:  # Windows development setups: no cross-process lock
+    fcntl = None
+
+from app.config import settings
+
+logger = logging.getLogger(__name__)
+
+PREFIX = "shopnest_"
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+
+class Metric:
+    type = ""
+    
+    def __init__(self, name: str, help_text: str, labelnames: Iterable[str] = ()):
+        self.name = PREFIX + name
+        self.help = help_text
+        self.labelnames = tuple(labelnames)
+        self.values: Dict[Tuple[str, ...], object] = {}
+        self.lock = threading.Lock()
+    
+    def _key(self, labels: dict) -> Tuple[str, ...]:
+        return tuple(str(labels.get(name, "")) for name in self.labelnames)
+
+
+class Counter(Metric):
+    type = "counter"
+    
+    def inc(self, amount: float = 1, **labels) -> None:
+        key = self._key(labels)
+        with self.lock:
+            self.values[key] = self.values.get(key, 0) + amount
+
+
+class Gauge(Metric):
+    type = "gauge"
+    
+    def set(self, value: float, **labels) -> None:
+        key = self._key(labels)
+        with self.lock:
+            self.values[key] = value
+    
+    def inc(self, amount: float = 1, **labels) -> None:
+        key = self._key(labels)
+        with self.lock:
+            self.values[key] = self.values.get(key, 0) + amount
+    
+    def dec(self, amount: float = 1, **labels) -> None:
+        self.inc(-amount, **labels)
+
+
+class Histogram(Metric):
+    type = "histogram"
+    
+    def __init__(self, name: str, help_text: str, labelnames: Iterable[str] = (), buckets=LATENCY_BUCKETS):
+        super().__init__(name, help_text, labelnames)
+        self.buckets = tuple(buckets)
+    
+    def observe(self, value: float, **labels) -> None:
+        key = self._key(labels)
+        for index, bound in enumerate(self.buckets):
+            if value <= bound:
+                break
+        else:
+            index = len(self.buckets)
+        with self.lock:
+            state = self.values.get(key)
+            if state is None:
+                # Per-bucket (non-cumulative) counts, then sum and count
+                state = self.values[key] = [[0] * (len(self.buckets) + 1), 0.0, 0]
+            state[0][index] += 1
+            state[1] += value
+            state[2] += 1
+
+
+class Registry:
+    def __init__(self):
+        self.metrics: Dict[str, Metric] = {}
+        self.collectors: List[Callable[[], None]] = []
+    
+    def register(self, metric: Metric) -> Metric:
+        self.metrics[metric.name] = metric
+        return metric
+    
+    def add_collector(self, collector: Callable[[], None]) -> None:
+        """Run `collector` (to refresh gauges) before each snapshot"""
+        self.collectors.append(collector)
+    
+    def snapshot(self) -> dict:
+        for collector in self.collectors:
+            try:
+                collector()
+            except Exception:
+                pass
+        snapshot = {}
+        for name, metric in self.metrics.items():
+            with metric.lock:
+                samples = [
+                    [list(key), [list(value[0]), value[1], value[2]] if metric.type == "histogram" else value]
+                    for key, value in metric.values.items()
+                ]
+            snapshot[name] = {
+                "type": metric.type,
+                "help": metric.help,
+                "labelnames": list(metric.labelnames),
+                "buckets": list(getattr(metric, "buckets", ())),
+                "samples": samples
+            }
+        return snapshot
+
+
+registry = Registry()
+
+http_requests = registry.register(Counter(
+    "http_requests_total", "HTTP requests by route, method and status code", ("method", "route", "status")
+))
+http_latency = registry.register(Histogram(
+    "http_request_duration_seconds", "HTTP request latency by route", ("method", "route")
+))
+http_in_flight = registry.register(Gauge(
+    "http_requests_in_flight", "HTTP requests currently being handled"
+))
+db_pool = registry.register(Gauge(
+    "db_pool_connections", "Database pool connections by state", ("state",)
+))
+cache_requests = registry.register(Counter(
+    "cache_requests_total", "In-process cache lookups by cache and result", ("cache", "result")
+))
+background_runs = registry.register(Counter(
+    "background_job_runs_total", "Background job runs by job and outcome", ("job", "outcome")
+))
+background_items = registry.register(Counter(
+    "background_job_items_total", "Items (events, orders) handled by background jobs", ("job",)
+))
+emails_pending = registry.register(Gauge(
+    "emails_pending", "Emails queued as background tasks and not yet sent"
+))
+emails_sent = registry.register(Counter(
+    "emails_total", "Email send attempts by provider and outcome", ("provider", "outcome")
+))
+
+
+def watch_pool(engine) -> None:
+    """Report `engine`'s connection pool usage in db_pool_connections"""
+    pool = engine.pool
+    
+    def collect():
+        db_pool.set(pool.size(), state="size")
+        db_pool.set(pool.checkedout(), state="checked_out")
+        db_pool.set(pool.checkedin(), state="idle")
+        db_pool.set(max(pool.overflow(), 0), state="overflow")
+    
+    registry.add_collector(collect)
+
+
+# ============= File-backed aggregation across workers =============
+
+ARCHIVE_FILENAME = "metrics-archive.json"
+
+# Distinguishes this process from an earlier one that had the same PID
+_instance = uuid.uuid4().hex[:12]
+
+
+def _snapshot_path() -> str:
+    return os.path.join(settings.METRICS_DIR, f"metrics-{os.getpid()}-{_instance}.json")
+
+
+def _write_json(path: str, data: dict) -> None:
+    temp_path = f"{path}.tmp"
+    with open(temp_path, "w") as f:
+        json.dump(data, f)
+    os.replace(temp_path, path)
+
+
+def _read_json(path: str) -> Optional[dict]:
+    try:
+        with open(path) as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return None
+
+
+def write_snapshot() -> None:
+    """Write this process's metrics for other workers to merge (atomic replace)"""
+    os.makedirs(settings.METRICS_DIR, exist_ok=True)
+    _write_json(_snapshot_path(), {"pid": os.getpid(), "written_at": time.time(), "metrics": registry.snapshot()})
+
+
+def _is_live(snapshot: dict) -> bool:
+    return time.time() - snapshot.get("written_at", 0) <= max(60.0, 3 * settings.METRICS_FLUSH_SECONDS)
+
+
+@contextmanager
+def _directory_lock():
+    """Serialize archive updates across workers"""
+    if fcntl is None:
+        yield
+        return
+    with open(os.path.join(settings.METRICS_DIR, ".lock"), "w") as lock_file:
+        fcntl.flock(lock_file, fcntl.LOCK_EX)
+        try:
+            yield
+        finally:
+            fcntl.flock(lock_file, fcntl.LOCK_UN)
+
+
+def _load_snapshots() -> List[dict]:
+    """Live workers' snapshots plus the archive, after folding exited workers into it"""
+    if not os.path.isdir(settings.METRICS_DIR):
+        return []
+    
+    with _directory_lock():
+        archive_path = os.path.join(settings.METRICS_DIR, ARCHIVE_FILENAME)
+        archive = _read_json(archive_path)
+        live, stale, stale_paths = [], [], []
+        for filename in os.listdir(settings.METRICS_DIR):
+            if filename == ARCHIVE_FILENAME or not (filename.startswith("metrics-") and filename.endswith(".json")):
+                continue
+            path = os.path.join(settings.METRICS_DIR, filename)
+            snapshot = _read_json(path)
+            if snapshot is None:
+                continue
+            if _is_live(snapshot):
+                live.append(snapshot)
+            else:
+                stale.append(snapshot)
+                stale_paths.append(path)
+        
+        if stale:
+            folded = _merge(([archive] if archive else []) + stale, include_gauges=False)
+            archive = {"pid": None, "written_at": time.time(), "metrics": {
+                name: {**metric, "samples": [[list(key), value] for key, value in metric["samples"].items()]}
+                for name, metric in folded.items()
+            }}
+            _write_json(archive_path, archive)
+            for path in stale_paths:
+                try:
+                    os.remove(path)
+                except OSError:
+                    pass
+    
+    return live + ([archive] if archive else [])
+
+
+def _merge(snapshots: List[dict], include_gauges: bool = True) -> Dict[str, dict]:
+    merged: Dict[str, dict] = {}
+    for snapshot in snapshots:
+        for name, metric in snapshot["metrics"].items():
+            if metric["type"] == "gauge" and not include_gauges:
+                continue
+            target = merged.setdefault(name, {**metric, "samples": {}})
+            for labels, value in metric["samples"]:
+                key = tuple(labels)
+                current = target["samples"].get(key)
+                if metric["type"] == "histogram":
+                    if current is None:
+                        target["samples"][key] = [list(value[0]), value[1], value[2]]
+                    else:
+                        current[0] = [a + b for a, b in zip(current[0], value[0])]
+                        current[1] += value[1]
+                        current[2] += value[2]
+                else:
+                    target["samples"][key] = (current or 0) + value
+    return merged
+
+
+def _format_labels(names, values, extra: Optional[Tuple[str, str]] = None) -> str:
+    pairs = list(zip(names, values))
+    if extra:
+        pairs.append(extra)
+    if not pairs:
+        return ""
+    escaped = (str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n") for _, value in pairs)
+    return "{" + ",".join(f'{name}="{value}"' for (name, _), value in zip(pairs, escaped)) + "}"
+
+
+def render(extra_gauges: Optional[Dict[str, Tuple[str, Dict[Tuple[Tuple[str, str], ...], float]]]] = None) -> str:
+    """
+    Prometheus text exposition of all workers' metrics.
+    
+    `extra_gauges` maps a metric name to (help, {label pairs: value}) for
+    values computed at scrape time (e.g. queue depths read from the database).
+    """
+    write_snapshot()
+    merged = _merge(_load_snapshots())
+    lines = []
+    
+    for name, metric in sorted(merged.items()):
+        lines.append(f"# HELP {name} {metric['help']}")
+        lines.append(f"# TYPE {name} {metric['type']}")
+        names = metric["labelnames"]
+        for labels, value in sorted(metric["samples"].items()):
+            if metric["type"] == "histogram":
+                cumulative = 0
+                for bound, count in zip(list(metric["buckets"]) + ["+Inf"], value[0]):
+                    cumulative += count
+                    lines.append(f"{name}_bucket{_format_labels(names, labels, ('le', str(bound)))} {cumulative}")
+                lines.append(f"{name}_sum{_format_labels(names, labels)} {value[1]}")
+                lines.append(f"{name}_count{_format_labels(names, labels)} {value[2]}")
+            else:
+                lines.append(f"{name}{_format_labels(names, labels)} {value}")
+    
+    # Hit ratio per cache, from the merged lookup counters
+    cache_samples = merged.get(cache_requests.name, {}).get("samples", {})
+    totals: Dict[str, List[float]] = {}
+    for (cache, result), value in cache_samples.items():
+        hits_and_total = totals.setdefault(cache, [0, 0])
+        hits_and_total[1] += value
+        if result == "hit":
+            hits_and_total[0] += value
+    if totals:
+        name = f"{PREFIX}cache_hit_ratio"
+        lines.append(f"# HELP {name} Share of cache lookups served from the cache")
+        lines.append(f"# TYPE {name} gauge")
+        for cache, (hits, total) in sorted(totals.items()):
+            lines.append(f'{name}{{cache="{cache}"}} {hits / total if total else 0}')
+    
+    for name, (help_text, samples) in (extra_gauges or {}).items():
+        full_name = PREFIX + name
+        lines.append(f"# HELP {full_name} {help_text}")
+        lines.append(f"# TYPE {full_name} gauge")
+        for label_pairs, value in samples.items():
+            labels = _format_labels([key for key, _ in label_pairs], [val for _, val in label_pairs])
+            lines.append(f"{full_name}{labels} {value}")
+    
+    return "\n".join(lines) + "\n"
+
+
+# ============= Background snapshot writer =============
+
+_writer: Optional[asyncio.Task] = None
+
+
+async def _run_writer() -> None:
+    while True:
+        await asyncio.sleep(settings.METRICS_FLUSH_SECONDS)
+        try:
+            write_snapshot()
+        except Exception as e:
+            logger.error(f"Could not write metrics snapshot: {e}")
+
+
+def start_metrics_writer() -> None:
+    """Write this worker's snapshot periodically (called on application startup)"""
+    global _writer
+    if not settings.METRICS_ENABLED or _writer is not None:
+        return
+    _writer = asyncio.create_task(_run_writer())
+
+
+async def stop_metrics_writer() -> None:
+    """Stop the writer and leave a final snapshot (called on application shutdown)"""
+    global _writer
+    if _writer is not None:
+        _writer.cancel()
+        try:
+            await _writer
+        except asyncio.CancelledError:
+            pass
+        _writer = None
+        try:
+            write_snapshot()
+        except Exception as e:
+            logger.error(f"Could not write metrics snapshot: {e}")
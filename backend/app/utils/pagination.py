@@ -0,0 +1,35 @@
+import base64
+import json
+from datetime import datetime
+from typing import Callable, Optional, Sequence
+from uuid import UUID
+
+
+def encode_cursor(values: Sequence) -> str:
+    """Encode the sort-key values of the last row on a page as an opaque cursor"""
+    def to_json(value):
+        if isinstance(value, datetime):
+            return value.isoformat()
+        if isinstance(value, UUID):
+            return str(value)
+        return value
+    
+    raw = json.dumps([to_json(value) for value in values], separators=(",", ":"))
+    return base64.urlsafe_b64encode(raw.encode()).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str, types: Sequence[Callable]) -> Optional[tuple]:
+    """
+    Decode a cursor produced by encode_cursor.
+    
+    `types` converts each value back (e.g. (datetime.fromisoformat, UUID)).
+    Returns None if the cursor is malformed or has the wrong shape.
+    """
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        values = json.loads(base64.urlsafe_b64decode(padded.encode()).decode())
+        if not isinstance(values, list) or len(values) != len(types):
+            return None
+        return tuple(convert(value) for convert, value in zip(types, values))
+    except (ValueError, TypeError):
+        return None
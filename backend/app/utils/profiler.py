@@ -0,0 +1,163 @@
+"""
+Wall-clock stack sampler for profiling single requests.
+
+A background thread reads the stacks of the running threads every
+PROFILE_INTERVAL_MS and keeps those that belong to the profiled request:
+- the event loop thread, while the request's task is the one running
+  (async endpoints, which run their queries on the loop)
+- threadpool threads whose stack contains the request's endpoint (sync
+  endpoints); concurrent calls of the same sync endpoint blend in
+Ticks where neither is true are recorded as an "[awaiting]" frame, so the
+profile adds up to the request's wall time.
+
+Profiles are written as speedscope JSON (https://www.speedscope.app) or
+collapsed stacks (flamegraph.pl, speedscope, ...).
+"""
+
+import asyncio
+import json
+import os
+import sys
+import threading
+from collections import Counter
+from types import CodeType, FrameType
+from typing import List, MutableMapping, Optional, Tuple
+
+from app.config import settings
+
+Frame = Tuple[str, str, int]  # function name, file, first line
+
+AWAITING = ("[awaiting]", "", 0)
+FORMATS = ("speedscope", "collapsed")
+
+
+def _stack(frame: Optional[FrameType]) -> Tuple[Frame, ...]:
+    """Root-first stack of `frame`"""
+    stack = []
+    while frame is not None:
+        code = frame.f_code
+        stack.append((code.co_name, code.co_filename, code.co_firstlineno))
+        frame = frame.f_back
+    stack.reverse()
+    return tuple(stack)
+
+
+def _contains(frame: Optional[FrameType], code: CodeType) -> bool:
+    while frame is not None:
+        if frame.f_code is code:
+            return True
+        frame = frame.f_back
+    return False
+
+
+class StackSampler:
+    """
+    Samples the stacks of one request until stop(). Create it from the
+    request's task; `scope` is the request's ASGI scope, where the router
+    stores the matched route.
+    """
+    
+    def __init__(self, scope: MutableMapping, interval_ms: Optional[float] = None):
+        self.interval = (interval_ms or settings.PROFILE_INTERVAL_MS) / 1000
+        self.samples: Counter = Counter()
+        self._scope = scope
+        self._loop = asyncio.get_running_loop()
+        self._task = asyncio.current_task()
+        self._loop_thread = threading.get_ident()
+        self._stopped = threading.Event()
+        self._thread = threading.Thread(target=self._run, name="request-profiler", daemon=True)
+    
+    def start(self) -> None:
+        self._thread.start()
+    
+    def stop(self) -> None:
+        self._stopped.set()
+        self._thread.join()
+    
+    def _run(self) -> None:
+        own_thread = threading.get_ident()
+        while not self._stopped.wait(self.interval):
+            frames = sys._current_frames()
+            found = False
+            
+            if asyncio.current_task(self._loop) is self._task:
+                self.samples[_stack(frames.get(self._loop_thread))] += 1
+                found = True
+            
+            endpoint = getattr(getattr(self._scope.get("route"), "endpoint", None), "__code__", None)
+            if endpoint is not None:
+                for thread_id, frame in frames.items():
+                    if thread_id in (own_thread, self._loop_thread):
+                        continue
+                    if _contains(frame, endpoint):
+                        self.samples[_stack(frame)] += 1
+                        found = True
+            
+            if not found:
+                self.samples[(AWAITING,)] += 1
+    
+    def to_collapsed(self, root: str) -> str:
+        """One `root;frame;frame count` line per distinct stack"""
+        lines = []
+        for stack, count in self.samples.most_common():
+            names = [root] + [f"{name} ({os.path.basename(path)}:{line})" if path else name for name, path, line in stack]
+            lines.append(f"{';'.join(name.replace(';', ',') for name in names)} {count}")
+        return "\n".join(lines) + "\n"
+    
+    def to_speedscope(self, name: str, duration_ms: float) -> dict:
+        """Sampled profile in the speedscope file format, weighted in milliseconds"""
+        frames: List[dict] = []
+        index = {}
+        samples = []
+        weights = []
+        for stack, count in self.samples.items():
+            sample = []
+            for frame in stack:
+                if frame not in index:
+                    index[frame] = len(frames)
+                    function, path, line = frame
+                    frames.append({"name": function, "file": path, "line": line} if path else {"name": function})
+                sample.append(index[frame])
+            samples.append(sample)
+            weights.append(count * self.interval * 1000)
+        
+        return {
+            "$schema": "https://www.speedscope.app/file-format-schema.json",
+            "name": name,
+            "exporter": "shopnest-profiler",
+            "shared": {"frames": frames},
+            "profiles": [{
+                "type": "sampled",
+                "name": name,
+                "unit": "milliseconds",
+                "startValue": 0,
+                "endValue": max(duration_ms, sum(weights)),
+                "samples": samples,
+                "weights": weights
+            }]
+        }
+
+
+def profile_path(profile_id: str) -> Optional[str]:
+    """Path of a stored profile, or None for unknown ids"""
+    if not profile_id or os.path.basename(profile_id) != profile_id:
+        return None
+    for suffix in (".speedscope.json", ".collapsed.txt"):
+        path = os.path.join(settings.PROFILE_DIR, profile_id + suffix)
+        if os.path.isfile(path):
+            return path
+    return None
+
+
+def save_profile(profile_id: str, sampler: StackSampler, output_format: str, label: str, duration_ms: float) -> str:
+    """Write the profile to PROFILE_DIR; returns its path"""
+    os.makedirs(settings.PROFILE_DIR, exist_ok=True)
+    if output_format == "collapsed":
+        path = os.path.join(settings.PROFILE_DIR, f"{profile_id}.collapsed.txt")
+        content = sampler.to_collapsed(label)
+    else:
+        path = os.path.join(settings.PROFILE_DIR, f"{profile_id}.speedscope.json")
+        content = json.dumps(sampler.to_speedscope(label, duration_ms))
+    with open(path, "w") as f:
+        f.write(content)
+    return path
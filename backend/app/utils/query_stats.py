@@ -0,0 +1,126 @@
+"""
+Per-request SQL instrumentation.
+
+Engine events count every statement and time it against the QueryStats of
+the current request (a context variable, so it follows the request into
+the threadpool). QueryStatsMiddleware (app/middleware) reports the result
+in a Server-Timing header and logs slow requests and likely N+1 patterns.
+
+For tests and scripts, track_queries() collects the same numbers for a
+block of code and query_budget() fails it when it runs too many queries:
+
+    with query_budget(3):
+        client.get("/api/products")
+
+Tracking nests: statements recorded by an inner QueryStats (the one the
+middleware starts for the request above) are recorded by the enclosing
+ones too.
+"""
+
+import logging
+import time
+from collections import Counter
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import List, Optional, Tuple
+
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+from app.config import settings
+
+logger = logging.getLogger("app.sql")
+
+_current: ContextVar[Optional["QueryStats"]] = ContextVar("query_stats", default=None)
+
+
+class QueryStats:
+    """SQL statements run on behalf of one request (or tracked block)"""
+    
+    def __init__(self, parent: Optional["QueryStats"] = None):
+        self.count = 0
+        self.total_seconds = 0.0
+        self.statements: Counter = Counter()
+        self.parent = parent
+    
+    def record(self, statement: str, seconds: float) -> None:
+        stats = self
+        while stats is not None:
+            stats.count += 1
+            stats.total_seconds += seconds
+            stats.statements[statement] += 1
+            stats = stats.parent
+    
+    @property
+    def total_ms(self) -> float:
+        return self.total_seconds * 1000
+    
+    def repeated(self, threshold: Optional[int] = None) -> List[Tuple[str, int]]:
+        """Statements run at least `threshold` times: the usual sign of an N+1"""
+        threshold = threshold or settings.SQL_REPEATED_STATEMENT_THRESHOLD
+        return [(statement, count) for statement, count in self.statements.most_common() if count >= threshold]
+
+
+def current_stats() -> Optional[QueryStats]:
+    return _current.get()
+
+
+def start_tracking() -> Tuple[QueryStats, object]:
+    """
+    Attach a fresh QueryStats to the current context; returns (stats, token
+    for stop_tracking). An already active QueryStats keeps counting too.
+    """
+    stats = QueryStats(parent=_current.get())
+    return stats, _current.set(stats)
+
+
+def stop_tracking(token) -> None:
+    _current.reset(token)
+
+
+@contextmanager
+def track_queries():
+    """Collect QueryStats for the enclosed block"""
+    stats, token = start_tracking()
+    try:
+        yield stats
+    finally:
+        stop_tracking(token)
+
+
+@contextmanager
+def query_budget(max_queries: int):
+    """Fail with AssertionError if the enclosed block runs more than `max_queries` statements"""
+    with track_queries() as stats:
+        yield stats
+    if stats.count > max_queries:
+        repeated = "".join(f"\n  {count}x {statement[:200]}" for statement, count in stats.repeated(2))
+        raise AssertionError(f"{stats.count} queries run, budget is {max_queries}{repeated}")
+
+
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    conn.info.setdefault("query_start", []).append(time.perf_counter())
+
+
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    elapsed = time.perf_counter() - conn.info["query_start"].pop()
+    
+    stats = _current.get()
+    if stats is not None:
+        stats.record(statement, elapsed)
+    
+    if settings.LOG_SQL_QUERIES:
+        logger.info(f"{elapsed * 1000:.1f}ms {statement}")
+
+
+def _handle_error(context):
+    # A failed statement never reaches after_cursor_execute
+    if context.connection is not None and context.connection.info.get("query_start"):
+        context.connection.info["query_start"].pop()
+
+
+def install(engine: Engine) -> None:
+    """Register the timing hooks on `engine`"""
+    event.listen(engine, "before_cursor_execute", _before_cursor_execute)
+    event.listen(engine, "after_cursor_execute", _after_cursor_execute)
+    event.listen(engine, "handle_error", _handle_error)
@@ -0,0 +1,71 @@
+import math
+import threading
+import time
+from collections import OrderedDict
+from typing import Optional
+
+from fastapi import Request
+
+from app.config import settings
+
+
+class TokenBucketLimiter:
+    """
+    In-process token-bucket rate limiter keyed by an arbitrary string.
+    
+    Each key gets a bucket of `capacity` tokens refilled at `rate_per_minute`.
+    Buckets are kept in LRU order and the least recently used are dropped
+    beyond `max_keys`, so memory stays bounded under scans. Limits apply per
+    worker process.
+    """
+    
+    def __init__(self, rate_per_minute: float, capacity: Optional[int] = None, max_keys: int = 10000):
+        self.rate = rate_per_minute / 60.0
+        self.capacity = capacity or max(1, int(rate_per_minute))
+        self.max_keys = max_keys
+        self._buckets: "OrderedDict[str, tuple]" = OrderedDict()
+        self._lock = threading.Lock()
+    
+    def acquire(self, key: str) -> float:
+        """
+        Take one token for `key`.
+        
+        Returns 0 if the request is allowed, otherwise the number of seconds
+        until a token becomes available.
+        """
+        now = time.monotonic()
+        with self._lock:
+            tokens, updated = self._buckets.pop(key, (self.capacity, now))
+            tokens = min(self.capacity, tokens + (now - updated) * self.rate)
+            
+            if tokens >= 1:
+                tokens -= 1
+                retry_after = 0.0
+            else:
+                retry_after = (1 - tokens) / self.rate
+            
+            self._buckets[key] = (tokens, now)
+            while len(self._buckets) > self.max_keys:
+                self._buckets.popitem(last=False)
+        
+        return retry_after
+
+
+def client_ip(request: Request) -> str:
+    """
+    Best-effort client address for rate limiting.
+    
+    Behind TRUSTED_PROXY_HOPS reverse proxies (each appending the address it
+    saw to X-Forwarded-For), the client is the entry that many places from
+    the right; entries further left are client-supplied and never trusted.
+    """
+    hops = settings.TRUSTED_PROXY_HOPS
+    if hops > 0:
+        forwarded = [entry.strip() for entry in request.headers.get("x-forwarded-for", "").split(",") if entry.strip()]
+        if len(forwarded) >= hops:
+            return forwarded[-hops]
+    return request.client.host if request.client else "unknown"
+
+
+def retry_after_header(seconds: float) -> dict:
+    return {"Retry-After": str(max(1, math.ceil(seconds)))}
@@ -0,0 +1,78 @@
+"""
+Fast JSON responses for large lists.
+
+Returning models (or dicts) from an endpoint makes FastAPI validate them
+again against `response_model` and encode them with the stdlib encoder.
+For lists built from trusted ORM rows both steps can be skipped:
+
+- list_response(Schema, rows) validates the rows once with a cached
+  TypeAdapter(List[Schema]) (from attributes) and serializes them with
+  pydantic-core; the output is identical to the response_model path
+- FastJSONResponse encodes hand-built dicts with orjson (stdlib json when
+  orjson is not installed); UUID, datetime and enums are handled natively,
+  Decimal like FastAPI's jsonable_encoder
+
+Keep `response_model` on the route: it still documents the schema.
+"""
+
+import json
+from datetime import date, datetime
+from decimal import Decimal
+from enum import Enum
+from functools import lru_cache
+from typing import Any, Iterable, List, Type
+from uuid import UUID
+
+from fastapi.responses import JSONResponse, Response
+from pydantic import BaseModel, TypeAdapter
+
+try:
+    import orjson
+except ImportError:  # Optional speedup; falls back to the stdlib encoder
+    orjson = None
+
+
+def _default(value: Any) -> Any:
+    if isinstance(value, Decimal):
+        # Same as FastAPI's jsonable_encoder: whole numbers as int, others as float
+        return int(value) if value.as_tuple().exponent >= 0 else float(value)
+    if isinstance(value, BaseModel):
+        return value.model_dump(mode="json", by_alias=True)
+    # Only reached with the stdlib encoder; orjson handles these natively
+    if isinstance(value, UUID):
+        return str(value)
+    if isinstance(value, (datetime, date)):
+        return value.isoformat()
+    if isinstance(value, Enum):
+        return value.value
+    raise TypeError(f"Object of type {type(value).__name__} is not JSON serializable")
+
+
+def dumps(content: Any) -> bytes:
+    """Encode `content` as compact UTF-8 JSON"""
+    if orjson is not None:
+        return orjson.dumps(content, default=_default, option=orjson.OPT_NON_STR_KEYS)
+    return json.dumps(content, default=_default, ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+
+
+class FastJSONResponse(JSONResponse):
+    """JSONResponse encoded with orjson; returned as is, so FastAPI skips response_model validation"""
+    
+    def render(self, content: Any) -> bytes:
+        return dumps(content)
+
+
+@lru_cache(maxsize=None)
+def list_adapter(schema: Type[BaseModel]) -> TypeAdapter:
+    """Compiled validator/serializer for List[schema], built once per schema"""
+    return TypeAdapter(List[schema])
+
+
+def list_response(schema: Type[BaseModel], rows: Iterable[Any], **response_kwargs) -> Response:
+    """
+    JSON response for `rows` as List[schema]. Rows may be ORM objects,
+    dicts or schema instances (passed through without revalidation).
+    """
+    adapter = list_adapter(schema)
+    models = adapter.validate_python(list(rows), from_attributes=True)
+    return Response(content=adapter.dump_json(models, by_alias=True), media_type="application/json", **response_kwargs)
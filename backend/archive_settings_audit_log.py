@@ -0,0 +1,56 @@
+"""
+Settings Audit Log Archival Command for ShopNest
+
+Moves settings audit entries older than the retention window
+(SETTINGS_AUDIT_RETENTION_DAYS) from settings_audit_log to
+settings_audit_log_archive, one committed batch at a time.
+
+Usage:
+    python archive_settings_audit_log.py                  # use the configured retention
+    python archive_settings_audit_log.py --days 90        # archive entries older than 90 days
+    python archive_settings_audit_log.py --batch-size 500
+"""
+
+import argparse
+from app.database import SessionLocal
+from app.services.settings_audit_service import SettingsAuditService
+
+
+def archive_settings_audit_log(days=None, batch_size: int = 1000):
+    """Archive old audit entries in batches"""
+    
+    db = SessionLocal()
+    
+    try:
+        service = SettingsAuditService(db)
+        cutoff = service.retention_cutoff(days)
+        print(f"  📅 Archiving entries created before {cutoff.isoformat()}")
+        
+        total = 0
+        while True:
+            moved = service.archive_batch(cutoff, batch_size)
+            db.commit()
+            total += moved
+            if moved < batch_size:
+                break
+        
+        print(f"✨ Audit log archival completed ({total} entries archived)")
+    
+    except Exception as e:
+        print(f"\n❌ Error archiving audit log: {str(e)}")
+        db.rollback()
+        raise
+    finally:
+        db.close()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Archive old settings audit log entries")
+    parser.add_argument("--days", type=int, default=None, help="Retention in days (default: SETTINGS_AUDIT_RETENTION_DAYS)")
+    parser.add_argument("--batch-size", type=int, default=1000, help="Entries moved per transaction")
+    args = parser.parse_args()
+    
+    print("🗄️  ShopNest Settings Audit Log Archival")
+    print("="*60)
+    
+    archive_settings_audit_log(days=args.days, batch_size=args.batch_size)
@@ -0,0 +1,37 @@
+"""
+Idempotency Key Cleanup Command for ShopNest
+
+Deletes idempotency keys past their TTL (IDEMPOTENCY_KEY_TTL_HOURS).
+Expired keys are already ignored by the API; this only reclaims space.
+
+Usage:
+    python cleanup_idempotency_keys.py
+"""
+
+from app.database import SessionLocal
+from app.services.idempotency_service import IdempotencyService
+
+
+def cleanup_idempotency_keys():
+    """Delete expired idempotency keys"""
+    
+    db = SessionLocal()
+    
+    try:
+        removed = IdempotencyService(db).purge_expired()
+        db.commit()
+        print(f"✨ Idempotency key cleanup completed ({removed} expired keys removed)")
+        
+    except Exception as e:
+        print(f"\n❌ Error cleaning up idempotency keys: {str(e)}")
+        db.rollback()
+        raise
+    finally:
+        db.close()
+
+
+if __name__ == "__main__":
+    print("🧹 ShopNest Idempotency Key Cleanup")
+    print("="*60)
+    
+    cleanup_idempotency_keys()
@@ -0,0 +1,49 @@
+"""
+Media Cleanup Command for ShopNest
+
+Removes uploaded images that no product image or category references.
+Blobs younger than MEDIA_ORPHAN_GRACE_HOURS are kept, so uploads whose
+product has not been saved yet are not lost.
+
+Usage:
+    python cleanup_media.py                  # delete orphaned blobs
+    python cleanup_media.py --dry-run        # only list what would be deleted
+    python cleanup_media.py --grace-hours 1  # override the grace period
+"""
+
+import argparse
+from app.database import SessionLocal
+from app.services.blob_store import BlobStoreService
+
+
+def cleanup_media(grace_hours=None, dry_run: bool = False):
+    """Expire orphaned blobs from the local media store"""
+    
+    db = SessionLocal()
+    
+    try:
+        removed = BlobStoreService(db).expire_orphans(grace_hours=grace_hours, dry_run=dry_run)
+        
+        for digest in removed:
+            print(f"  🗑️  {digest}")
+        
+        action = "would be removed" if dry_run else "removed"
+        print(f"✨ Media cleanup completed ({len(removed)} orphaned blobs {action})")
+        
+    except Exception as e:
+        print(f"\n❌ Error cleaning up media: {str(e)}")
+        raise
+    finally:
+        db.close()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Remove unreferenced ShopNest media blobs")
+    parser.add_argument("--dry-run", action="store_true", help="List orphaned blobs without deleting them")
+    parser.add_argument("--grace-hours", type=int, default=None, help="Keep blobs younger than this")
+    args = parser.parse_args()
+    
+    print("🧹 ShopNest Media Cleanup")
+    print("="*60)
+    
+    cleanup_media(grace_hours=args.grace_hours, dry_run=args.dry_run)
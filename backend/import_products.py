@@ -0,0 +1,72 @@
+"""
+Bulk Product Import Command for ShopNest
+
+Imports a seller's catalog from a CSV or NDJSON file, the same way as
+POST /api/products/import but without upload size or request time limits.
+Rows whose SKU matches one of the seller's products update it; all other
+rows create new products.
+
+Usage:
+    python import_products.py --seller-email seller1@demo.com --file catalog.csv
+    python import_products.py --seller-email seller1@demo.com --file catalog.ndjson --chunk-size 1000
+"""
+
+import argparse
+import sys
+from app.database import SessionLocal
+from app.models.user import User
+from app.models.seller import SellerProfile, ApprovalStatus
+from app.services.product_import_service import ProductImportService, DEFAULT_CHUNK_SIZE
+
+
+def import_products(seller_email: str, path: str, file_format: str, chunk_size: int) -> bool:
+    """Run the import and print a summary. Returns False if any row failed."""
+    
+    db = SessionLocal()
+    
+    try:
+        seller = db.query(SellerProfile).join(
+            User, User.id == SellerProfile.user_id
+        ).filter(User.email == seller_email).first()
+        
+        if not seller:
+            print(f"❌ No seller profile found for {seller_email}")
+            return False
+        
+        if seller.approval_status != ApprovalStatus.APPROVED:
+            print(f"❌ Seller account is {seller.approval_status.value}; only approved sellers can list products")
+            return False
+        
+        service = ProductImportService(db, seller, chunk_size=chunk_size)
+        with open(path, "rb") as stream:
+            result = service.import_stream(stream, file_format)
+        
+        print(f"  • Rows:    {result.total_rows}")
+        print(f"  • Created: {result.created}")
+        print(f"  • Updated: {result.updated}")
+        print(f"  • Failed:  {result.failed}")
+        for error in result.errors:
+            sku = f" [{error.sku}]" if error.sku else ""
+            print(f"    row {error.row}{sku}: {error.message}")
+        
+        return result.failed == 0
+        
+    finally:
+        db.close()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Bulk import products for a seller")
+    parser.add_argument("--seller-email", required=True, help="Email of the seller's user account")
+    parser.add_argument("--file", required=True, help="Path to a .csv or .ndjson file")
+    parser.add_argument("--format", choices=["csv", "ndjson"], help="File format (default: from extension)")
+    parser.add_argument("--chunk-size", type=int, default=DEFAULT_CHUNK_SIZE, help="Rows per transaction")
+    args = parser.parse_args()
+    
+    file_format = args.format or ("csv" if args.file.lower().endswith(".csv") else "ndjson")
+    
+    print("📦 ShopNest Product Import")
+    print("="*60)
+    
+    ok = import_products(args.seller_email, args.file, file_format, args.chunk_size)
+    sys.exit(0 if ok else 1)
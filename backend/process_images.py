@@ -0,0 +1,61 @@
+"""
+Image Processing Command for ShopNest
+
+Generates WebP thumbnails for product images that do not have them yet.
+New images are processed automatically when a product is saved; run this
+after bulk imports, seeding, or to retry images that failed to download.
+
+Usage:
+    python process_images.py                  # process all pending images
+    python process_images.py --batch-size 50  # commit every 50 images
+"""
+
+import argparse
+from app.database import SessionLocal
+from app.models.product import ProductImage
+from app.services.image_service import ImageService, shutdown_pool
+from app.services.product_import_service import chunked
+
+
+def process_images(batch_size: int = 100):
+    """Process pending images in batches, committing after each batch"""
+    
+    db = SessionLocal()
+    
+    try:
+        pending_ids = [
+            image_id for (image_id,) in db.query(ProductImage.id).filter(
+                ProductImage.thumbnail_url.is_(None)
+            ).order_by(ProductImage.created_at).all()
+        ]
+        print(f"  📷 {len(pending_ids)} images pending")
+        
+        service = ImageService(db)
+        processed = 0
+        for batch in chunked(pending_ids, batch_size):
+            images = db.query(ProductImage).filter(ProductImage.id.in_(batch)).all()
+            processed += service.process_images(images)
+            db.commit()
+            print(f"  ✅ {processed} images processed")
+        
+        failed = len(pending_ids) - processed
+        print(f"✨ Image processing completed ({processed} processed, {failed} failed)")
+        
+    except Exception as e:
+        print(f"\n❌ Error processing images: {str(e)}")
+        db.rollback()
+        raise
+    finally:
+        db.close()
+        shutdown_pool()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Generate thumbnails for ShopNest product images")
+    parser.add_argument("--batch-size", type=int, default=100, help="Images per commit")
+    args = parser.parse_args()
+    
+    print("🖼️  ShopNest Image Processing")
+    print("="*60)
+    
+    process_images(batch_size=args.batch_size)
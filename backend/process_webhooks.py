@@ -0,0 +1,53 @@
+"""
+Webhook Processing Command for ShopNest
+
+Processes queued Stripe webhook events. The API runs a background worker
+that does this continuously; use this when the worker is disabled
+(WEBHOOK_WORKER_ENABLED=false) or to retry failed events by hand.
+
+Usage:
+    python process_webhooks.py                 # process all due events
+    python process_webhooks.py --retry-failed  # requeue failed events first
+"""
+
+import argparse
+from app.database import SessionLocal
+from app.models.webhook_event import WebhookEvent
+from app.services.webhook_service import WebhookProcessor
+
+
+def process_webhooks(retry_failed: bool = False):
+    """Drain the webhook queue"""
+    
+    db = SessionLocal()
+    
+    try:
+        if retry_failed:
+            requeued = db.query(WebhookEvent).filter(
+                WebhookEvent.status == "failed"
+            ).update({"status": "pending", "attempts": 0}, synchronize_session=False)
+            db.commit()
+            print(f"  🔁 {requeued} failed events requeued")
+        
+        processed = WebhookProcessor(db).drain()
+        
+        failed = db.query(WebhookEvent).filter(WebhookEvent.status == "failed").count()
+        print(f"✨ Webhook processing completed ({processed} events processed, {failed} failed)")
+        
+    except Exception as e:
+        print(f"\n❌ Error processing webhooks: {str(e)}")
+        db.rollback()
+        raise
+    finally:
+        db.close()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Process queued ShopNest webhook events")
+    parser.add_argument("--retry-failed", action="store_true", help="Requeue failed events before processing")
+    args = parser.parse_args()
+    
+    print("📬 ShopNest Webhook Processing")
+    print("="*60)
+    
+    process_webhooks(retry_failed=args.retry_failed)
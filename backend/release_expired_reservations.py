@@ -0,0 +1,44 @@
+"""
+Stock Reservation Sweep Command for ShopNest
+
+Cancels unpaid orders whose stock reservations expired and puts their stock
+back. The API runs a background sweeper that does this every
+RESERVATION_SWEEP_SECONDS; use this when the sweeper is disabled
+(RESERVATION_SWEEPER_ENABLED=false) or to release stock right away.
+
+Usage:
+    python release_expired_reservations.py
+    python release_expired_reservations.py --batch-size 500
+"""
+
+import argparse
+from app.database import SessionLocal
+from app.services.inventory_service import InventoryService
+
+
+def release_expired_reservations(batch_size: int = None):
+    """Resolve all expired stock reservations"""
+    
+    db = SessionLocal()
+    
+    try:
+        handled = InventoryService(db).sweep(batch_size)
+        print(f"✨ Reservation sweep completed ({handled} orders with expired holds handled)")
+        
+    except Exception as e:
+        print(f"\n❌ Error releasing reservations: {str(e)}")
+        db.rollback()
+        raise
+    finally:
+        db.close()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Release expired ShopNest stock reservations")
+    parser.add_argument("--batch-size", type=int, default=None, help="Orders handled per transaction")
+    args = parser.parse_args()
+    
+    print("📦 ShopNest Stock Reservation Sweep")
+    print("="*60)
+    
+    release_expired_reservations(batch_size=args.batch_size)
@@ -0,0 +1,61 @@
+"""
+Aggregate Repair Command for ShopNest
+
+Recomputes denormalized counters from their source rows in bulk. Counters
+are normally maintained incrementally; run this after manual data fixes,
+imports, or if the counters are suspected to have drifted.
+
+Usage:
+    python repair_aggregates.py               # repair everything
+    python repair_aggregates.py --products    # product rating counters only
+    python repair_aggregates.py --sellers     # seller rating and sales rollups only
+"""
+
+import argparse
+from app.database import SessionLocal
+from app.services.aggregate_service import AggregateService
+
+
+def repair_aggregates(products: bool = True, sellers: bool = True):
+    """Recompute the selected aggregates in a single transaction"""
+    
+    db = SessionLocal()
+    
+    try:
+        service = AggregateService(db)
+        
+        if products:
+            updated = service.recompute_product_ratings()
+            print(f"  ✅ Product rating counters: {updated} products updated")
+        
+        if sellers:
+            updated = service.recompute_seller_rollups()
+            print(f"  ✅ Seller rollups: {updated} sellers updated")
+        
+        db.commit()
+        print("✨ Aggregate repair completed")
+        
+    except Exception as e:
+        print(f"\n❌ Error repairing aggregates: {str(e)}")
+        db.rollback()
+        raise
+    finally:
+        db.close()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Recompute ShopNest aggregate counters")
+    parser.add_argument("--products", action="store_true", help="Repair product rating counters")
+    parser.add_argument("--sellers", action="store_true", help="Repair seller rating and sales rollups")
+    args = parser.parse_args()
+    
+    # With no selection, repair everything
+    repair_all = not (args.products or args.sellers)
+    
+    print("🔧 ShopNest Aggregate Repair")
+    print("="*60)
+    
+    repair_aggregates(
+        products=args.products or repair_all,
+        sellers=args.sellers or repair_all
+    )
@@ -17,6 +17,7 @@ from app.models.category import Category
 from app.models.product import Product, ProductImage
 from app.models.order import Order, OrderItem, OrderStatus, PaymentStatus
 from app.utils.security import get_password_hash
+from app.services.aggregate_service import AggregateService
 from datetime import datetime, timedelta
 import random
 
@@ -398,6 +399,11 @@ def create_demo_data(verbose=True):
         db.commit()
         log(f"\n  🛍️  Total orders created: {orders_created}")
         
+        # Demo orders are inserted directly, so reconcile seller rollups
+        if orders_created:
+            AggregateService(db).recompute_seller_rollups()
+            db.commit()
+        
         # Summary
         log("\n" + "="*60)
         log("✨ Demo data seeding completed successfully!")
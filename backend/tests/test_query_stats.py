@@ -0,0 +1,53 @@
+"""
+query_budget() must count the queries of requests served through
+QueryStatsMiddleware, which starts its own tracking for every request.
+
+Runs against an in-memory SQLite engine: python -m pytest tests
+"""
+
+import asyncio
+import os
+
+os.environ.setdefault("DATABASE_URL", "sqlite://")
+os.environ.setdefault("SECRET_KEY", "test-secret")
+os.environ.setdefault("STRIPE_PUBLIC_KEY", "pk_test")
+os.environ.setdefault("STRIPE_SECRET_KEY", "sk_test")
+os.environ.setdefault("STRIPE_WEBHOOK_SECRET", "whsec_test")
+
+import pytest
+from sqlalchemy import text
+
+from app.database import engine
+from app.middleware.query_stats_middleware import QueryStatsMiddleware
+from app.utils.query_stats import query_budget
+
+
+def serve_request(query_count: int) -> None:
+    """Send one GET through the middleware to an app that runs `query_count` queries"""
+    async def app(scope, receive, send):
+        with engine.connect() as connection:
+            for _ in range(query_count):
+                connection.execute(text("SELECT 1"))
+        await send({"type": "http.response.start", "status": 200, "headers": []})
+        await send({"type": "http.response.body", "body": b""})
+
+    async def receive():
+        return {"type": "http.request", "body": b""}
+
+    async def send(message):
+        pass
+
+    scope = {"type": "http", "method": "GET", "path": "/", "headers": []}
+    asyncio.run(QueryStatsMiddleware(app)(scope, receive, send))
+
+
+def test_budget_counts_queries_of_tracked_requests():
+    with query_budget(5) as stats:
+        serve_request(5)
+    assert stats.count == 5
+
+
+def test_budget_fails_when_exceeded():
+    with pytest.raises(AssertionError, match="5 queries run, budget is 1"):
+        with query_budget(1):
+            serve_request(5)
@@ -33,20 +33,16 @@ const FrequentlyBoughtTogether = ({ productId, limit = 4 }) => {
     fetchFrequentlyBoughtTogether();
   }, [productId, limit]);
 
-  // Fetch wishlist to highlight saved items
+  // Highlight saved items: one bulk check for the products shown
   useEffect(() => {
-    if (isAuthenticated) {
-      const fetchWishlist = async () => {
-        try {
-          const data = await wishlistService.getWishlist();
-          setWishlistProductIds(new Set(data.map(item => item.product?.id)));
-        } catch (error) {
-          // Silently fail
-        }
+    if (isAuthenticated && recommendations.length > 0) {
+      const fetchWishlistState = async () => {
+        const inWishlist = await wishlistService.checkWishlistBulk(recommendations.map(item => item.product?.id).filter(Boolean));
+        setWishlistProductIds(new Set(Object.keys(inWishlist).filter(id => inWishlist[id])));
       };
-      fetchWishlist();
+      fetchWishlistState();
     }
-  }, [isAuthenticated]);
+  }, [isAuthenticated, recommendations]);
 
   const handleWishlistToggle = async (e, product) => {
     e.preventDefault();
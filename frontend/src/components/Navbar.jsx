@@ -20,8 +20,8 @@ const Navbar = () => {
 
   const fetchWishlistCount = async () => {
     try {
-      const data = await wishlistService.getWishlist();
-      setWishlistCount(data.length);
+      const count = await wishlistService.getWishlistCount();
+      setWishlistCount(count);
     } catch (error) {
       // Silently fail - not critical
     }
@@ -31,20 +31,16 @@ const SimilarProducts = ({ productId, limit = 8 }) => {
     fetchSimilarProducts();
   }, [productId, limit]);
 
-  // Fetch wishlist to highlight saved items
+  // Highlight saved items: one bulk check for the products shown
   useEffect(() => {
-    if (isAuthenticated) {
-      const fetchWishlist = async () => {
-        try {
-          const data = await wishlistService.getWishlist();
-          setWishlistProductIds(new Set(data.map(item => item.product?.id)));
-        } catch (error) {
-          // Silently fail
-        }
+    if (isAuthenticated && products.length > 0) {
+      const fetchWishlistState = async () => {
+        const inWishlist = await wishlistService.checkWishlistBulk(products.map(product => product.id));
+        setWishlistProductIds(new Set(Object.keys(inWishlist).filter(id => inWishlist[id])));
       };
-      fetchWishlist();
+      fetchWishlistState();
     }
-  }, [isAuthenticated]);
+  }, [isAuthenticated, products]);
 
   const handleWishlistToggle = async (e, product) => {
     e.preventDefault();
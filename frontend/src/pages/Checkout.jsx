@@ -13,6 +13,7 @@ import {
 import useCartStore from '../store/cartStore';
 import useAuthStore from '../store/authStore';
 import orderService from '../services/orderService';
+import cartService from '../services/cartService';
 import toast from 'react-hot-toast';
 
 const Checkout = () => {
@@ -23,6 +24,10 @@ const Checkout = () => {
   const [step, setStep] = useState(1); // 1: Shipping, 2: Payment, 3: Review
   const [loading, setLoading] = useState(false);
   const [orderCreated, setOrderCreated] = useState(false);
+  // One key per checkout attempt, so a retried request cannot place a second order
+  const [idempotencyKey, setIdempotencyKey] = useState(() => crypto.randomUUID());
+  // Server-side prices and availability for the cart (null until loaded or if the quote fails)
+  const [quote, setQuote] = useState(null);
 
   // Shipping Information
   const [shippingInfo, setShippingInfo] = useState({
@@ -63,7 +68,21 @@ const Checkout = () => {
     }
   }, [items, navigate, orderCreated]);
 
-  const subtotal = getTotal();
+  // Re-quote whenever the cart changes, so stock problems show before placing the order
+  useEffect(() => {
+    if (items.length === 0) return;
+    let cancelled = false;
+    cartService.syncAndQuote(items)
+      .then((result) => { if (!cancelled) setQuote(result); })
+      .catch(() => { if (!cancelled) setQuote(null); });
+    return () => { cancelled = true; };
+  }, [items]);
+
+  const quoteLines = Object.fromEntries((quote?.lines || []).map((line) => [line.product_id, line]));
+  // Cart items the server cannot sell as-is (products that no longer exist are missing from the quote)
+  const unavailableLines = quote ? items.filter((item) => quoteLines[item.id]?.status !== 'available') : [];
+
+  const subtotal = quote ? quote.subtotal : getTotal();
   const shippingCost = subtotal > 100 ? 0 : 15; // Free shipping over $100
   const tax = subtotal * 0.125; // 12.5% VAT
   const total = subtotal + shippingCost + tax;
@@ -105,6 +124,10 @@ const Checkout = () => {
   };
 
   const handlePlaceOrder = async () => {
+    if (unavailableLines.length > 0) {
+      toast.error('Some items are no longer available. Please update your cart.');
+      return;
+    }
     setLoading(true);
     try {
       const orderData = {
@@ -122,7 +145,7 @@ const Checkout = () => {
         total: total
       };
 
-      const order = await orderService.createOrder(orderData);
+      const order = await orderService.createOrder(orderData, idempotencyKey);
       
       toast.success('Order placed successfully!');
       setOrderCreated(true);
@@ -131,6 +154,10 @@ const Checkout = () => {
       // Redirect to order confirmation
       navigate(`/orders/${order.id}`);
     } catch (error) {
+      // The server rejected this attempt; a corrected retry is a new request
+      if (error.response && error.response.status < 500) {
+        setIdempotencyKey(crypto.randomUUID());
+      }
       toast.error(error.response?.data?.detail || 'Failed to place order');
     } finally {
       setLoading(false);
@@ -676,9 +703,21 @@ const Checkout = () => {
                           <div className="flex-1">
                             <h4 className="font-medium">{item.name}</h4>
                             <p className="text-sm text-gray-600">Quantity: {item.quantity}</p>
+                            {quoteLines[item.id]?.status === 'insufficient_stock' && (
+                              <p className="text-sm text-red-600 flex items-center">
+                                <AlertCircle className="h-4 w-4 mr-1" />
+                                Only {quoteLines[item.id].available_quantity} left in stock
+                              </p>
+                            )}
+                            {quote && (!quoteLines[item.id] || quoteLines[item.id].status === 'unavailable') && (
+                              <p className="text-sm text-red-600 flex items-center">
+                                <AlertCircle className="h-4 w-4 mr-1" />
+                                No longer available
+                              </p>
+                            )}
                           </div>
                           <p className="font-semibold">
-                            ${(parseFloat(item.price) * item.quantity).toFixed(2)}
+                            ${((quoteLines[item.id]?.unit_price ?? parseFloat(item.price)) * item.quantity).toFixed(2)}
                           </p>
                         </div>
                       ))}
@@ -692,7 +731,7 @@ const Checkout = () => {
                   </button>
                   <button
                     onClick={handlePlaceOrder}
-                    disabled={loading}
+                    disabled={loading || unavailableLines.length > 0}
                     className="btn-primary flex items-center"
                   >
                     {loading ? (
@@ -16,6 +16,8 @@ import toast from 'react-hot-toast';
 const Orders = () => {
   const [orders, setOrders] = useState([]);
   const [loading, setLoading] = useState(true);
+  const [nextCursor, setNextCursor] = useState(null);
+  const [loadingMore, setLoadingMore] = useState(false);
   const [filter, setFilter] = useState('all'); // all, pending, confirmed, shipped, delivered, cancelled
 
   useEffect(() => {
@@ -24,8 +26,9 @@ const Orders = () => {
 
   const fetchOrders = async () => {
     try {
-      const data = await orderService.getOrders();
-      setOrders(data);
+      const page = await orderService.getOrdersPage();
+      setOrders(page.orders);
+      setNextCursor(page.nextCursor);
     } catch (error) {
       toast.error('Failed to load orders');
     } finally {
@@ -33,6 +36,19 @@ const Orders = () => {
     }
   };
 
+  const loadMoreOrders = async () => {
+    setLoadingMore(true);
+    try {
+      const page = await orderService.getOrdersPage({ cursor: nextCursor });
+      setOrders((current) => [...current, ...page.orders]);
+      setNextCursor(page.nextCursor);
+    } catch (error) {
+      toast.error('Failed to load more orders');
+    } finally {
+      setLoadingMore(false);
+    }
+  };
+
   const handleCancelOrder = async (orderId) => {
     if (!confirm('Are you sure you want to cancel this order?')) return;
 
@@ -200,7 +216,7 @@ const Orders = () => {
                         ${parseFloat(order.total).toFixed(2)}
                       </p>
                       <p className="text-sm text-gray-600">
-                        {order.items?.length || 0} item{order.items?.length !== 1 ? 's' : ''}
+                        {order.item_count || 0} item{order.item_count !== 1 ? 's' : ''}
                       </p>
                     </div>
                   </div>
@@ -238,9 +254,9 @@ const Orders = () => {
                         </span>
                       </div>
                     ))}
-                    {order.items?.length > 3 && (
+                    {order.item_count > 3 && (
                       <p className="text-sm text-gray-600 text-center">
-                        + {order.items.length - 3} more item{order.items.length - 3 !== 1 ? 's' : ''}
+                        + {order.item_count - 3} more item{order.item_count - 3 !== 1 ? 's' : ''}
                       </p>
                     )}
                   </div>
@@ -326,6 +342,18 @@ const Orders = () => {
             })}
           </div>
         )}
+
+        {nextCursor && (
+          <div className="text-center mt-6">
+            <button
+              onClick={loadMoreOrders}
+              disabled={loadingMore}
+              className="btn-secondary"
+            >
+              {loadingMore ? 'Loading...' : 'Load more orders'}
+            </button>
+          </div>
+        )}
       </div>
     </div>
   );
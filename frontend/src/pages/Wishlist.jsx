@@ -8,7 +8,7 @@
  * Access: Protected route - requires authentication
  * 
  * Features:
- * - Grid layout of wishlist items (responsive: 1/2/4 columns)
+ * - Grid layout of wishlist items (responsive: 1/2/4 columns), loaded a page at a time
  * - Product image with remove button overlay
  * - Stock status indicator
  * - Rating display
@@ -25,6 +25,9 @@ import useCartStore from '../store/cartStore';
 import useAuthStore from '../store/authStore';
 import toast from 'react-hot-toast';
 
+// Wishlist items loaded per page ("Load more")
+const PAGE_SIZE = 24;
+
 /**
  * Wishlist Page Component
  * Main component for displaying and managing user's wishlist items.
@@ -32,7 +35,10 @@ import toast from 'react-hot-toast';
 const Wishlist = () => {
   // State for wishlist items and loading status
   const [wishlistItems, setWishlistItems] = useState([]);
+  const [totalCount, setTotalCount] = useState(0);
+  const [hasMore, setHasMore] = useState(false);
   const [loading, setLoading] = useState(true);
+  const [loadingMore, setLoadingMore] = useState(false);
   
   // Get cart store action and auth state
   const addItem = useCartStore((state) => state.addItem);
@@ -46,14 +52,19 @@ const Wishlist = () => {
   }, [isAuthenticated]);
 
   /**
-   * Fetch all wishlist items for the authenticated user.
+   * Fetch the first page of wishlist items and the total item count.
    * Updates local state with the fetched data.
    */
   const fetchWishlist = async () => {
     setLoading(true);
     try {
-      const data = await wishlistService.getWishlist();
+      const [data, count] = await Promise.all([
+        wishlistService.getWishlist({ skip: 0, limit: PAGE_SIZE }),
+        wishlistService.getWishlistCount()
+      ]);
       setWishlistItems(data);
+      setTotalCount(count);
+      setHasMore(data.length === PAGE_SIZE);
     } catch (error) {
       console.error('Failed to load wishlist:', error);
       toast.error('Failed to load wishlist');
@@ -62,6 +73,20 @@ const Wishlist = () => {
     }
   };
 
+  /**
+   * Append the next page of wishlist items.
+   */
+  const loadMore = async () => {
+    setLoadingMore(true);
+    try {
+      const data = await wishlistService.getWishlist({ skip: wishlistItems.length, limit: PAGE_SIZE });
+      setWishlistItems(prev => [...prev, ...data]);
+      setHasMore(data.length === PAGE_SIZE);
+    } finally {
+      setLoadingMore(false);
+    }
+  };
+
   /**
    * Remove a product from the wishlist.
    * @param {string} productId - UUID of product to remove
@@ -71,7 +96,9 @@ const Wishlist = () => {
     try {
       await wishlistService.removeFromWishlist(productId);
       toast.success(`${productName} removed from wishlist`);
-      fetchWishlist(); // Refresh wishlist after removal
+      // Drop it locally so the pages already loaded stay in place
+      setWishlistItems(prev => prev.filter(item => item.product?.id !== productId));
+      setTotalCount(prev => Math.max(prev - 1, 0));
     } catch (error) {
       toast.error('Failed to remove from wishlist');
     }
@@ -132,7 +159,7 @@ const Wishlist = () => {
             My Wishlist
           </h1>
           <p className="text-gray-600">
-            {wishlistItems.length} item{wishlistItems.length !== 1 ? 's' : ''} saved for later
+            {totalCount} item{totalCount !== 1 ? 's' : ''} saved for later
           </p>
         </div>
 
@@ -237,6 +264,19 @@ const Wishlist = () => {
             })}
           </div>
         )}
+
+        {/* Load More - shown while more saved items exist */}
+        {hasMore && (
+          <div className="text-center mt-8">
+            <button
+              onClick={loadMore}
+              disabled={loadingMore}
+              className="btn-secondary"
+            >
+              {loadingMore ? 'Loading...' : 'Load More'}
+            </button>
+          </div>
+        )}
       </div>
     </div>
   );
@@ -0,0 +1,25 @@
+import api from './api';
+
+export const cartService = {
+  // Replace the server-side cart with the items of the local cart store
+  syncCart: async (items) => {
+    const response = await api.put('/cart', {
+      items: items.map((item) => ({ product_id: item.id, quantity: item.quantity })),
+    });
+    return response.data;
+  },
+
+  // Current prices and per-line availability of the server-side cart
+  quoteCart: async () => {
+    const response = await api.post('/cart/quote');
+    return response.data;
+  },
+
+  // Sync the local cart, then quote it
+  syncAndQuote: async (items) => {
+    await cartService.syncCart(items);
+    return cartService.quoteCart();
+  },
+};
+
+export default cartService;
@@ -1,13 +1,26 @@
 import api from './api';
 
 export const orderService = {
-  // Create a new order
-  createOrder: async (orderData) => {
-    const response = await api.post('/orders', orderData);
+  // Create a new order; reuse the same idempotencyKey when retrying the same checkout
+  createOrder: async (orderData, idempotencyKey) => {
+    const response = await api.post('/orders', orderData, {
+      headers: idempotencyKey ? { 'Idempotency-Key': idempotencyKey } : {},
+    });
     return response.data;
   },
 
-  // Get user's orders
+  // Get a page of the user's orders; pass nextCursor back to get the following page
+  getOrdersPage: async ({ cursor, limit = 20, status, createdFrom, createdTo } = {}) => {
+    const response = await api.get('/orders', {
+      params: { cursor, limit, status, created_from: createdFrom, created_to: createdTo },
+    });
+    return {
+      orders: response.data,
+      nextCursor: response.headers['x-next-cursor'] || null,
+    };
+  },
+
+  // Get the first page of the user's orders
   getOrders: async () => {
     const response = await api.get('/orders');
     return response.data;
@@ -40,6 +53,13 @@ export const orderService = {
     return response.data;
   },
 
+  // Seller: Update many order items at once
+  // updates: [{ order_item_id, status, tracking_number }]; returns { updated, orders_updated, errors }
+  bulkUpdateOrderStatus: async (updates) => {
+    const response = await api.post('/sellers/orders/bulk-status', { updates });
+    return response.data;
+  },
+
   // Admin: Get all orders
   getAllOrders: async () => {
     const response = await api.get('/admin/orders');
@@ -8,11 +8,13 @@ export const paymentService = {
   },
 
   // Create payment intent
-  createPaymentIntent: async (amount, orderId) => {
+  createPaymentIntent: async (amount, orderId, idempotencyKey) => {
     const response = await api.post('/payments/create-intent', {
       amount,
       order_id: orderId,
       currency: 'usd'
+    }, {
+      headers: idempotencyKey ? { 'Idempotency-Key': idempotencyKey } : {},
     });
     return response.data;
   },
@@ -31,6 +31,16 @@ export const productService = {
     return response.data;
   },
 
+  // Upload an image to the media store; returns { url, sha256, ... }
+  uploadImage: async (file) => {
+    const formData = new FormData();
+    formData.append('file', file);
+    const response = await api.post('/media', formData, {
+      headers: { 'Content-Type': 'multipart/form-data' },
+    });
+    return response.data;
+  },
+
   // Get seller's products
   getMyProducts: async (includeInactive = false) => {
     const response = await api.get('/products/seller/my-products', {
@@ -8,9 +8,21 @@ export const reviewService = {
   },
 
   // Get reviews for a product
-  getProductReviews: async (productId, skip = 0, limit = 20) => {
+  // sort: 'newest' | 'helpful'; pass the returned nextCursor to load the next page
+  getProductReviewsPage: async (productId, { cursor, limit = 20, sort = 'newest', rating } = {}) => {
     const response = await api.get(`/reviews/product/${productId}`, {
-      params: { skip, limit },
+      params: { cursor, limit, sort, rating },
+    });
+    return {
+      reviews: response.data,
+      nextCursor: response.headers['x-next-cursor'] || null,
+    };
+  },
+
+  // Get the first page of reviews for a product
+  getProductReviews: async (productId, limit = 20) => {
+    const response = await api.get(`/reviews/product/${productId}`, {
+      params: { limit },
     });
     return response.data;
   },
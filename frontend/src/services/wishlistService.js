@@ -16,16 +16,19 @@ import api from './api';
  */
 export const wishlistService = {
   /**
-   * Get all wishlist items for the current authenticated user.
+   * Get one page of wishlist items for the current authenticated user, newest first.
    * Fetches the user's wishlist with full product details included.
    * 
+   * @param {Object} [options]
+   * @param {number} [options.skip=0] - Number of items to skip
+   * @param {number} [options.limit=50] - Page size (1-100)
    * @returns {Promise<Array>} Array of wishlist items with product details,
    *                          or empty array if none exist or error occurs
    * @throws {Error} Silently caught and logged - returns empty array on failure
    */
-  getWishlist: async () => {
+  getWishlist: async ({ skip = 0, limit = 50 } = {}) => {
     try {
-      const response = await api.get('/wishlist');
+      const response = await api.get('/wishlist', { params: { skip, limit } });
       return response.data;
     } catch (error) {
       console.error('Error fetching wishlist:', error);
@@ -33,6 +36,22 @@ export const wishlistService = {
     }
   },
 
+  /**
+   * Get the number of items in the user's wishlist (e.g. for the navbar badge).
+   * 
+   * @returns {Promise<number>} Item count, or 0 on failure
+   * @throws {Error} Silently caught - returns 0 on failure
+   */
+  getWishlistCount: async () => {
+    try {
+      const response = await api.get('/wishlist/count');
+      return response.data.count;
+    } catch (error) {
+      console.error('Error fetching wishlist count:', error);
+      return 0;
+    }
+  },
+
   /**
    * Add a product to the user's wishlist.
    * Creates a persistent saved item that appears in the wishlist page.
@@ -85,6 +104,28 @@ export const wishlistService = {
       console.error('Error checking wishlist:', error);
       return false;
     }
+  },
+
+  /**
+   * Check many products against the user's wishlist in a single request.
+   * Used by product grids to fill every heart icon on a page at once.
+   * 
+   * @param {Array<string>} productIds - Up to 100 product UUIDs to check
+   * @returns {Promise<Object>} Map of product UUID to boolean membership,
+   *                           or empty object on failure
+   * @throws {Error} Silently caught - returns empty object on failure
+   */
+  checkWishlistBulk: async (productIds) => {
+    if (!productIds || productIds.length === 0) {
+      return {};
+    }
+    try {
+      const response = await api.post('/wishlist/check', { product_ids: productIds });
+      return response.data.in_wishlist;
+    } catch (error) {
+      console.error('Error checking wishlist:', error);
+      return {};
+    }
   }
 };
 